@@ -0,0 +1,49 @@
+"""
+Per-cell cost of clean_text against the original character-by-character implementation.
+
+    PYTHONPATH=src python benchmarks/bench_clean_text.py
+"""
+import random
+import string
+import timeit
+
+from ocbc_dbs_statement_parser.main import _clean_str, clean_text
+
+
+def reference_clean_text(text):
+    return ' '.join(''.join(c for c in str(text) if c in string.printable).split())
+
+
+def make_cells(count: int, distinct: int):
+    rng = random.Random(42)
+    words = ['FAST PAYMENT', 'via PayNow-Mobile', 'GIRO - SALARY', 'POS PURCHASE    NETS', '22.54', '1,269.68',
+             '03 JUL', 'BALANCE B/F', 'to JOHN DOE', 'OTHR - Other', '', 'U. S. DOLLAR 80.00', 'Deposit\nBalance']
+    pool = [' '.join(rng.choice(words) for _ in range(rng.randint(1, 3))) for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def bench(label, func, cells, repeat=5):
+    per_call = min(timeit.repeat(lambda: [func(c) for c in cells], number=1, repeat=repeat)) / len(cells)
+    print(f"{label:<32} {per_call * 1e9:8.0f} ns/cell")
+    return per_call
+
+
+def main():
+    cells = make_cells(100_000, distinct=2_000)
+    assert [clean_text(c) for c in cells] == [reference_clean_text(c) for c in cells]
+
+    baseline = bench("reference (printable scan)", reference_clean_text, cells)
+
+    def uncached(text):
+        return _clean_str.__wrapped__(text)
+    translate = bench("translate, no cache", uncached, cells)
+
+    _clean_str.cache_clear()
+    cached = bench("translate + LRU cache", clean_text, cells)
+
+    print(f"speedup: {baseline / translate:.1f}x without cache, {baseline / cached:.1f}x with cache")
+    print(_clean_str.cache_info())
+
+
+if __name__ == '__main__':
+    main()
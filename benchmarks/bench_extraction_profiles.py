@@ -0,0 +1,72 @@
+"""
+Speed and accuracy of each extraction profile on a synthetic statement set,
+plus template-pinned variants of fast and tuned that give camelot the table area and column
+positions learned from the first statement of each layout.
+
+    PYTHONPATH=src python benchmarks/bench_extraction_profiles.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import bank_account_statement, credit_card_statement  # noqa: E402
+
+from ocbc_dbs_statement_parser.extraction import PROFILES  # noqa: E402
+from ocbc_dbs_statement_parser.main import parse_bank_statement  # noqa: E402
+from ocbc_dbs_statement_parser.templates import TemplateRegistry  # noqa: E402
+
+STATEMENTS = 6
+
+
+def make_corpus(directory: str):
+    corpus = []
+    for seed in range(STATEMENTS):
+        for kind, make in (('bank', bank_account_statement), ('card', credit_card_statement)):
+            pdf, expected = make(seed, transactions=60)
+            path = os.path.join(directory, f'{kind}-{seed}.pdf')
+            with open(path, 'wb') as fh:
+                fh.write(pdf)
+            corpus.append((kind, path, expected))
+    return corpus
+
+
+def accuracy(transactions, expected) -> float:
+    matched = sum(1 for row in expected if row in transactions)
+    return matched / max(len(expected), len(transactions), 1)
+
+
+def run(corpus, profile_for):
+    started = time.perf_counter()
+    scores = []
+    for kind, path, expected in corpus:
+        result = parse_bank_statement(path, extraction_profile=profile_for(kind))
+        scores.append(accuracy(result['transactions'], expected))
+    return (time.perf_counter() - started) / len(corpus), sum(scores) / len(scores)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = make_corpus(directory)
+        print(f"{'profile':<20} {'per statement':>14} {'accuracy':>9}")
+        for name, profile in PROFILES.items():
+            per_doc, score = run(corpus, lambda kind: profile)
+            print(f"{name:<20} {per_doc * 1000:>11.1f} ms {score:>9.1%}")
+
+        # Learn one template per layout, then pin its area and columns
+        for base in ('fast', 'tuned'):
+            pinned = {}
+            for kind in ('bank', 'card'):
+                registry = TemplateRegistry()
+                path = next(path for k, path, _ in corpus if k == kind)
+                parse_bank_statement(path, templates=registry, extraction_profile=base)
+                template = max(registry.templates(), key=lambda t: len(t.header_mapping))
+                pinned[kind] = PROFILES[base].with_template(template)
+            per_doc, score = run(corpus, lambda kind: pinned[kind])
+            print(f"{base + '+template':<20} {per_doc * 1000:>11.1f} ms {score:>9.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Cost of the non-transaction marker check as bank-specific markers are added:
+the old per-marker substring loop against the trie-compiled MarkerMatcher.
+
+    PYTHONPATH=src python benchmarks/bench_markers.py
+"""
+import random
+import string
+import timeit
+
+from ocbc_dbs_statement_parser.markers import DEFAULT_NON_TRANSACTION_MARKERS, MarkerMatcher
+
+
+def make_markers(count: int):
+    rng = random.Random(7)
+    extra = {' '.join(''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(3, 9)))
+                      for _ in range(rng.randint(1, 3))) for _ in range(count)}
+    return {marker.upper() for marker in DEFAULT_NON_TRANSACTION_MARKERS} | extra
+
+
+def make_rows(count: int):
+    rng = random.Random(3)
+    cells = ['FAST PAYMENT', 'VIA PAYNOW-MOBILE', '', '22.54', '03 JUL', 'TO JOHN DOE', 'OTHR - OTHER', '57,147.43']
+    return [[rng.choice(cells) for _ in range(8)] for _ in range(count)]
+
+
+def main():
+    rows = make_rows(5_000)
+    print(f"{'markers':>8} {'substring loop':>16} {'MarkerMatcher':>15}")
+    for count in (7, 50, 200, 1000):
+        markers = make_markers(count)
+        matcher = MarkerMatcher(markers)
+
+        def loop():
+            return [any(marker in value for value in row for marker in markers) for row in rows]
+
+        def compiled():
+            return [matcher.search_any(row) for row in rows]
+
+        assert loop() == compiled()
+        t_loop = min(timeit.repeat(loop, number=1, repeat=3)) / len(rows)
+        t_compiled = min(timeit.repeat(compiled, number=1, repeat=3)) / len(rows)
+        print(f"{len(markers):>8} {t_loop * 1e6:>13.1f} us {t_compiled * 1e6:>12.1f} us")
+
+
+if __name__ == '__main__':
+    main()
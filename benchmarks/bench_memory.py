@@ -0,0 +1,48 @@
+"""
+Per-stage memory use on synthetic statements of growing size, to size worker memory limits.
+Each statement is parsed in a fresh process so peak RSS is not carried over between sizes.
+
+    PYTHONPATH=src python benchmarks/bench_memory.py
+"""
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import bank_account_statement  # noqa: E402
+
+from ocbc_dbs_statement_parser.main import parse_bank_statement  # noqa: E402
+
+SIZES = (50, 200, 800)
+MIB = 1024 * 1024
+
+
+def profile(path: str):
+    return parse_bank_statement(path, profile_memory=True)['metrics']['memory']
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'transactions':>12} {'stage':<9} {'traced peak':>12} {'retained':>10} {'RSS peak':>10}")
+        for size in SIZES:
+            pdf, _ = bank_account_statement(size, transactions=size)
+            path = os.path.join(directory, f'{size}.pdf')
+            with open(path, 'wb') as fh:
+                fh.write(pdf)
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                report = pool.submit(profile, path).result()
+            for stage, figures in report['stages'].items():
+                peak = figures['traced_peak_bytes']  # None before Python 3.9
+                peak = f"{peak / MIB:>9.2f} MiB" if peak is not None else f"{'n/a':>13}"
+                print(f"{size:>12} {stage:<9} {peak}"
+                      f" {figures['traced_retained_bytes'] / MIB:>6.2f} MiB"
+                      f" {(figures['rss_peak_bytes'] or 0) / MIB:>6.1f} MiB")
+            top = report['stages']['tables']['top_allocations'][:3]
+            for site in top:
+                print(f"{'':>12}   {site['size_bytes'] / 1024:>8.1f} KiB  {site['site']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,400 @@
+"""
+Dependency-free generator for synthetic OCBC/DBS-style statement PDFs.
+
+Text is laid out with the standard Helvetica font, so pdfminer/camelot can extract
+it without embedded fonts. The ground truth transactions are returned with each
+document, in the same shape parse_bank_statement produces.
+
+Regenerate the regression corpus with:
+
+    python benchmarks/synthetic.py tests/corpus
+"""
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+# Helvetica advance widths (per 1000 em) for the characters used in amounts
+_DIGIT_WIDTHS = {**{str(d): 556 for d in range(10)}, ',': 278, '.': 278, ' ': 278, 'C': 722, 'R': 722}
+FONT_SIZE = 8
+LINE_HEIGHT = 11
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+
+TextItem = Tuple[float, float, str]  # x, y, text
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def text_width(text: str, size: float = FONT_SIZE) -> float:
+    return sum(_DIGIT_WIDTHS.get(c, 556) for c in text) * size / 1000
+
+
+def build_pdf(pages: Sequence[Sequence[TextItem]]) -> bytes:
+    """
+    Writes a minimal PDF with one content stream per page.
+    """
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b'')
+    pages_obj = add(b'')
+    font = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+    page_ids = []
+    for items in pages:
+        ops = ['BT', f'/F1 {FONT_SIZE} Tf']
+        for x, y, text in items:
+            ops.append(f'1 0 0 1 {x:.2f} {y:.2f} Tm ({_escape(text)}) Tj')
+        ops.append('ET')
+        stream = '\n'.join(ops).encode('latin-1')
+        content = add(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        page_ids.append(add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>'
+            % (pages_obj, PAGE_WIDTH, PAGE_HEIGHT, font, content)))
+    objects[catalog - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages_obj
+    kids = ' '.join(f'{i} 0 R' for i in page_ids).encode()
+    objects[pages_obj - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_ids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def _amount(value: float) -> str:
+    return f"{value:,.2f}"
+
+
+_MERCHANTS = [
+    ('FAST PAYMENT', ['via PayNow-Mobile', 'to JOHN DOE', 'OTHR - Other']),
+    ('GIRO - SALARY', ['SALA', 'Company A Pte Ltd']),
+    ('POS PURCHASE NETS', ['STORE A', 'MALL']),
+    ('FUND TRANSFER', ['via PayNow-QR Code', 'to BOB BROWN']),
+    ('BONUS INTEREST', ['SALARY BONUS']),
+    ('INTEREST CREDIT', []),
+]
+_CARD_MERCHANTS = [
+    'MERCHANT* FOOD A-123', 'ONLINE SERVICE S', 'CLOTHING STORE - I', 'DIGITALOCEAN.COM',
+    'CUSTOMER.IO EMAIL', 'BOOKSHOP ORCHARD', 'GRAB RIDES',
+]
+
+
+def bank_account_statement(seed: int, transactions: int = 40, start: date = date(2024, 7, 1)) -> Tuple[bytes, List[Dict]]:
+    """
+    A DBS-style bank account statement: Date | Description | Withdrawal | Deposit | Balance,
+    with continuation lines under each description.
+    """
+    rng = random.Random(seed)
+    columns = {'date': 40, 'description': 110, 'withdrawal_right': 380, 'deposit_right': 460, 'balance_right': 555}
+    balance = round(rng.uniform(1000, 60000), 2)
+    end = start + timedelta(days=30)
+    header_page = [
+        (40, 800, 'DBS Bank Ltd'),
+        (40, 788, 'Statement of Account'),
+        (40, 776, f"Details of Your DBS Multiplier Account {start.strftime('%d %b %Y')} TO {end.strftime('%d %b %Y')}"),
+    ]
+
+    pages: List[List[TextItem]] = []
+    expected: List[Dict] = []
+    items: List[TextItem] = list(header_page)
+    y = 740.0
+
+    def table_header(y: float) -> List[TextItem]:
+        return [
+            (columns['date'], y, 'Date'),
+            (columns['description'], y, 'Description'),
+            (columns['withdrawal_right'] - text_width('Withdrawal (-)'), y, 'Withdrawal (-)'),
+            (columns['deposit_right'] - text_width('Deposit (+)'), y, 'Deposit (+)'),
+            (columns['balance_right'] - text_width('Balance'), y, 'Balance'),
+        ]
+
+    items += table_header(y)
+    y -= LINE_HEIGHT * 2
+    items.append((columns['description'], y, 'Balance Brought Forward'))
+    items.append((columns['balance_right'] - text_width(_amount(balance)), y, _amount(balance)))
+    y -= LINE_HEIGHT * 2
+
+    day = start
+    for _ in range(transactions):
+        title, continuation = rng.choice(_MERCHANTS)
+        amount = round(rng.uniform(1, 3000), 2)
+        is_deposit = title in ('GIRO - SALARY', 'BONUS INTEREST', 'INTEREST CREDIT') or rng.random() < 0.2
+        balance = round(balance + amount if is_deposit else balance - amount, 2)
+        day = min(day + timedelta(days=rng.randint(0, 1)), end)
+        lines_needed = 2 + len(continuation)
+        if y - lines_needed * LINE_HEIGHT < 60:
+            pages.append(items)
+            items = []
+            y = 800.0
+            items += table_header(y)
+            y -= LINE_HEIGHT * 2
+
+        date_text = day.strftime('%d/%m/%Y')
+        items.append((columns['date'], y, date_text))
+        items.append((columns['description'], y, title))
+        amount_col = 'deposit_right' if is_deposit else 'withdrawal_right'
+        items.append((columns[amount_col] - text_width(_amount(amount)), y, _amount(amount)))
+        items.append((columns['balance_right'] - text_width(_amount(balance)), y, _amount(balance)))
+        for line in continuation:
+            y -= LINE_HEIGHT
+            items.append((columns['description'], y, line))
+        y -= LINE_HEIGHT * 2
+
+        expected.append({
+            'Date': day.strftime('%d %B %Y'),
+            'Description': ' '.join([title] + continuation),
+            'Withdrawal': 0 if is_deposit else -amount,
+            'Deposit': amount if is_deposit else 0,
+            'Balance': balance,
+        })
+
+    items.append((columns['description'], y, 'Total Balance Carried Forward:'))
+    items.append((columns['balance_right'] - text_width(_amount(balance)), y, _amount(balance)))
+    pages.append(items)
+    return build_pdf(pages), expected
+
+
+def credit_card_statement(seed: int, transactions: int = 40, statement_date: date = date(2024, 5, 23)) -> Tuple[bytes, List[Dict]]:
+    """
+    A DBS-style credit card statement: DATE | DESCRIPTION | AMOUNT (S$).
+    """
+    rng = random.Random(seed)
+    columns = {'date': 40, 'description': 110, 'amount_right': 555}
+    header_page = [
+        (40, 800, 'Credit Cards'),
+        (40, 788, 'Statement of Account'),
+        (40, 776, 'STATEMENT DATE'),
+        (40, 764, statement_date.strftime('%d %b %Y')),
+        (300, 800, 'DBS Cards P.O. Box 360'),
+    ]
+    pages: List[List[TextItem]] = []
+    expected: List[Dict] = []
+    items: List[TextItem] = list(header_page)
+    y = 730.0
+
+    def table_header(y: float) -> List[TextItem]:
+        return [
+            (columns['date'], y, 'DATE'),
+            (columns['description'], y, 'DESCRIPTION'),
+            (columns['amount_right'] - text_width('AMOUNT (S$)'), y, 'AMOUNT (S$)'),
+        ]
+
+    items += table_header(y)
+    y -= LINE_HEIGHT * 2
+    items.append((columns['description'], y, 'NEW TRANSACTIONS JOHN DOE'))
+    y -= LINE_HEIGHT * 2
+
+    day = statement_date - timedelta(days=30)
+    for _ in range(transactions):
+        if y < 60:
+            pages.append(items)
+            items = []
+            y = 800.0
+            items += table_header(y)
+            y -= LINE_HEIGHT * 2
+        day = min(day + timedelta(days=rng.randint(0, 1)), statement_date)
+        merchant = rng.choice(_CARD_MERCHANTS)
+        amount = round(rng.uniform(1, 500), 2)
+        items.append((columns['date'], y, day.strftime('%d %b').upper()))
+        items.append((columns['description'], y, merchant))
+        items.append((columns['amount_right'] - text_width(_amount(amount)), y, _amount(amount)))
+        y -= LINE_HEIGHT * 2
+        expected.append({
+            'Date': day.strftime('%d %B %Y'),
+            'Amount': -amount,
+            'Description': merchant,
+        })
+
+    items.append((columns['description'], y, 'SUB-TOTAL:'))
+    pages.append(items)
+    return build_pdf(pages), expected
+
+
+def ocbc_account_statement(seed: int, transactions: int = 40, start: date = date(2024, 7, 1)) -> Tuple[bytes, List[Dict]]:
+    """
+    An OCBC-style bank account statement: Transaction Date | Value Date | Description | Cheque |
+    Withdrawal | Deposit | Balance, with day-month dates and balance B/F and C/F rows.
+    """
+    rng = random.Random(seed)
+    columns = {'date': 30, 'value_date': 80, 'description': 130, 'cheque': 290,
+               'withdrawal_right': 400, 'deposit_right': 475, 'balance_right': 555}
+    balance = round(rng.uniform(1000, 60000), 2)
+    end = start + timedelta(days=30)
+    header_page = [
+        (30, 800, 'OCBC Bank'),
+        (30, 788, 'STATEMENT OF ACCOUNT'),
+        (30, 776, 'OCBC 360 ACCOUNT'),
+        (30, 764, f"Account No. 123456789012   {start.strftime('%d %b %Y').upper()} TO {end.strftime('%d %b %Y').upper()}"),
+    ]
+
+    pages: List[List[TextItem]] = []
+    expected: List[Dict] = []
+    items: List[TextItem] = list(header_page)
+    y = 730.0
+
+    def table_header(y: float) -> List[TextItem]:
+        return [
+            (columns['date'], y, 'Transaction Date'),
+            (columns['value_date'], y, 'Value Date'),
+            (columns['description'], y, 'Description'),
+            (columns['cheque'], y, 'Cheque'),
+            (columns['withdrawal_right'] - text_width('Withdrawal'), y, 'Withdrawal'),
+            (columns['deposit_right'] - text_width('Deposit'), y, 'Deposit'),
+            (columns['balance_right'] - text_width('Balance'), y, 'Balance'),
+        ]
+
+    items += table_header(y)
+    y -= LINE_HEIGHT * 2
+    items.append((columns['description'], y, 'BALANCE B/F'))
+    items.append((columns['balance_right'] - text_width(_amount(balance)), y, _amount(balance)))
+    y -= LINE_HEIGHT * 2
+
+    day = start
+    for _ in range(transactions):
+        title, continuation = rng.choice(_MERCHANTS)
+        amount = round(rng.uniform(1, 3000), 2)
+        is_deposit = title in ('GIRO - SALARY', 'BONUS INTEREST', 'INTEREST CREDIT') or rng.random() < 0.2
+        balance = round(balance + amount if is_deposit else balance - amount, 2)
+        day = min(day + timedelta(days=rng.randint(0, 1)), end)
+        lines_needed = 2 + len(continuation)
+        if y - lines_needed * LINE_HEIGHT < 60:
+            pages.append(items)
+            items = []
+            y = 800.0
+            items += table_header(y)
+            y -= LINE_HEIGHT * 2
+
+        date_text = day.strftime('%d %b').upper()
+        items.append((columns['date'], y, date_text))
+        items.append((columns['value_date'], y, date_text))
+        items.append((columns['description'], y, title))
+        amount_col = 'deposit_right' if is_deposit else 'withdrawal_right'
+        items.append((columns[amount_col] - text_width(_amount(amount)), y, _amount(amount)))
+        items.append((columns['balance_right'] - text_width(_amount(balance)), y, _amount(balance)))
+        for line in continuation:
+            y -= LINE_HEIGHT
+            items.append((columns['description'], y, line))
+        y -= LINE_HEIGHT * 2
+
+        expected.append({
+            'Date': day.strftime('%d %B %Y'),
+            'Description': ' '.join([title] + continuation),
+            'Withdrawal': 0 if is_deposit else -amount,
+            'Deposit': amount if is_deposit else 0,
+            'Balance': balance,
+        })
+
+    items.append((columns['description'], y, 'BALANCE C/F'))
+    items.append((columns['balance_right'] - text_width(_amount(balance)), y, _amount(balance)))
+    pages.append(items)
+    return build_pdf(pages), expected
+
+
+def ocbc_card_statement(seed: int, transactions: int = 40, statement_date: date = date(2024, 5, 23)) -> Tuple[bytes, List[Dict]]:
+    """
+    An OCBC-style credit card statement: TRANSACTION DATE | DESCRIPTION | AMOUNT (SGD).
+    """
+    rng = random.Random(seed)
+    columns = {'date': 30, 'description': 120, 'amount_right': 555}
+    header_page = [
+        (30, 800, 'OCBC Bank'),
+        (30, 788, 'OCBC 365 CREDIT CARD'),
+        (30, 776, 'STATEMENT DATE'),
+        (30, 764, statement_date.strftime('%d %b %Y')),
+        (300, 800, 'CARD NO 5555-4444-3333-2222'),
+    ]
+    pages: List[List[TextItem]] = []
+    expected: List[Dict] = []
+    items: List[TextItem] = list(header_page)
+    y = 730.0
+
+    def table_header(y: float) -> List[TextItem]:
+        return [
+            (columns['date'], y, 'TRANSACTION DATE'),
+            (columns['description'], y, 'DESCRIPTION'),
+            (columns['amount_right'] - text_width('AMOUNT (SGD)'), y, 'AMOUNT (SGD)'),
+        ]
+
+    items += table_header(y)
+    y -= LINE_HEIGHT * 2
+
+    day = statement_date - timedelta(days=30)
+    for _ in range(transactions):
+        if y < 60:
+            pages.append(items)
+            items = []
+            y = 800.0
+            items += table_header(y)
+            y -= LINE_HEIGHT * 2
+        day = min(day + timedelta(days=rng.randint(0, 1)), statement_date)
+        merchant = rng.choice(_CARD_MERCHANTS)
+        amount = round(rng.uniform(1, 500), 2)
+        items.append((columns['date'], y, day.strftime('%d/%m')))
+        items.append((columns['description'], y, merchant))
+        items.append((columns['amount_right'] - text_width(_amount(amount)), y, _amount(amount)))
+        y -= LINE_HEIGHT * 2
+        expected.append({
+            'Date': day.strftime('%d %B %Y'),
+            'Amount': -amount,
+            'Description': merchant,
+        })
+
+    items.append((columns['description'], y, 'SUBTOTAL'))
+    pages.append(items)
+    return build_pdf(pages), expected
+
+
+# name -> (generator, seed, transactions); the committed regression corpus in tests/corpus
+CORPUS = {
+    'dbs_account_single_page': (bank_account_statement, 11, 12),
+    'dbs_account_multi_page': (bank_account_statement, 12, 60),
+    'dbs_card_single_page': (credit_card_statement, 13, 20),
+    'dbs_card_multi_page': (credit_card_statement, 14, 70),
+    'ocbc_account_multi_page': (ocbc_account_statement, 15, 50),
+    'ocbc_card_multi_page': (ocbc_card_statement, 16, 60),
+}
+DEFAULT_BUDGET_SECONDS = 2.0
+
+
+def write_corpus(directory: str) -> None:
+    """
+    Writes each corpus PDF with its expected transactions, plus a manifest of time budgets.
+    Budgets already in an existing manifest are kept.
+    """
+    import json
+    import os
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, 'manifest.json')
+    budgets = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as fh:
+            budgets = {entry['name']: entry['budget_seconds'] for entry in json.load(fh)['statements']}
+
+    entries = []
+    for name, (generate, seed, transactions) in CORPUS.items():
+        pdf, expected = generate(seed, transactions=transactions)
+        with open(os.path.join(directory, f'{name}.pdf'), 'wb') as fh:
+            fh.write(pdf)
+        with open(os.path.join(directory, f'{name}.expected.json'), 'w') as fh:
+            json.dump({'transactions': expected}, fh, indent=2)
+            fh.write('\n')
+        entries.append({'name': name, 'budget_seconds': budgets.get(name, DEFAULT_BUDGET_SECONDS)})
+    with open(manifest_path, 'w') as fh:
+        json.dump({'statements': entries}, fh, indent=2)
+        fh.write('\n')
+
+
+if __name__ == '__main__':
+    import sys
+    write_corpus(sys.argv[1] if len(sys.argv) > 1 else 'tests/corpus')
@@ -59,6 +59,9 @@ setup(
         "tzdata==2024.1",
         "zipp==3.20.2",
     ],
+    extras_require={
+        "fast": ["orjson>=3.8"],
+    },
     entry_points={
         "console_scripts": [
             "ocbc_dbs_statement_parser=ocbc_dbs_statement_parser.cli:cli",
@@ -1,5 +1,8 @@
 __version__ = "0.2.1"
 
+from .context import ParseContext, ParserConfig
 from .main import parse_bank_statement, verify_transactions
+from .markers import MarkerConfig
+from .templates import TemplateRegistry
 
-__all__ = ['parse_bank_statement', 'verify_transactions']
\ No newline at end of file
+__all__ = ['parse_bank_statement', 'verify_transactions', 'TemplateRegistry', 'MarkerConfig', 'ParserConfig', 'ParseContext']
\ No newline at end of file
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import re
+import tempfile
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .main import clean_text, parse_bank_statement
+from .workers import preload_worker, worker_context
+
+STATEMENT_EXTENSIONS = ('.pdf',)
+_NON_ALNUM = re.compile(r'[^A-Z0-9]+')
+_DATE_FORMATS = ("%d %B %Y", "%d %B", "%d/%m/%Y")
+
+
+def normalize_description(description: str) -> str:
+    """
+    Uppercases the description and collapses punctuation and whitespace,
+    so that re-exports with different spacing produce the same key.
+    """
+    return ' '.join(_NON_ALNUM.sub(' ', clean_text(description).upper()).split())
+
+
+def transaction_amount(transaction: Dict) -> float:
+    if 'Amount' in transaction:
+        return round(float(transaction.get('Amount') or 0), 2)
+    deposit = float(transaction.get('Deposit') or 0)
+    withdrawal = float(transaction.get('Withdrawal') or 0)
+    return round(deposit + withdrawal, 2)
+
+
+def transaction_key(transaction: Dict) -> bytes:
+    """
+    Hashes (date, amount, normalized description, balance) into a 16-byte digest.
+    Digests keep the index small enough for millions of rows.
+    """
+    balance = transaction.get('Balance')
+    parts = (
+        str(transaction.get('Date', '')),
+        f"{transaction_amount(transaction):.2f}",
+        normalize_description(str(transaction.get('Description', ''))),
+        '' if balance is None else f"{float(balance):.2f}",
+    )
+    return hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=16).digest()
+
+
+class LedgerIndex:
+    """
+    Hash index of transactions already in the merged ledger.
+
+    Each key stores the highest number of times it occurred within a single statement,
+    so genuine repeats inside one statement (two identical purchases on the same day)
+    survive while copies from overlapping statements are dropped. Lookups are O(1),
+    so merging is linear in the number of rows.
+    """
+
+    def __init__(self):
+        self._counts: Dict[bytes, int] = {}
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add_statement(self, transactions: Iterable[Dict]) -> List[Dict]:
+        """
+        Returns the transactions from this statement that are not yet in the ledger.
+        """
+        seen_in_statement: Counter = Counter()
+        fresh = []
+        for transaction in transactions:
+            key = transaction_key(transaction)
+            seen_in_statement[key] += 1
+            if seen_in_statement[key] > self._counts.get(key, 0):
+                self._counts[key] = seen_in_statement[key]
+                fresh.append(transaction)
+            else:
+                self.duplicates += 1
+        return fresh
+
+
+def iter_statement_files(paths: Iterable[str], extract_dir: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (source label, local file path) for every statement under the given files,
+    directories and zip archives. Zip members are extracted into extract_dir,
+    since camelot needs a file on disk.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield from iter_statement_files([os.path.join(root, name)], extract_dir)
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for member in sorted(archive.namelist()):
+                    if member.endswith('/') or not member.lower().endswith(STATEMENT_EXTENSIONS):
+                        continue
+                    target_dir = tempfile.mkdtemp(dir=extract_dir)
+                    target = os.path.join(target_dir, os.path.basename(member))
+                    with archive.open(member) as src, open(target, 'wb') as dst:
+                        dst.write(src.read())
+                    yield f"{path}!{member}", target
+        elif path.lower().endswith(STATEMENT_EXTENSIONS):
+            yield path, path
+
+
+def _parse_source(source: Tuple[str, str]) -> Tuple[str, Dict]:
+    label, file_path = source
+    try:
+        return label, parse_bank_statement(file_path)
+    except Exception as e:
+        return label, {"transactions": [], "verification_data": {}, "error": f"{type(e).__name__}: {e}"}
+
+
+def _sort_key(transaction: Dict) -> datetime:
+    date_str = str(transaction.get('Date', ''))
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format)
+        except ValueError:
+            continue
+    return datetime.max
+
+
+def ingest_archive(paths: Iterable[str], workers: Optional[int] = None) -> Dict:
+    """
+    Parses every statement found in the given files, directories and zip archives in parallel,
+    and merges them into one deduplicated ledger sorted by date.
+    """
+    index = LedgerIndex()
+    ledger: List[Dict] = []
+    statements: List[Dict] = []
+
+    with tempfile.TemporaryDirectory(prefix='statements-') as extract_dir:
+        sources = list(iter_statement_files(paths, extract_dir))
+        # Results come back in submission order, so the merge is deterministic
+        with ProcessPoolExecutor(max_workers=workers, mp_context=worker_context(),
+                                 initializer=preload_worker) as executor:
+            for label, result in executor.map(_parse_source, sources, chunksize=1):
+                transactions = result.get("transactions") or []
+                fresh = index.add_statement(transactions)
+                for transaction in fresh:
+                    transaction['Source'] = label
+                ledger.extend(fresh)
+                summary = {
+                    "source": label,
+                    "transactions": len(transactions),
+                    "new_transactions": len(fresh),
+                }
+                if "error" in result:
+                    summary["error"] = result["error"]
+                statements.append(summary)
+
+    # sorted() is stable, so same-day rows keep their statement order
+    ledger.sort(key=_sort_key)
+    return {
+        "transactions": ledger,
+        "statements": statements,
+        "duplicates_removed": index.duplicates,
+    }
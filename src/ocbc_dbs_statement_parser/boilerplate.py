@@ -0,0 +1,128 @@
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import IO, Dict, Iterable, List, Optional, Set, Union
+
+from pypdf import PdfReader
+
+# Digits, punctuation and month names change from month to month (dates, page numbers,
+# amounts); the rest of the words on a terms-and-conditions or rewards page do not
+_NOISE = re.compile(r'[\W\d_]+')
+_MONTH_NAMES = re.compile(r'\b(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)[A-Z]*\b')
+
+
+def page_hash(text: Optional[str]) -> str:
+    words = _MONTH_NAMES.sub(' ', _NOISE.sub(' ', (text or '').upper())).split()
+    normalized = ' '.join(words)
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def extract_page_texts(file_path: Union[str, bytes, IO[bytes]]) -> List[str]:
+    """
+    Text of every page, from a path, an in-memory PDF or an already loaded binary stream.
+    """
+    if isinstance(file_path, bytes):
+        file_path = io.BytesIO(file_path)
+    if not isinstance(file_path, str):
+        return [page.extract_text() or '' for page in PdfReader(file_path).pages]
+    with open(file_path, 'rb') as fh:
+        return [page.extract_text() or '' for page in PdfReader(fh).pages]
+
+
+@dataclass
+class BoilerplateStats:
+    documents: int = 0
+    pages_seen: int = 0
+    pages_skipped: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.pages_skipped / self.pages_seen if self.pages_seen else 0.0
+
+    def to_dict(self) -> Dict:
+        return {'documents': self.documents, 'pages_seen': self.pages_seen,
+                'pages_skipped': self.pages_skipped, 'hit_rate': round(self.hit_rate, 4)}
+
+
+class BoilerplateIndex:
+    """
+    Normalized page-text hashes of pages that never yielded a transaction table, optionally
+    persisted as JSON. Once a page has been seen without transactions in min_sightings
+    statements, later statements skip camelot on it. A hash that ever yields transactions is
+    never skipped again. The first page is always extracted: it carries the statement header.
+    """
+
+    def __init__(self, path: Optional[str] = None, min_sightings: int = 2):
+        self.path = path
+        self.min_sightings = min_sightings
+        self.stats = BoilerplateStats()
+        self._sightings: Dict[str, int] = {}
+        self._content: Set[str] = set()
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return sum(1 for count in self._sightings.values() if count >= self.min_sightings)
+
+    def is_boilerplate(self, digest: str) -> bool:
+        return self._sightings.get(digest, 0) >= self.min_sightings
+
+    def pages_to_extract(self, hashes: List[str]) -> List[int]:
+        """
+        1-based page numbers camelot still has to read, counting skipped pages in the stats.
+        """
+        pages = [number for number, digest in enumerate(hashes, start=1)
+                 if number == 1 or not self.is_boilerplate(digest)]
+        with self._lock:
+            self.stats.documents += 1
+            self.stats.pages_seen += len(hashes)
+            self.stats.pages_skipped += len(hashes) - len(pages)
+        return pages
+
+    def learn(self, hashes: List[str], extracted_pages: Iterable[int], transaction_pages: Iterable[int]) -> None:
+        """
+        Records which of the extracted pages produced transaction tables and which did not.
+        """
+        transaction_pages = set(transaction_pages)
+        with self._lock:
+            for number in set(extracted_pages):
+                if not 1 <= number <= len(hashes):
+                    continue
+                digest = hashes[number - 1]
+                if number in transaction_pages:
+                    if digest not in self._content:
+                        self._content.add(digest)
+                        self._sightings.pop(digest, None)
+                        self._dirty = True
+                elif digest not in self._content:
+                    self._sightings[digest] = self._sightings.get(digest, 0) + 1
+                    self._dirty = True
+
+    def load(self, path: str) -> None:
+        with open(path, 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+        with self._lock:
+            self._sightings.update(data.get('boilerplate', {}))
+            self._content.update(data.get('content', []))
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            if not self._dirty and os.path.exists(path):
+                return
+            payload = {'boilerplate': dict(self._sightings), 'content': sorted(self._content)}
+            self._dirty = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(payload, fh, indent=2)
+        os.replace(tmp_path, path)
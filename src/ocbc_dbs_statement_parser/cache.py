@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .extraction import ExtractionProfile, get_profile
+from .markers import MarkerConfig
+
+TABLES_LAYER = 'tables'
+RESULTS_LAYER = 'results'
+LAYERS = (TABLES_LAYER, RESULTS_LAYER)
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        h.update(part.encode('utf-8'))
+        h.update(b'\x1f')
+    return h.hexdigest()
+
+
+def bytes_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Content hash of a PDF; the cache key does not depend on where the file lives.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def tables_version(profile: Union[str, ExtractionProfile, None] = None) -> str:
+    """
+    Version of the table layer: the package and camelot versions plus the extraction profile.
+    """
+    import camelot
+    from . import __version__
+    from .main import TABLES_REVISION
+    settings = json.dumps(get_profile(profile).to_dict(), sort_keys=True, default=str)
+    return _digest(__version__, getattr(camelot, '__version__', ''), str(TABLES_REVISION), settings)
+
+
+def rules_version(markers: Optional[MarkerConfig] = None) -> str:
+    """
+    Version of the parsing rules: every module-level regex and keyword list in main,
+    the configured markers and exclusions, and the package version.
+    """
+    from . import __version__
+    from . import main as rules
+    markers = markers or MarkerConfig()
+    parts = [__version__, str(rules.RULES_REVISION)]
+    for name, value in sorted(vars(rules).items()):
+        if isinstance(value, re.Pattern):
+            parts.append(f'{name}={value.pattern}')
+        elif name.isupper() and isinstance(value, (list, tuple, set, frozenset)):
+            parts.append(f'{name}={sorted(map(str, value))}')
+    parts.append(json.dumps(sorted(markers.non_transaction_markers)))
+    parts.append(json.dumps(sorted(markers.excluded_descriptions)))
+    return _digest(*parts)
+
+
+@dataclass
+class CacheStats:
+    hits: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(LAYERS, 0))
+    misses: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(LAYERS, 0))
+    writes: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(LAYERS, 0))
+
+    def to_dict(self) -> Dict:
+        return {'hits': dict(self.hits), 'misses': dict(self.misses), 'writes': dict(self.writes)}
+
+
+class StatementCache:
+    """
+    Two-layer on-disk cache for parse_bank_statement:
+
+        tables/<pdf hash>-<tables version>.json                           camelot output
+        results/<pdf hash>-<tables version>-<rules version>-<year>.json   transactions
+
+    Changing the parsing rules (regexes, keywords, markers, package version) only misses
+    the results layer, so the statement is re-extracted from cached tables instead of
+    running camelot again. Verification is cheap and recomputed on every hit.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _path(self, layer: str, key: str) -> str:
+        return os.path.join(self.directory, layer, f'{key}.json')
+
+    def _count(self, counter: Dict[str, int], layer: str) -> None:
+        with self._lock:
+            counter[layer] += 1
+
+    def _read(self, layer: str, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(layer, key), 'r', encoding='utf-8') as fh:
+                payload = json.load(fh)
+        except (OSError, ValueError):
+            self._count(self.stats.misses, layer)
+            return None
+        self._count(self.stats.hits, layer)
+        return payload
+
+    def _write(self, layer: str, key: str, payload: Dict) -> None:
+        path = self._path(layer, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(payload, fh, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        self._count(self.stats.writes, layer)
+
+    def keys(self, file_path: str, profile: Union[str, ExtractionProfile, None] = None,
+             markers: Optional[MarkerConfig] = None, digest: Optional[str] = None) -> Tuple[str, str]:
+        """
+        (tables key, results key) for a statement. The results key also records the year
+        in the file name, which is used when the statement itself has none.
+        Pass digest if the file's content hash is already known.
+        """
+        from .main import FILENAME_YEAR_PATTERN
+        digest = digest or file_digest(file_path)
+        tables = f'{digest}-{tables_version(profile)}'
+        year_match = FILENAME_YEAR_PATTERN.search(file_path)
+        return tables, f'{tables}-{rules_version(markers)}-{year_match.group(1) if year_match else "none"}'
+
+    # Tables layer
+
+    def get_tables(self, key: str) -> Optional[List[pd.DataFrame]]:
+        payload = self._read(TABLES_LAYER, key)
+        if payload is None:
+            return None
+        tables = []
+        for item in payload['tables']:
+            df = pd.DataFrame(item['rows'], dtype=object) if item['rows'] else pd.DataFrame()
+            df.attrs.update(item.get('attrs', {}))
+            tables.append(df)
+        return tables
+
+    def put_tables(self, key: str, tables: List[pd.DataFrame]) -> None:
+        self._write(TABLES_LAYER, key, {'tables': [
+            {'rows': table.values.tolist(), 'attrs': dict(table.attrs)} for table in tables
+        ]})
+
+    # Results layer
+
+    def get_transactions(self, key: str) -> Optional[List[Dict]]:
+        payload = self._read(RESULTS_LAYER, key)
+        return None if payload is None else payload['transactions']
+
+    def put_transactions(self, key: str, transactions: List[Dict]) -> None:
+        self._write(RESULTS_LAYER, key, {'transactions': transactions})
+
+    # Maintenance
+
+    def entries(self) -> Dict[str, Dict[str, int]]:
+        """
+        Number of entries and bytes on disk per layer.
+        """
+        summary = {}
+        for layer in LAYERS:
+            count = size = 0
+            for entry in self._scan(layer):
+                count += 1
+                size += entry.stat().st_size
+            summary[layer] = {'entries': count, 'bytes': size}
+        return summary
+
+    def _scan(self, layer: str):
+        try:
+            with os.scandir(os.path.join(self.directory, layer)) as it:
+                return [entry for entry in it if entry.is_file() and entry.name.endswith('.json')]
+        except FileNotFoundError:
+            return []
+
+    def prune(self, max_age: Optional[float] = None, tables_version: Optional[str] = None,
+              rules_version: Optional[str] = None) -> Dict[str, int]:
+        """
+        Removes entries older than max_age seconds and, when versions are given,
+        entries written for any other tables/rules version. With no arguments every
+        entry is removed. Returns the number of entries removed per layer.
+        """
+        everything = max_age is None and tables_version is None and rules_version is None
+        now = time.time()
+        removed: Dict[str, int] = dict.fromkeys(LAYERS, 0)
+        for layer in LAYERS:
+            for entry in self._scan(layer):
+                versions = entry.name[:-len('.json')].split('-')[1:]
+                stale = everything
+                if max_age is not None and now - entry.stat().st_mtime > max_age:
+                    stale = True
+                if tables_version is not None and versions[:1] != [tables_version]:
+                    stale = True
+                if rules_version is not None and layer == RESULTS_LAYER and versions[1:2] != [rules_version]:
+                    stale = True
+                if stale:
+                    try:
+                        os.remove(entry.path)
+                        removed[layer] += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
@@ -1,24 +1,252 @@
 import argparse
-import json
-from decimal import Decimal
+import sys
+from typing import List, Optional
+from .boilerplate import BoilerplateIndex
+from .cache import StatementCache, rules_version, tables_version
 from .main import parse_bank_statement
+from .markers import MarkerConfig
+from .serialization import BACKENDS, decimal_default, dump
+from .templates import TemplateRegistry
 from . import __version__  # Import the version from your package
 
-def decimal_default(obj):
-    if isinstance(obj, Decimal):
-        return float(obj)
-    raise TypeError
+def add_output_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("-o", "--output", metavar="PATH", help="Write JSON to this file instead of stdout")
+    parser.add_argument("--compact", action="store_true", help="Write compact JSON without indentation")
+    parser.add_argument("--json-backend", choices=BACKENDS, default="auto",
+                        help="JSON encoder (default: orjson when installed, else the standard library)")
 
-def cli():
-    parser = argparse.ArgumentParser(description="Process bank statement PDF")
+def write_output(result, args: argparse.Namespace):
+    if args.output:
+        with open(args.output, 'wb') as fp:
+            dump(result, fp, compact=args.compact, backend=args.json_backend)
+    else:
+        dump(result, sys.stdout, compact=args.compact, backend=args.json_backend)
+
+def add_password_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--password", action="append", default=[], metavar="PASSWORD",
+                        help="Password for encrypted statements; repeat to try several")
+    parser.add_argument("--password-file", metavar="PATH",
+                        help="File with one candidate password per line")
+
+def add_budget_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--page-timeout", type=float, metavar="SECONDS",
+                        help="Abandon table extraction of any page that takes longer; the result is marked partial")
+    parser.add_argument("--document-timeout", type=float, metavar="SECONDS",
+                        help="Stop extracting a statement's tables after this long; the result is marked partial")
+
+def read_passwords(args: argparse.Namespace) -> List[str]:
+    passwords = list(args.password)
+    if args.password_file:
+        with open(args.password_file, 'r', encoding='utf-8') as fh:
+            passwords += [line.rstrip('\r\n') for line in fh if line.strip()]
+    return passwords
+
+def ingest_command(argv: List[str]):
+    from .archive import ingest_archive
+
+    parser = argparse.ArgumentParser(prog="ocbc_dbs_statement_parser ingest",
+                                     description="Merge folders and zip archives of statements into one deduplicated ledger")
+    parser.add_argument("paths", nargs="+", help="PDF files, directories or zip archives")
+    parser.add_argument("--workers", type=int, default=None, help="Number of parser processes (default: CPU count)")
+    add_output_arguments(parser)
+    args = parser.parse_args(argv)
+
+    result = ingest_archive(args.paths, workers=args.workers)
+    write_output(result, args)
+
+def batch_command(argv: List[str]):
+    import tempfile
+    from .archive import iter_statement_files
+    from .pipeline import run_pipeline
+    from .sinks import JsonLinesSink, SqliteSink
+
+    parser = argparse.ArgumentParser(prog="ocbc_dbs_statement_parser batch",
+                                     description="Parse many statements with bounded memory, writing one JSON line per statement")
+    parser.add_argument("paths", nargs="+", help="PDF files, directories or zip archives")
+    parser.add_argument("-o", "--output", metavar="PATH", help="Write JSON lines to this file instead of stdout")
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help="Load results into this SQLite ledger (created if missing) instead of writing JSON lines")
+    parser.add_argument("--verify", action="store_true", help="Verify transaction totals")
+    parser.add_argument("--templates", metavar="PATH", help="Layout template file to reuse and update")
+    parser.add_argument("--markers", metavar="PATH", help="JSON file with extra non-transaction markers and exclusions")
+    parser.add_argument("--extraction-profile", metavar="NAME", default=None,
+                        help="camelot tuning profile: default, fast, tuned, or a .json profile file")
+    parser.add_argument("--cache", metavar="DIR", help="Statement cache directory to reuse and fill")
+    parser.add_argument("--boilerplate", metavar="PATH",
+                        help="Boilerplate page index to reuse and update; known boilerplate pages skip table extraction")
+    add_password_arguments(parser)
+    add_budget_arguments(parser)
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Report per-stage memory use and top allocation sites in each result's metrics")
+    parser.add_argument("--queue-size", type=int, default=2, help="Capacity of each queue between stages (default: 2)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Maximum documents being parsed at once (default: enough to keep every worker busy)")
+    parser.add_argument("--io-workers", type=int, default=1,
+                        help="Threads reading PDFs and extracting first-page text (default: 1)")
+    parser.add_argument("--table-workers", type=int, default=1, help="Threads running table extraction (default: 1)")
+    parser.add_argument("--processes", type=int, default=0, help="Run table extraction in a pool of this many processes")
+    parser.add_argument("--spool-dir", metavar="PATH", default=None,
+                        help="Copy each PDF to this local directory when loading, so table extraction never reads from slow storage")
+    parser.add_argument("--json-backend", choices=BACKENDS, default="auto",
+                        help="JSON encoder (default: orjson when installed, else the standard library)")
+    args = parser.parse_args(argv)
+
+    templates = TemplateRegistry(args.templates) if args.templates else None
+    cache = StatementCache(args.cache) if args.cache else None
+    boilerplate = BoilerplateIndex(args.boilerplate) if args.boilerplate else None
+    if args.sqlite:
+        if args.output:
+            parser.error("--sqlite and --output are mutually exclusive")
+        sink = SqliteSink(args.sqlite)
+    else:
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        sink = JsonLinesSink(out, close_fp=bool(args.output), backend=args.json_backend)
+    with tempfile.TemporaryDirectory(prefix='statements-') as extract_dir, sink:
+        stats = run_pipeline(iter_statement_files(args.paths, extract_dir), sink,
+                             queue_size=args.queue_size, max_in_flight=args.max_in_flight,
+                             table_workers=args.table_workers, processes=args.processes,
+                             io_workers=args.io_workers, spool_dir=args.spool_dir,
+                             verify=args.verify, templates=templates,
+                             markers=MarkerConfig.from_file(args.markers) if args.markers else None,
+                             extraction_profile=args.extraction_profile,
+                             cache=cache, profile_memory=args.profile_memory, boilerplate=boilerplate,
+                             passwords=read_passwords(args),
+                             page_timeout=args.page_timeout, document_timeout=args.document_timeout)
+    if templates is not None:
+        templates.save()
+    if boilerplate is not None:
+        boilerplate.save()
+    print(f"Parsed {stats.documents} statements ({stats.errors} errors) in {stats.elapsed:.1f}s", file=sys.stderr)
+    if isinstance(sink, SqliteSink):
+        print(f"Ledger: {sink.rows} transactions written to {args.sqlite}", file=sys.stderr)
+    if cache is not None:
+        hits, misses = cache.stats.hits, cache.stats.misses
+        print(f"Cache: {hits['results']} results and {hits['tables']} tables reused, "
+              f"{misses['tables']} statements extracted", file=sys.stderr)
+    if boilerplate is not None:
+        counts = boilerplate.stats
+        print(f"Boilerplate: {counts.pages_skipped} of {counts.pages_seen} pages skipped "
+              f"({counts.hit_rate:.0%}), {len(boilerplate)} known boilerplate pages", file=sys.stderr)
+
+def watch_command(argv: List[str]):
+    from .sinks import JsonLinesSink, SqliteSink
+    from .watch import MANIFEST_NAME, watch_folder
+
+    parser = argparse.ArgumentParser(prog="ocbc_dbs_statement_parser watch",
+                                     description="Follow a folder and parse statements as they arrive")
+    parser.add_argument("directory", help="Folder to watch (subfolders included)")
+    parser.add_argument("-o", "--output", metavar="PATH", help="Append JSON lines to this file instead of stdout")
+    parser.add_argument("--sqlite", metavar="PATH", help="Load results into this SQLite ledger instead")
+    parser.add_argument("--manifest", metavar="PATH",
+                        help=f"File recording what has been parsed (default: {MANIFEST_NAME} in the folder)")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="Seconds between rescans when polling (default: 2)")
+    parser.add_argument("--poll", action="store_true", help="Poll even where inotify is available")
+    parser.add_argument("--once", action="store_true", help="Parse what is new and exit")
+    parser.add_argument("--retry-errors", action="store_true",
+                        help="Parse statements that failed or came back partial in earlier runs once more")
+    parser.add_argument("--verify", action="store_true", help="Verify transaction totals")
+    parser.add_argument("--processes", type=int, default=0, help="Run table extraction in a pool of this many processes")
+    parser.add_argument("--cache", metavar="DIR", help="Statement cache directory to reuse and fill")
+    add_password_arguments(parser)
+    add_budget_arguments(parser)
+    parser.add_argument("--json-backend", choices=BACKENDS, default="auto",
+                        help="JSON encoder (default: orjson when installed, else the standard library)")
+    args = parser.parse_args(argv)
+
+    if args.sqlite and args.output:
+        parser.error("--sqlite and --output are mutually exclusive")
+    if args.sqlite:
+        sink = SqliteSink(args.sqlite)
+    else:
+        out = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+        sink = JsonLinesSink(out, close_fp=bool(args.output), backend=args.json_backend)
+    with sink:
+        try:
+            stats = watch_folder(args.directory, sink, manifest_path=args.manifest, once=args.once,
+                                 interval=args.interval, poll=args.poll, retry_errors=args.retry_errors,
+                                 processes=args.processes,
+                                 verify=args.verify, cache=StatementCache(args.cache) if args.cache else None,
+                                 passwords=read_passwords(args),
+                                 page_timeout=args.page_timeout, document_timeout=args.document_timeout)
+        except KeyboardInterrupt:
+            return
+    print(f"Parsed {stats.documents} statements ({stats.errors} errors)", file=sys.stderr)
+
+def cache_command(argv: List[str]):
+    parser = argparse.ArgumentParser(prog="ocbc_dbs_statement_parser cache",
+                                     description="Inspect or prune the statement result cache")
+    parser.add_argument("action", choices=["stats", "prune"])
+    parser.add_argument("directory", help="Cache directory")
+    parser.add_argument("--max-age", type=float, metavar="DAYS", default=None,
+                        help="prune: remove entries older than this many days")
+    parser.add_argument("--stale", action="store_true",
+                        help="prune: remove entries written for other parsing rules or extraction settings")
+    parser.add_argument("--markers", metavar="PATH", help="prune --stale: markers file the current entries were built with")
+    parser.add_argument("--extraction-profile", metavar="NAME", default=None,
+                        help="prune --stale: extraction profile the current entries were built with")
+    args = parser.parse_args(argv)
+
+    cache = StatementCache(args.directory)
+    if args.action == "stats":
+        for layer, summary in cache.entries().items():
+            print(f"{layer}: {summary['entries']} entries, {summary['bytes'] / 1024:.1f} KiB")
+        print(f"current tables version: {tables_version(args.extraction_profile)}")
+        markers = MarkerConfig.from_file(args.markers) if args.markers else None
+        print(f"current rules version: {rules_version(markers)}")
+        return
+
+    if args.max_age is None and not args.stale:
+        parser.error("prune needs --max-age and/or --stale")
+    versions = {}
+    if args.stale:
+        markers = MarkerConfig.from_file(args.markers) if args.markers else None
+        versions = {"tables_version": tables_version(args.extraction_profile), "rules_version": rules_version(markers)}
+    max_age = args.max_age * 86400 if args.max_age is not None else None
+    removed = cache.prune(max_age=max_age, **versions)
+    print(", ".join(f"{layer}: {count} removed" for layer, count in removed.items()))
+
+COMMANDS = {
+    "ingest": ingest_command,
+    "batch": batch_command,
+    "cache": cache_command,
+    "watch": watch_command,
+}
+
+def cli(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(description="Process bank statement PDF",
+                                     epilog=f"Other commands: {', '.join(COMMANDS)} (run '<command> --help' for details)")
     parser.add_argument("pdf_path", help="Path to the PDF file")
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
     parser.add_argument("--verify", action="store_true", help="Verify transaction totals")
+    parser.add_argument("--templates", metavar="PATH", help="Layout template file to reuse and update")
+    parser.add_argument("--markers", metavar="PATH", help="JSON file with extra non-transaction markers and exclusions")
+    parser.add_argument("--extraction-profile", metavar="NAME", default=None,
+                        help="camelot tuning profile: default, fast, tuned, or a .json profile file")
+    parser.add_argument("--cache", metavar="DIR", help="Statement cache directory to reuse and fill")
+    parser.add_argument("--boilerplate", metavar="PATH",
+                        help="Boilerplate page index to reuse and update; known boilerplate pages skip table extraction")
+    add_password_arguments(parser)
+    add_budget_arguments(parser)
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Report per-stage memory use and top allocation sites in the result metrics")
+    add_output_arguments(parser)
     parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    result = parse_bank_statement(args.pdf_path, args.debug, args.verify)
-    print(json.dumps(result, indent=2, default=decimal_default))
+    templates = TemplateRegistry(args.templates) if args.templates else None
+    markers = MarkerConfig.from_file(args.markers) if args.markers else None
+    cache = StatementCache(args.cache) if args.cache else None
+    boilerplate = BoilerplateIndex(args.boilerplate) if args.boilerplate else None
+    result = parse_bank_statement(args.pdf_path, args.debug, args.verify, templates, markers, args.extraction_profile,
+                                  cache=cache, profile_memory=args.profile_memory, boilerplate=boilerplate,
+                                  passwords=read_passwords(args), page_timeout=args.page_timeout,
+                                  document_timeout=args.document_timeout)
+    write_output(result, args)
 
 if __name__ == "__main__":
-    cli()
\ No newline at end of file
+    cli()
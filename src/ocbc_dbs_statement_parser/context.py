@@ -0,0 +1,135 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .boilerplate import BoilerplateIndex
+from .cache import StatementCache
+from .deadline import TimeBudget
+from .encryption import PasswordCache
+from .extraction import ExtractionProfile
+from .markers import MarkerConfig
+from .memory import MemoryProfiler
+from .templates import TemplateRegistry
+
+if TYPE_CHECKING:
+    from .main import StatementPeriod
+
+
+@dataclass(frozen=True)
+class ParserConfig:
+    """
+    Settings for parsing statements. Immutable, so one config can be shared by any
+    number of threads. It is not sent to worker processes: the caches, indexes and
+    registries it holds have locks and do not pickle, so workers get only what they need.
+    """
+    debug: bool = False
+    verify: bool = False
+    templates: Optional[TemplateRegistry] = None
+    markers: Optional[MarkerConfig] = None
+    extraction_profile: Union[str, ExtractionProfile, None] = None
+    cache: Optional[StatementCache] = None
+    profile_memory: bool = False
+    dispatch: bool = True  # route statements to bank/product-specific parsers (see parsers)
+    boilerplate: Optional[BoilerplateIndex] = None
+    passwords: Tuple[str, ...] = ()  # candidates for encrypted statements
+    password_cache: Optional[PasswordCache] = None  # which password worked per account; process-wide by default
+    time_budget: Optional[TimeBudget] = None  # limits on table extraction time per page and per statement
+
+    def replace(self, **changes) -> 'ParserConfig':
+        return replace(self, **changes)
+
+
+@dataclass
+class ParseContext:
+    """
+    Per-document state threaded through every stage: the config, what has been learned
+    about the statement so far and timing metrics. Each document gets
+    its own context, so concurrent parses never see each other's state.
+    With config.profile_memory, stages are also measured by a MemoryProfiler.
+    """
+    config: ParserConfig = field(default_factory=ParserConfig)
+    file_path: Optional[str] = None
+    statement_date: Optional[str] = None
+    statement_year: Optional[str] = None
+    statement_period: Optional['StatementPeriod'] = None
+    parser: Optional[str] = None  # name of the specialized parser handling the statement
+    account_type: Optional[str] = None  # 'bank_account' or 'credit_card', when known up front
+    page_hashes: Optional[List[str]] = None  # normalized text hash of every page, with a boilerplate index
+    pages: Optional[List[int]] = None  # 1-based pages handed to camelot; None means all
+    transaction_pages: Optional[Set[int]] = field(default_factory=set)  # None when the tables lack their pages
+    password: Optional[str] = None  # the password that opened an encrypted statement; camelot decrypts with it
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    memory: Optional[MemoryProfiler] = None
+
+    def __post_init__(self):
+        if self.config.profile_memory and self.memory is None:
+            self.memory = MemoryProfiler()
+
+    @property
+    def debug(self) -> bool:
+        return self.config.debug
+
+    def log(self, message: str) -> None:
+        if self.config.debug:
+            print(message)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Adds the time spent in the block to metrics['<name>_seconds'].
+        """
+        if self.memory is not None:
+            with self.memory.stage(name), self._timed(name):
+                yield
+        else:
+            with self._timed(name):
+                yield
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            key = f'{name}_seconds'
+            self.metrics[key] = self.metrics.get(key, 0.0) + time.perf_counter() - start
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Ends memory profiling, if enabled, adding its report to the metrics. Returns the metrics.
+        """
+        if self.parser is not None:
+            self.metrics['parser'] = self.parser
+        if self.memory is not None:
+            self.metrics['memory'] = self.memory.report()
+            self.memory.stop()
+        return self.metrics
+
+    @contextmanager
+    def activate(self) -> Iterator['ParseContext']:
+        """
+        Makes this the current context for helpers that are not handed one explicitly.
+        Context variables are per thread, so activating in one worker does not leak into another.
+        """
+        token = _CURRENT.set(self)
+        try:
+            yield self
+        finally:
+            _CURRENT.reset(token)
+
+
+_CURRENT: ContextVar[Optional[ParseContext]] = ContextVar('parse_context', default=None)
+_DEFAULT = ParseContext()
+
+
+def current_context() -> ParseContext:
+    """
+    The context activated by the enclosing parse, or a default (non-debug) one.
+    """
+    return _CURRENT.get() or _DEFAULT
+
+
+def debug_enabled() -> bool:
+    return current_context().config.debug
@@ -0,0 +1,249 @@
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from .workers import PRELOAD_MODULE, worker_context
+
+# Imported by each page worker before it reports ready, so the first page's budget is not spent
+# importing camelot; workers forked from the fork server already have it
+WORKER_PRELOAD = (PRELOAD_MODULE,)
+
+
+@dataclass(frozen=True)
+class TimeBudget:
+    """
+    Wall-clock limits on table extraction, in seconds: for any one page and for all pages of a
+    statement. None means no limit.
+    """
+    page: Optional[float] = None
+    document: Optional[float] = None
+
+    def __post_init__(self):
+        for name in ('page', 'document'):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"the {name} time budget must be positive")
+
+    @classmethod
+    def of(cls, page: Optional[float] = None, document: Optional[float] = None) -> Optional['TimeBudget']:
+        """
+        A budget, or None when neither limit is set.
+        """
+        if page is None and document is None:
+            return None
+        return cls(page, document)
+
+
+class PageTimeout(Exception):
+    pass
+
+
+def _serve(conn, preload: Sequence[str]) -> None:
+    for module in preload:
+        importlib.import_module(module)
+    conn.send(None)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        func, args = request
+        try:
+            response = (True, func(*args))
+        except Exception as e:
+            response = (False, e)
+        try:
+            conn.send(response)
+        except Exception as e:
+            # Exceptions that do not pickle still reach the caller as text
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class PageWorker:
+    """
+    A child process running one call at a time. A call that overruns its timeout is abandoned
+    by killing the process, which is restarted for the next call, so the caller never waits
+    longer than the timeout however badly a PDF behaves.
+    """
+
+    def __init__(self, preload: Sequence[str] = WORKER_PRELOAD):
+        self.preload = tuple(preload)
+        self.restarts = 0
+        self._process: Optional[BaseProcess] = None
+        self._conn: Optional[Connection] = None
+
+    def start(self) -> Connection:
+        """
+        Starts the process unless it is running; returns the connection to it.
+        """
+        if self._conn is not None:
+            return self._conn
+        context = worker_context()
+        parent, child = context.Pipe()
+        process = context.Process(target=_serve, args=(child, self.preload), daemon=True,
+                                     name='statement-page-worker')
+        process.start()
+        child.close()
+        try:
+            parent.recv()  # ready once the preloads are imported
+        except EOFError:
+            process.join()
+            raise RuntimeError(f"page worker exited with code {process.exitcode} while starting")
+        self._process, self._conn = process, parent
+        return parent
+
+    def call(self, func: Callable, args: Tuple, timeout: Optional[float] = None,
+             discard: Optional[Callable[[Any], None]] = None) -> Any:
+        """
+        Runs func(*args) in the worker; raises PageTimeout if it takes longer than timeout seconds.
+        func and args must pickle. A value that arrives after the timeout is passed to discard,
+        to free whatever it holds.
+        """
+        conn = self.start()
+        conn.send((func, args))
+        if not conn.poll(timeout):
+            self.kill(discard)
+            raise PageTimeout(f"gave up after {timeout:.3g}s")
+        try:
+            ok, value = conn.recv()
+        except EOFError:
+            exitcode = self.kill()
+            raise RuntimeError(f"page worker died with exit code {exitcode}")
+        if not ok:
+            raise value
+        return value
+
+    def kill(self, discard: Optional[Callable[[Any], None]] = None) -> Optional[int]:
+        process, conn = self._process, self._conn
+        if process is None or conn is None:
+            return None
+        process.kill()
+        process.join()
+        if discard is not None:
+            self._drain(conn, discard)
+        conn.close()
+        self._process = self._conn = None
+        self.restarts += 1
+        return process.exitcode
+
+    @staticmethod
+    def _drain(conn: Connection, discard: Callable[[Any], None]) -> None:
+        # A response sent just before the process was killed is still in the pipe
+        try:
+            while conn.poll(0):
+                ok, value = conn.recv()
+                if ok:
+                    discard(value)
+        except (EOFError, OSError):
+            pass
+
+    def close(self) -> None:
+        process, conn = self._process, self._conn
+        if process is None or conn is None:
+            return
+        try:
+            conn.send(None)
+        except OSError:
+            pass
+        process.join(1.0)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        conn.close()
+        self._process = self._conn = None
+
+
+class WorkerPool:
+    """
+    Idle PageWorkers kept for reuse, so each thread parsing under a budget checks one out
+    instead of starting a process per statement.
+    """
+
+    def __init__(self, preload: Sequence[str] = WORKER_PRELOAD):
+        self.preload = tuple(preload)
+        self._idle: List[PageWorker] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def worker(self) -> Iterator[PageWorker]:
+        with self._lock:
+            worker = self._idle.pop() if self._idle else PageWorker(self.preload)
+        try:
+            yield worker
+        finally:
+            with self._lock:
+                self._idle.append(worker)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+
+_DEFAULT_POOL = WorkerPool()
+
+
+def default_worker_pool() -> WorkerPool:
+    """
+    The process-wide pool used by parse_bank_statement; its workers exit with the process.
+    """
+    return _DEFAULT_POOL
+
+
+@dataclass
+class BudgetReport:
+    """
+    What extract_pages got through: one result per finished page, in page order. timed_out pages
+    overran the page budget (or what was left of the document budget), skipped pages were never
+    started because the document budget ran out.
+    """
+    results: List[Any] = field(default_factory=list)
+    timed_out: List[int] = field(default_factory=list)
+    skipped: List[int] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.timed_out or self.skipped)
+
+
+def extract_pages(func: Callable, source, profile, pages: Sequence[int], budget: TimeBudget,
+                  worker: PageWorker, password: Optional[str] = None,
+                  discard: Optional[Callable[[Any], None]] = None) -> BudgetReport:
+    """
+    Calls func(source, profile, [page], password) in worker for each page in turn, within budget, and
+    collects what the calls return. Pages that overrun are abandoned and the rest still run,
+    as long as the document budget lasts. Results that will not be returned, because they arrived
+    too late or a later call failed, are passed to discard.
+    """
+    worker.start()
+    report = BudgetReport()
+    start = time.perf_counter()
+    try:
+        for i, page in enumerate(pages):
+            timeout = budget.page
+            if budget.document is not None:
+                remaining = budget.document - (time.perf_counter() - start)
+                if remaining <= 0:
+                    report.skipped = list(pages[i:])
+                    break
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            try:
+                report.results.append(worker.call(func, (source, profile, [page], password), timeout, discard))
+            except PageTimeout:
+                report.timed_out.append(page)
+    except BaseException:
+        if discard is not None:
+            for result in report.results:
+                discard(result)
+        raise
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,119 @@
+import io
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pypdf import PasswordType, PdfReader, PdfWriter
+
+# Statement file names differ by date from month to month; what is left identifies the account
+_FILENAME_DATES = re.compile(r'(?:19|20)\d{2}(?:0[1-9]|1[0-2])(?:[0-3]\d)?|(?<!\d)\d{1,4}(?!\d)'
+                             r'|(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)[A-Z]*')
+_SEPARATORS = re.compile(r'[\W_]+')
+
+
+def account_key(file_path: str) -> str:
+    """
+    Key under which the working password of a statement is remembered: the file name
+    without dates, so monthly statements of one account share it.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0].upper()
+    return ' '.join(_SEPARATORS.sub(' ', _FILENAME_DATES.sub(' ', stem)).split())
+
+
+@dataclass
+class PasswordStats:
+    documents: int = 0  # encrypted documents opened
+    attempts: int = 0  # passwords tried in total
+
+    def to_dict(self) -> Dict[str, int]:
+        return {'documents': self.documents, 'attempts': self.attempts}
+
+
+class PasswordCache:
+    """
+    Remembers which password opened the statements of each account (see account_key) and
+    which passwords worked most recently, so those are tried first. Kept in memory only;
+    passwords are never written to disk.
+    """
+
+    def __init__(self):
+        self.stats = PasswordStats()
+        self._by_account: Dict[str, str] = {}
+        self._recent: List[str] = []
+        self._lock = threading.Lock()
+
+    def candidates(self, key: Optional[str], passwords: Sequence[str]) -> List[str]:
+        """
+        The given passwords, most likely first. Only passwords from the given list are returned.
+        """
+        with self._lock:
+            preferred = [self._by_account[key]] if key in self._by_account else []
+            preferred += self._recent
+        allowed = set(passwords)
+        return list(dict.fromkeys([p for p in preferred if p in allowed] + list(passwords)))
+
+    def remember(self, key: Optional[str], password: str, attempts: int) -> None:
+        with self._lock:
+            if key is not None:
+                self._by_account[key] = password
+            if password in self._recent:
+                self._recent.remove(password)
+            self._recent.insert(0, password)
+            self.stats.documents += 1
+            self.stats.attempts += attempts
+
+
+_DEFAULT_CACHE = PasswordCache()
+
+
+def default_password_cache() -> PasswordCache:
+    """
+    The process-wide cache used when a ParserConfig does not bring its own.
+    """
+    return _DEFAULT_CACHE
+
+
+@dataclass
+class DecryptedPdf:
+    data: bytes  # the decrypted document, for pypdf
+    password: str  # the password that opened it, for readers that decrypt the file themselves (camelot)
+
+
+def decrypt(data: bytes, passwords: Sequence[str], cache: Optional[PasswordCache] = None,
+            key: Optional[str] = None) -> Optional[DecryptedPdf]:
+    """
+    Decrypts a PDF held in memory, or returns None if it is not encrypted.
+    Raises ValueError when none of the passwords opens it.
+    """
+    reader = PdfReader(io.BytesIO(data))
+    if not reader.is_encrypted:
+        return None
+    cache = cache or _DEFAULT_CACHE
+    password, attempts = unlock(reader, cache.candidates(key, passwords))
+    cache.remember(key, password, attempts)
+    buffer = io.BytesIO()
+    PdfWriter(clone_from=reader).write(buffer)
+    return DecryptedPdf(buffer.getvalue(), password)
+
+
+def unlock(reader: PdfReader, candidates: Sequence[str]) -> Tuple[str, int]:
+    """
+    Decrypts an encrypted reader with the first candidate that opens it, trying them in order.
+    Returns that password and the number of attempts; raises ValueError when none opens it.
+    """
+    # An empty user password (owner-only protection) opens without any of the candidates
+    for attempt, password in enumerate(list(candidates) + [''], start=1):
+        if reader.decrypt(password) != PasswordType.NOT_DECRYPTED:
+            return password, attempt
+    raise ValueError(f"None of the {len(candidates)} passwords opens the PDF")
+
+
+def decrypt_pdf(data: bytes, passwords: Sequence[str], cache: Optional[PasswordCache] = None,
+                key: Optional[str] = None) -> Optional[bytes]:
+    """
+    Like decrypt, returning only the decrypted document as bytes.
+    """
+    decrypted = decrypt(data, passwords, cache, key)
+    return None if decrypted is None else decrypted.data
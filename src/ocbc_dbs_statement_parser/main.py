@@ -2,42 +2,119 @@ import camelot
 import pandas as pd
 from pandas import DataFrame, Series
 from pycountry import countries
-from typing import List, Dict, Tuple, Set, Optional
-import re, string
-from datetime import datetime
+from typing import IO, List, Dict, Tuple, Set, Optional, FrozenSet, Iterable, Sequence, Union
+from dataclasses import dataclass, field
+from functools import lru_cache
+import io, re, string, sys
+from datetime import date, datetime, timedelta
 from pypdf import PdfReader
 import warnings
 from decimal import Decimal
+from .boilerplate import BoilerplateIndex, extract_page_texts, page_hash
+from .cache import StatementCache
+from .context import ParseContext, ParserConfig, debug_enabled
+from .deadline import PageTimeout, TimeBudget, WorkerPool, default_worker_pool, extract_pages
+from .encryption import account_key, decrypt, default_password_cache, unlock
+from .extraction import ExtractionProfile, get_profile
+from .markers import DEFAULT_NON_TRANSACTION_MARKERS, MarkerConfig, MarkerMatcher, compile_markers
+from .templates import LayoutTemplate, TemplateRegistry
+from .transport import SharedTables, pack_tables, release_tables, unpack_tables
 
 # Suppress specific warnings
 warnings.filterwarnings("ignore", message="No tables found in table area", module="camelot.parsers.stream")
 
-# Debug output control
-global DEBUG_OUTPUT
-DEBUG_OUTPUT = False
+def extract_tables(file_path: str, profile: Union[str, ExtractionProfile, None] = None,
+                   pages: Optional[Sequence[int]] = None, password: Optional[str] = None) -> List[pd.DataFrame]:
+    """
+    Runs camelot's stream parser over every page, or only the given 1-based pages, with the
+    given extraction profile (a name from extraction.PROFILES, a JSON file path or an ExtractionProfile).
+    Encrypted statements need the password that opens them.
+    """
+    if pages is not None and not pages:
+        return []
+    kwargs = get_profile(profile).camelot_kwargs()
+    page_spec = 'all' if pages is None else ','.join(map(str, pages))
+    tables = camelot.read_pdf(file_path, pages=page_spec, flavor='stream', password=password, **kwargs)
+    dfs = []
+    for table in tables:
+        # Intern cell text right away; statements repeat the same descriptions and blanks many times
+        df = intern_table(table.df)
+        df.attrs['page'] = int(table.page)
+        # Keep the table area and column boundaries camelot inferred so layout templates can reuse them
+        df.attrs['column_separators'] = [float(col[1]) for col in table.cols[:-1]]
+        bbox = getattr(table, '_bbox', None)
+        if bbox:
+            df.attrs['table_area'] = [float(v) for v in bbox]
+        dfs.append(df)
+    return dfs
+
+def extract_shared_tables(file_path: str, profile: Union[str, ExtractionProfile, None] = None,
+                          pages: Optional[Sequence[int]] = None,
+                          password: Optional[str] = None) -> Union[SharedTables, List[pd.DataFrame]]:
+    """
+    extract_tables for worker processes: the tables come back packed in shared memory
+    (see transport.pack_tables) for receive_tables to unpack in the parent.
+    """
+    return pack_tables(extract_tables(file_path, profile, pages, password))
 
-def extract_tables(file_path: str) -> List[pd.DataFrame]:
-    tables = camelot.read_pdf(file_path, pages='all', flavor='stream')
-    return [table.df for table in tables]
+def receive_tables(packed: Union[SharedTables, List[pd.DataFrame]]) -> List[pd.DataFrame]:
+    """
+    Tables returned by extract_shared_tables in another process, with their strings interned.
+    """
+    if isinstance(packed, SharedTables):
+        return unpack_tables(packed)
+    # Pickled tables, where shared memory is not available
+    return [intern_table(table) for table in packed]
+
+def receive_all_tables(results: List[Union[SharedTables, List[pd.DataFrame]]]) -> List[pd.DataFrame]:
+    """
+    receive_tables for each result in turn. If one fails, the shared memory of the
+    results after it is freed before the error propagates.
+    """
+    tables: List[pd.DataFrame] = []
+    for i, packed in enumerate(results):
+        try:
+            tables.extend(receive_tables(packed))
+        except BaseException:
+            for rest in results[i + 1:]:
+                release_tables(rest)
+            raise
+    return tables
 
 # Hoisting the regex patterns so they're shared across functions
 DATE_PATTERN = re.compile(r'\d{1,2}[/-]\d{1,2}([/-]\d{2,4})?|\d{1,2} \w{3}')
 DESCRIPTION_PATTERN = re.compile(r'^(?!\d{1,2}[/-]\d{1,2}|[A-Za-z]{3} \d{1,2})(?!\(?\d{1,3}(,\d{3})*(\.\d{2})?\)?\s*(CR|DR)?)[A-Za-z0-9* .#:()/-]+$')
 CURRENCY_PATTERN = re.compile(r'\(?\$?\s*\d{1,}(,\d{2,3})*(\.\d{2})\)?\s*(CR|DR)?')
+FILENAME_YEAR_PATTERN = re.compile(r'(20[1-4][0-9]|2050)')
+
+# Cache versions (see cache.py). The rules version already covers every module-level regex and
+# keyword list; bump these when table extraction or parsing logic changes in other ways.
+TABLES_REVISION = 2
+RULES_REVISION = 3
+
+# Everything outside string.printable is dropped: non-ASCII characters by an ascii/ignore
+# encode, and the remaining ASCII control characters by a bytes deletion table
+_NON_PRINTABLE_ASCII = bytes(i for i in range(128) if chr(i) not in string.printable)
+CLEAN_TEXT_CACHE_SIZE = 65536
+
+@lru_cache(maxsize=CLEAN_TEXT_CACHE_SIZE)
+def _clean_str(text: str) -> str:
+    return ' '.join(text.encode('ascii', 'ignore').translate(None, _NON_PRINTABLE_ASCII).decode('ascii').split())
 
 def clean_text(text: str) -> str:
     """
     Cleans the input text by removing non-printable characters,
     trimming whitespace, and normalizing spaces between words.
+    Results for repeated cell strings come from a bounded LRU cache.
     """
-    return ' '.join(''.join(c for c in str(text) if c in string.printable).split())
+    return _clean_str(text if type(text) is str else str(text))
 
 def detect_merged_rows(col_str: str) -> bool:
     """
     Detects if there are multiple parts (e.g., date, description, currency) in the column string
     or if there are merged rows that need to be split.
     """
-    if DEBUG_OUTPUT:
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: detect_merged_rows input: {col_str}")
     parts = col_str.split("\n")
 
@@ -50,7 +127,7 @@ def detect_merged_rows(col_str: str) -> bool:
         if (part1.lower() == "transaction" and part2.lower() == "value") or \
            (part1.lower() == "deposit" and part2.lower() == "balance") or \
            (part1.lower() == "date" and part2.lower() == "date"):
-            if DEBUG_OUTPUT:
+            if debug_enabled():
                 print("DEBUG_OUTPUT: detect_merged_rows output: True")
             return True
 
@@ -64,7 +141,7 @@ def detect_merged_rows(col_str: str) -> bool:
         ]
         for pattern1, pattern2 in pattern_combos:
             if pattern1.search(part1) and pattern2.search(part2):
-                if DEBUG_OUTPUT:
+                if debug_enabled():
                     print("DEBUG_OUTPUT: detect_merged_rows output: True")
                 return True
 
@@ -72,13 +149,13 @@ def detect_merged_rows(col_str: str) -> bool:
     elif len(parts) == 3:
         # Check for specific text cases
         if col_str.lower() == "transaction\ndate\ndescription":
-            if DEBUG_OUTPUT:
+            if debug_enabled():
                 print("DEBUG_OUTPUT: detect_merged_rows output: True")
             return True
         
         # Check for general pattern combinations
         pattern_combos = [DATE_PATTERN, DESCRIPTION_PATTERN, CURRENCY_PATTERN]
-        if DEBUG_OUTPUT:
+        if debug_enabled():
             print(f"DEBUG_OUTPUT: detect_merged_rows output: {all(pattern.search(part) for pattern, part in zip(pattern_combos, parts))}")
         return all(pattern.search(part) for pattern, part in zip(pattern_combos, parts))
     return False
@@ -89,7 +166,7 @@ def split_and_rebuild_row(row: Series, col_str: str, split_col_idx: int, split_c
     Assigns the first part to the left subcolumn and the second part to the right subcolumn.
     If there's only one part, assigns it to the right subcolumn and sets the left to NaN.
     """
-    if DEBUG_OUTPUT:
+    if debug_enabled():
         print(f"""DEBUG_OUTPUT: split_and_rebuild_row input:
                 row=pd.Series({row.tolist()!r})
                 col_str={col_str!r}
@@ -121,31 +198,79 @@ def split_and_rebuild_row(row: Series, col_str: str, split_col_idx: int, split_c
         # Handle unexpected number of parts by assigning NaN
         row[split_col_idx] = ''
         row[split_col_idx + 1] = ''
-    if DEBUG_OUTPUT:
+    if debug_enabled():
         print(f"""DEBUG_OUTPUT: split_and_rebuild_row output:
                 row=pd.Series({row.tolist()!r})
                 """)
     return row
 
+BANK_ACCOUNT_KEYWORDS = ['withdrawal', 'deposit', 'balance']
+BANK_ACCOUNT_HEADER_KEYWORDS = ['date', 'description', 'withdrawal', 'deposit', 'balance']
+CREDIT_CARD_HEADER_KEYWORDS = ['date', 'description', 'amount']
+_PROFILE_KEYWORDS = sorted(set(BANK_ACCOUNT_KEYWORDS + BANK_ACCOUNT_HEADER_KEYWORDS + CREDIT_CARD_HEADER_KEYWORDS))
+
+def _row_keywords(lowered_cells: Iterable[str]) -> FrozenSet[str]:
+    # Cells are joined with a separator that never occurs in a keyword, so a substring
+    # hit on the joined text is equivalent to a hit in at least one cell
+    joined = '\x1f'.join(lowered_cells)
+    return frozenset(keyword for keyword in _PROFILE_KEYWORDS if keyword in joined)
+
+def _is_header_keywords(keywords: FrozenSet[str]) -> bool:
+    return keywords.issuperset(BANK_ACCOUNT_HEADER_KEYWORDS) or keywords.issuperset(CREDIT_CARD_HEADER_KEYWORDS)
+
 def is_header_row(row: Series) -> bool:
     """
     Determines if a given row is the header row based on the presence of specific keywords.
     """
-    # Define header keywords
-    bank_account_header_keywords = ['date', 'description', 'withdrawal', 'deposit', 'balance']
-    credit_card_header_keywords = ['date', 'description', 'amount']
     # Convert all cells in the row to lowercase strings for case-insensitive comparison
-    row_lower = row.astype(str).str.lower()
-    
-    # Check if all header keywords are present in the row
-    return (
-        all(any(keyword in cell for cell in row_lower) for keyword in bank_account_header_keywords) or
-        all(any(keyword in cell for cell in row_lower) for keyword in credit_card_header_keywords)
-    )
+    return _is_header_keywords(_row_keywords(row.astype(str).str.lower()))
+
+@dataclass
+class TableProfile:
+    """
+    Everything the detection and extraction stages need to know about a table's header,
+    computed in a single lowercase pass (or taken from a layout template).
+    """
+    header_index: Optional[int]
+    header_mapping: Dict[str, int]
+    is_bank_account: bool
+    header_keywords: FrozenSet[str] = frozenset()
+    template: Optional[LayoutTemplate] = None
+
+    @property
+    def account_type(self) -> str:
+        return 'bank_account' if self.is_bank_account else 'credit_card'
+
+    @classmethod
+    def from_template(cls, template: LayoutTemplate, header_index: int) -> 'TableProfile':
+        return cls(header_index, template.header_mapping, template.is_bank_account, template=template)
 
-def is_transaction_row(row: Series) -> bool:
+def profile_table(table: DataFrame) -> TableProfile:
+    """
+    Lowercases the table once and finds the header row, the account type
+    and the column-to-field mapping together.
+    """
+    header_index: Optional[int] = None
+    header_lower: List[str] = []
+    header_keywords: FrozenSet[str] = frozenset()
+    top_keywords: Set[str] = set()
+    for row_idx, row in enumerate(table.itertuples(index=False)):
+        if row_idx >= 10 and header_index is not None:
+            break
+        lowered = [str(cell).lower() for cell in row]
+        keywords = _row_keywords(lowered)
+        if row_idx < 10:
+            top_keywords.update(keywords)
+        if header_index is None and _is_header_keywords(keywords):
+            header_index = row_idx
+            header_lower = lowered
+            header_keywords = keywords
+    header_mapping = build_header_mapping(header_lower) if header_index is not None else {}
+    return TableProfile(header_index, header_mapping, top_keywords.issuperset(BANK_ACCOUNT_KEYWORDS), header_keywords)
+
+def is_transaction_row(row: Iterable) -> bool:
     # Simple transaction detection: Date → Description → Currency
-    if DEBUG_OUTPUT:
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: is_transaction_row input: {row}")
     found_date = found_description = found_currency = False
     for col_value in row:
@@ -163,27 +288,46 @@ def is_transaction_row(row: Series) -> bool:
             found_currency = True
             break
 
-    if DEBUG_OUTPUT:
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: is_transaction_row output: {found_date and found_description and found_currency}")
     return found_date and found_description and found_currency
 
 def clean_and_detect_transaction_table(table: DataFrame) -> Tuple[DataFrame, bool]:
-    if DEBUG_OUTPUT:
+    processed_table, is_transaction, _ = process_table(table)
+    return processed_table, is_transaction
+
+def process_table(table: DataFrame, templates: Optional[TemplateRegistry] = None) -> Tuple[DataFrame, bool, TableProfile]:
+    """
+    Splits merged columns and detects transaction rows.
+    When a template registry is given, known layouts skip header detection entirely
+    and unseen layouts are learned from the generic detection result.
+    """
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: clean_and_detect_transaction_table input: table=\n{format_dataframe_for_debug(table)}")
     modified_table: List[Series] = []
     split_columns_info: Dict[int, List[str]] = {}  # Maps original column index to subcolumn names
     split_counts: Dict[int, int] = {}  # Keeps track of the number of new columns added at each split
 
+    # Reuse the stored layout when this header has been seen before
+    layout_match = templates.match(table) if templates is not None else None
+    if layout_match is not None:
+        split_columns_info = {k: list(v) for k, v in layout_match.template.split_columns.items()}
+        raw_profile = None
+        header_index = layout_match.header_index
+    else:
+        raw_profile = profile_table(table)
+        header_index = raw_profile.header_index
+
     # Helper function to get current column index based on splits
     def get_current_col_idx(col_idx):
         return col_idx + sum(split_counts.get(idx, 0) for idx in split_counts if idx < col_idx)
     # First, process the header row to determine splits and shifts
-    header_processed = False
-    for _, row in table.iterrows():
+    for row_idx, (_, row) in enumerate(table.iterrows()):
         new_row = row.copy()
 
-        if not header_processed and is_header_row(row):
-            header_processed = True
+        if header_index is None or row_idx < header_index:
+            modified_table.append(new_row)
+        elif layout_match is None and row_idx == header_index:
             # Detect and split merged columns in the header
             columns_to_split = [col_idx for col_idx, col_value in enumerate(row) if detect_merged_rows(str(col_value))]
             
@@ -217,24 +361,54 @@ def clean_and_detect_transaction_table(table: DataFrame) -> Tuple[DataFrame, boo
 
     # Check if any row is a transaction row
     is_transaction = any(is_transaction_row(row) for row in processed_table.itertuples(index=False))
+
+    if layout_match is not None:
+        profile = TableProfile.from_template(layout_match.template, layout_match.header_index)
+    elif raw_profile is not None and not split_columns_info:
+        # Nothing was split, so the processed rows are the raw rows
+        profile = raw_profile
+    else:
+        profile = profile_table(processed_table)
+
+    # Learn the layout the first time its header is seen
+    if templates is not None and layout_match is None and header_index is not None:
+        profile.template = templates.learn(
+            table.iloc[header_index],
+            split_columns_info,
+            profile.header_mapping,
+            profile.header_keywords.issuperset(BANK_ACCOUNT_KEYWORDS),
+            table.attrs.get('column_separators'),
+            table.attrs.get('table_area'),
+        )
     
-    if is_transaction and DEBUG_OUTPUT:
+    if is_transaction and debug_enabled():
         print("\nProcessed Table:")
         print(f"\033[92m{processed_table}\033[0m")  # Green text for visibility
     
-    if DEBUG_OUTPUT:
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: clean_and_detect_transaction_table output: processed_table=\n{format_dataframe_for_debug(processed_table)}, is_transaction={is_transaction}")
-    return processed_table, is_transaction
+    return processed_table, is_transaction, profile
 
-def is_bank_account_table(table: pd.DataFrame) -> bool:
+def is_bank_account_table(table: pd.DataFrame, profile: Optional[TableProfile] = None) -> bool:
     # Check if the table contains headers typically found in bank account statements
-    if DEBUG_OUTPUT:
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: is_bank_account_table input: \n{format_dataframe_for_debug(table)}")
-    header_keywords = ['withdrawal', 'deposit', 'balance']
-    header_row = table.iloc[:10].astype(str).apply(lambda x: x.str.lower())
-    if DEBUG_OUTPUT:
-        print(f"DEBUG_OUTPUT: is_bank_account_table output: {all(any(keyword in cell for cell in header_row.values.flatten()) for keyword in header_keywords)}")
-    return all(any(keyword in cell for cell in header_row.values.flatten()) for keyword in header_keywords)
+    if profile is None:
+        profile = profile_table(table)
+    if debug_enabled():
+        print(f"DEBUG_OUTPUT: is_bank_account_table output: {profile.is_bank_account}")
+    return profile.is_bank_account
+
+def contradicts_account_type(account_type: str, profiles: List[TableProfile]) -> bool:
+    """
+    Whether the header rows of a statement's transaction tables rule out the account type a
+    parser was dispatched for: a bank account has a Withdrawal or Deposit column, a credit card
+    statement has neither pair.
+    """
+    columns = [{'Withdrawal', 'Deposit'} & profile.header_mapping.keys() for profile in profiles]
+    if account_type == 'bank_account':
+        return not any(columns)
+    return any(len(found) == 2 for found in columns)
 
 def parse_amount(amount_str: str) -> float:
     amount_str = amount_str.replace(',', '').replace(' ', '')
@@ -258,45 +432,108 @@ def parse_amount(amount_str: str) -> float:
     except ValueError:
         return 0
 
-def is_location(value_str):
-    # Dynamic location detection using pycountry
-    if DEBUG_OUTPUT:
-        print(f"DEBUG_OUTPUT: is_location input: {value_str}")
+@lru_cache(maxsize=None)
+def location_keywords() -> FrozenSet[str]:
+    """
+    Upper-cased country codes and names, built from pycountry once per process.
+    """
     country_codes = {country.alpha_2 for country in countries}
     country_codes.update({country.alpha_3 for country in countries})
     country_names = {country.name.upper() for country in countries}
-    location_keywords = country_codes.union(country_names)
-    if DEBUG_OUTPUT:
-        print(f"DEBUG_OUTPUT: is_location output: {value_str.upper() in location_keywords}")
-    return value_str.upper() in location_keywords
+    return frozenset(country_codes.union(country_names))
 
-NON_TRANSACTION_MARKERS = {
-    'BALANCE B/F', 'BALANCE C/F', 'SUB-TOTAL', 'SUBTOTAL', 'TOTAL', 'NEW TRANSACTIONS',
-    'Total Balance Carried Forward'
-}
+def is_location(value_str):
+    # Dynamic location detection using pycountry
+    if debug_enabled():
+        print(f"DEBUG_OUTPUT: is_location input: {value_str}")
+    if debug_enabled():
+        print(f"DEBUG_OUTPUT: is_location output: {value_str.upper() in location_keywords()}")
+    return value_str.upper() in location_keywords()
+
+NON_TRANSACTION_MARKERS = set(DEFAULT_NON_TRANSACTION_MARKERS)
+DEFAULT_MARKERS = MarkerConfig()
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+def intern_table(table: DataFrame) -> DataFrame:
+    """
+    Interns every string cell, so text repeated across rows and tables
+    (descriptions, dates, blank cells) is stored once.
+    """
+    interned = pd.DataFrame(
+        [[_intern(value) for value in row] for row in table.itertuples(index=False)],
+        index=table.index, columns=table.columns,
+    )
+    interned.attrs.update(table.attrs)
+    return interned
+
+class NormalizedTable:
+    """
+    Per-table normalization pass: every cell is converted once into its str(),
+    clean_text() and upper-cased forms (all interned), so the extraction stages
+    compare against precomputed data instead of re-deriving it per lookup.
+    """
+
+    def __init__(self, table: DataFrame):
+        self.table = table
+        self.text: List[List[str]] = []
+        self.cleaned: List[List[str]] = []
+        self.upper: List[List[str]] = []
+        self.present: List[List[bool]] = []
+        for row in table.itertuples(index=False):
+            self.text.append([_intern(str(value)) for value in row])
+            cleaned = [_intern(clean_text(value)) for value in row]
+            self.cleaned.append(cleaned)
+            self.upper.append([_intern(value.upper()) for value in cleaned])
+            self.present.append([bool(pd.notna(value) and value != '') for value in row])
+        self._transaction_rows: List[Optional[bool]] = [None] * len(self.text)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def is_transaction_row(self, row_idx: int) -> bool:
+        # Each row is checked by its own extractor pass and by up to 10 look-ahead windows
+        flag = self._transaction_rows[row_idx]
+        if flag is None:
+            flag = self._transaction_rows[row_idx] = is_transaction_row(self.text[row_idx])
+        return flag
+
+    def is_location(self, row_idx: int, col_idx: int) -> bool:
+        return self.upper[row_idx][col_idx] in location_keywords()
 
 def get_additional_description(table_slice: pd.DataFrame, non_transaction_markers: Set[str]) -> str:
-    if DEBUG_OUTPUT:
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: get_additional_description input: table_slice=\n{format_dataframe_for_debug(table_slice)}\nnon_transaction_markers={non_transaction_markers}")
+    normalized = NormalizedTable(table_slice)
+    marker_matcher = compile_markers(frozenset(non_transaction_markers))
+    additional_text = collect_additional_description(normalized, 0, len(normalized), marker_matcher)
+    if debug_enabled():
+        print(f"DEBUG_OUTPUT: get_additional_description output: {additional_text}")
+    return additional_text
+
+def collect_additional_description(normalized: NormalizedTable, start: int, stop: int, marker_matcher: MarkerMatcher) -> str:
+    """
+    Joins the continuation rows in [start, stop) up to the next transaction or marker row.
+    """
     additional_text = []
     
-    for _, row in table_slice.iterrows():
-        if is_transaction_row(row) or any(
-            marker in clean_text(str(val)).upper() for val in row for marker in non_transaction_markers
-        ):
+    for row_idx in range(start, min(stop, len(normalized))):
+        upper_row = normalized.upper[row_idx]
+        if normalized.is_transaction_row(row_idx) or marker_matcher.search_any(upper_row):
             break
         
+        cleaned_row = normalized.cleaned[row_idx]
+        present_row = normalized.present[row_idx]
         row_text = ' '.join(
-            clean_text(str(val)) for val in row
-            if pd.notna(val) and val != '' and not is_location(clean_text(str(val)))
+            cleaned_row[col_idx] for col_idx in range(len(cleaned_row))
+            if present_row[col_idx] and upper_row[col_idx] not in location_keywords()
         )
         
         # Ignore rows with repeated single characters or numbers
         if row_text and not all(len(word) == 1 for word in row_text.split()):
             additional_text.append(row_text)
     
-    if DEBUG_OUTPUT:
-        print(f"DEBUG_OUTPUT: get_additional_description output: {' '.join(additional_text)}")
     return ' '.join(additional_text)
 
 def standardize_date(date_str, year=None):    
@@ -340,6 +577,72 @@ def standardize_date(date_str, year=None):
     # If all parsing attempts fail, return the original string
     return date_str
 
+# Transaction dates as standardize_date reads them: dd/mm, dd/mm/yyyy or dd Mon
+TRANSACTION_DATE_PATTERN = re.compile(
+    r'^(?:(?P<day>\d{1,2})/(?P<month>\d{1,2})(?:/(?P<year>\d{4}))?|(?P<name_day>\d{1,2})\s+(?P<month_name>[A-Za-z]{3}))$'
+)
+# Dates up to this many days after the statement end still belong to its year (late postings);
+# later month/day combinations are from the previous year
+ROLLOVER_SLACK_DAYS = 31
+
+def _numbers(values: pd.Series) -> pd.Series:
+    return pd.Series(pd.to_numeric(values, errors='coerce'), index=values.index, dtype=float)
+
+def _date_parts(raw: pd.Series) -> pd.DataFrame:
+    parts = raw.astype(str).str.strip().str.extract(TRANSACTION_DATE_PATTERN)
+    return pd.DataFrame({
+        'day': _numbers(parts['day'].fillna(parts['name_day'])),
+        'month': _numbers(parts['month']).fillna(parts['month_name'].str.lower().map(_MONTHS)),
+        'year': _numbers(parts['year']),
+    }, index=raw.index)
+
+def _to_datetime(year, month, day) -> pd.Series:
+    return pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': day}), errors='coerce')
+
+def resolve_dates(raw: pd.Series, period: Optional['StatementPeriod'] = None,
+                  statement_year: Union[str, int, None] = None) -> pd.Series:
+    """
+    Resolves a whole column of printed transaction dates to a datetime64 column in one pass.
+    Dates without a year are placed in the statement period: they take the end date's year,
+    unless that would put them more than ROLLOVER_SLACK_DAYS after the end, in which case
+    they belong to the year before (a 15 Dec - 14 Jan statement's December rows).
+    Without a period, statement_year is used. Unparseable dates, or dates whose year
+    cannot be determined, are NaT.
+    """
+    parts = _date_parts(raw)
+    year = parts['year'].copy()
+    missing = year.isna()
+    if period is not None:
+        # Plain datetime arithmetic: period.end is a date, never NaT
+        latest = datetime.combine(period.end, datetime.min.time()) + timedelta(days=ROLLOVER_SLACK_DAYS)
+        candidate = _to_datetime(period.end.year, parts['month'], parts['day'])
+        rollover = candidate > latest
+        year[missing] = period.end.year - rollover[missing].astype(int)
+    elif statement_year:
+        year[missing] = int(statement_year)
+    return _to_datetime(year, parts['month'], parts['day'])
+
+def assign_dates(transactions: List[Dict], statement_year=None, period: Optional['StatementPeriod'] = None) -> None:
+    """
+    Replaces the printed 'Date' of every transaction with its resolved date, formatted as
+    standardize_date does: "dd Month yyyy", "dd Month" when no year is known, or the printed
+    text if it is not a date.
+    """
+    rows = [t for t in transactions if 'Date' in t]
+    if not rows:
+        return
+    raw = pd.Series([t['Date'] for t in rows], dtype=object)
+    dates = resolve_dates(raw, period, statement_year)
+    formatted = dates.dt.strftime('%d %B %Y').astype(object)
+    undated = dates.isna()
+    if undated.any():
+        # No year known: validate day and month against a leap year and leave the year out
+        parts = _date_parts(raw.loc[undated])
+        yearless = _to_datetime(2000, parts['month'], parts['day']).dt.strftime('%d %B')
+        formatted[undated] = yearless.where(yearless.notna(), raw[undated])
+    for transaction, value in zip(rows, formatted.tolist()):
+        transaction['Date'] = value
+
 def format_dataframe_for_debug(df):
     formatted = "pd.DataFrame({\n"
     for col in df.columns:
@@ -347,8 +650,81 @@ def format_dataframe_for_debug(df):
     formatted += "})"
     return formatted
 
-def extract_bank_account_transactions(tables: List[pd.DataFrame], statement_year=None) -> List[Dict]:
-    if DEBUG_OUTPUT:
+def build_header_mapping(header_row: Iterable) -> Dict[str, int]:
+    """
+    Maps transaction keys to column positions based on the header row text.
+    """
+    header_mapping = {}
+    for i, header in enumerate(header_row):
+        header_lower = str(header).lower()
+        if 'date' in header_lower:
+            header_mapping['Date'] = i
+        elif any(word in header_lower for word in ['withdrawal', 'debit']):
+            header_mapping['Withdrawal'] = i
+        elif any(word in header_lower for word in ['deposit', 'credit']):
+            header_mapping['Deposit'] = i
+        elif 'balance' in header_lower:
+            header_mapping['Balance'] = i
+        elif any(word in header_lower for word in ['description', 'transaction', 'particulars']):
+            header_mapping['Description'] = i
+    return header_mapping
+
+# Consolidated statements list several accounts, each under its own account number and
+# opening balance row; either one starts a new section. Matched at the start of a cell of a
+# row that is not a transaction, so a description like "FUND TRANSFER TO ACCOUNT NO 123-45678-9"
+# never starts a section
+ACCOUNT_SECTION_PATTERN = re.compile(
+    r'\s*(?:(?P<opening>BALANCE\s+(?:B/F|BROUGHT\s+FORWARD)\b)'
+    r'|ACCOUNT\s+(?:NO\.?|NUMBER)\s*:?\s*(?P<number>\d[\d-]{4,}\d))'
+)
+
+def match_account_section(cells: List[str]) -> Optional[re.Match]:
+    """
+    The account number or balance brought forward that an upper-cased, non-transaction row
+    starts a section with, if any.
+    """
+    for cell in cells:
+        if 'BALANCE' in cell or 'ACCOUNT' in cell:
+            match = ACCOUNT_SECTION_PATTERN.match(cell)
+            if match:
+                return match
+    return None
+
+@dataclass
+class AccountSection:
+    account: Optional[str] = None  # account number from the section header, if printed
+    transactions: List[Dict] = field(default_factory=list)
+
+def extract_bank_account_transactions(tables: List[pd.DataFrame], statement_year=None,
+                                      profiles: Optional[List[TableProfile]] = None,
+                                      normalized_tables: Optional[List[NormalizedTable]] = None,
+                                      markers: Optional[MarkerConfig] = None,
+                                      period: Optional['StatementPeriod'] = None) -> List[Dict]:
+    """
+    Transactions of every account in the statement. When it holds more than one account,
+    each transaction's 'Account' names the account it belongs to (see extract_account_sections).
+    With the statement period, dates without a year are resolved across a year end (see resolve_dates).
+    """
+    sections = extract_account_sections(tables, statement_year, profiles, normalized_tables, markers, period)
+    if len(sections) < 2:
+        return [t for section in sections for t in section.transactions]
+    transactions = []
+    for number, section in enumerate(sections, start=1):
+        account = section.account or f'Account {number}'
+        transactions.extend({**t, 'Account': account} for t in section.transactions)
+    return transactions
+
+def extract_account_sections(tables: List[pd.DataFrame], statement_year=None,
+                             profiles: Optional[List[TableProfile]] = None,
+                             normalized_tables: Optional[List[NormalizedTable]] = None,
+                             markers: Optional[MarkerConfig] = None,
+                             period: Optional['StatementPeriod'] = None) -> List[AccountSection]:
+    """
+    Splits the statement's transactions into one section per account, starting a new section
+    at each account number or balance brought forward row that follows transactions.
+    Tables without such rows continue the current account, e.g. on the next page.
+    """
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: extract_bank_account_transactions input: tables=")
         print("[")
         for table in tables:
@@ -356,46 +732,51 @@ def extract_bank_account_transactions(tables: List[pd.DataFrame], statement_year
         print("]")
         print(f"statement_year={statement_year}")
     
-    transactions = []
+    sections = [AccountSection()]
+    transactions = sections[0].transactions
+    marker_matcher = (markers or DEFAULT_MARKERS).marker_matcher
 
-    for table in tables:
-        # Find the header row
-        header_row = None
-        for idx, row in table.iterrows():
-            if is_header_row(row):
-                header_row = row
-                break
-        
-        if header_row is None:
+    for table_idx, table in enumerate(tables):
+        # Reuse the detection stage's profile when available
+        profile = profiles[table_idx] if profiles else profile_table(table)
+        if profile.header_index is None:
             continue  # Skip this table if no header row found
-
-        # Map headers to transaction keys
-        header_mapping = {}
-        for i, header in enumerate(header_row):
-            header_lower = str(header).lower()
-            if 'date' in header_lower:
-                header_mapping['Date'] = i
-            elif any(word in header_lower for word in ['withdrawal', 'debit']):
-                header_mapping['Withdrawal'] = i
-            elif any(word in header_lower for word in ['deposit', 'credit']):
-                header_mapping['Deposit'] = i
-            elif 'balance' in header_lower:
-                header_mapping['Balance'] = i
-            elif any(word in header_lower for word in ['description', 'transaction', 'particulars']):
-                header_mapping['Description'] = i
+        header_mapping = profile.header_mapping
+        normalized = normalized_tables[table_idx] if normalized_tables else NormalizedTable(table)
 
         # Extract transactions
         current_transaction = None
-        for idx, row in table.iterrows():
-            if is_transaction_row(row):
+        for idx_pos in range(len(normalized)):
+            section_match = (None if normalized.is_transaction_row(idx_pos)
+                             else match_account_section(normalized.upper[idx_pos]))
+            if section_match:
+                if current_transaction:
+                    transactions.append(current_transaction)
+                    current_transaction = None
+                number = section_match.group('number')
+                if number:
+                    # Account headers are repeated on continuation pages
+                    continues = number == sections[-1].account
+                else:
+                    # So is the balance brought forward, which then equals the running balance
+                    balance_col = header_mapping.get('Balance')
+                    opening = (parse_amount(normalized.cleaned[idx_pos][balance_col])
+                               if balance_col is not None and balance_col < len(normalized.cleaned[idx_pos]) else None)
+                    continues = bool(transactions) and opening == transactions[-1].get('Balance')
+                if transactions and not continues:
+                    sections.append(AccountSection())
+                    transactions = sections[-1].transactions
+                if number:
+                    sections[-1].account = number
+            if normalized.is_transaction_row(idx_pos):
                 if current_transaction:
                     transactions.append(current_transaction)
                 current_transaction = {}
 
                 for key, col_idx in header_mapping.items():
-                    value = clean_text(str(row.iloc[col_idx]))
+                    value = normalized.cleaned[idx_pos][col_idx]
                     if key == 'Date':
-                        current_transaction[key] = standardize_date(value, statement_year)
+                        current_transaction[key] = value  # resolved for the whole statement below
                     elif key == 'Withdrawal':
                         current_transaction[key] = -parse_amount(value)
                     elif key in ['Deposit', 'Balance']:
@@ -403,22 +784,25 @@ def extract_bank_account_transactions(tables: List[pd.DataFrame], statement_year
                     else:
                         current_transaction[key] = value
 
-                # Get the integer position of idx
-                idx_pos = table.index.get_loc(idx)
                 # Check next row for additional description
-                additional_text = get_additional_description(table.iloc[idx_pos+1:idx_pos+11].copy(), NON_TRANSACTION_MARKERS)
+                additional_text = collect_additional_description(normalized, idx_pos+1, idx_pos+11, marker_matcher)
                 if additional_text:
                     current_transaction['Description'] += ' ' + additional_text
 
         if current_transaction:
             transactions.append(current_transaction)
 
-    if DEBUG_OUTPUT:
-        print(f"DEBUG_OUTPUT: extract_bank_account_transactions output: transactions={transactions}")
-    return transactions
+    sections = [section for section in sections if section.transactions]
+    assign_dates([t for section in sections for t in section.transactions], statement_year, period)
+    if debug_enabled():
+        print(f"DEBUG_OUTPUT: extract_bank_account_transactions output: sections={sections}")
+    return sections
 
-def extract_credit_card_transactions(tables: List[pd.DataFrame], statement_year=None) -> List[Dict]:
-    if DEBUG_OUTPUT:
+def extract_credit_card_transactions(tables: List[pd.DataFrame], statement_year=None,
+                                     normalized_tables: Optional[List[NormalizedTable]] = None,
+                                     markers: Optional[MarkerConfig] = None,
+                                     period: Optional['StatementPeriod'] = None) -> List[Dict]:
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: extract_credit_card_transactions input: tables=")
         print("[")
         for table in tables:
@@ -427,12 +811,15 @@ def extract_credit_card_transactions(tables: List[pd.DataFrame], statement_year=
         print(f"statement_year={statement_year}")
     
     transactions = []
-    excluded_pattern = re.compile(r'AUTO-PYT FROM ACCT#\d+ REF NO: \d+|PAYMENT BY GIRO')
+    markers = markers or DEFAULT_MARKERS
+    marker_matcher = markers.marker_matcher
+    exclusion_matcher = markers.exclusion_matcher
 
-    for table in tables:
+    for table_idx, table in enumerate(tables):
+        normalized = normalized_tables[table_idx] if normalized_tables else NormalizedTable(table)
         current_transaction = {}
-        for idx, row in table.iterrows():
-            if is_transaction_row(row):
+        for idx_pos in range(len(normalized)):
+            if normalized.is_transaction_row(idx_pos):
                 if current_transaction:
                     transactions.append(current_transaction)
                 current_transaction = {}
@@ -440,28 +827,25 @@ def extract_credit_card_transactions(tables: List[pd.DataFrame], statement_year=
                 description_parts = []
                 date_found = amount_found = False
 
-                for value in row:
-                    value_str = clean_text(value)
+                for col_idx, value_str in enumerate(normalized.cleaned[idx_pos]):
                     if not date_found and DATE_PATTERN.match(value_str):
-                        current_transaction['Date'] = standardize_date(value_str, statement_year)
+                        current_transaction['Date'] = value_str
                         date_found = True
                     elif not amount_found and CURRENCY_PATTERN.search(value_str):
                         current_transaction['Amount'] = -parse_amount(value_str)
                         amount_found = True
-                    elif not is_location(value_str) and value_str != '':
+                    elif not normalized.is_location(idx_pos, col_idx) and value_str != '':
                         description_parts.append(value_str)
 
                 current_transaction['Description'] = ' '.join(description_parts)
 
-                # Get the integer position of idx
-                idx_pos = table.index.get_loc(idx)
                 # Use the new function to get additional description
-                additional_text = get_additional_description(table.iloc[idx_pos+1:idx_pos+11].copy(), NON_TRANSACTION_MARKERS)
+                additional_text = collect_additional_description(normalized, idx_pos+1, idx_pos+11, marker_matcher)
                 if additional_text:
                     current_transaction['Description'] += ' ' + additional_text
                 
                 # Exclude transactions matching the pattern
-                if excluded_pattern.search(current_transaction['Description']):
+                if exclusion_matcher.search(current_transaction['Description']):
                     current_transaction = {}
             else:
                 continue  # Skip non-transaction rows
@@ -469,99 +853,440 @@ def extract_credit_card_transactions(tables: List[pd.DataFrame], statement_year=
         if current_transaction:
             transactions.append(current_transaction)
 
-    if DEBUG_OUTPUT:
+    assign_dates(transactions, statement_year, period)
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: extract_credit_card_transactions output: transactions={transactions}")
     return transactions
 
+# Statement date probe. One compiled regex finds every form in a single scan; alternatives are
+# tried in this order at each position, so a "dd MMM yyyy TO dd MMM yyyy" range is never
+# mistaken for its start date. The STATEMENT DATE label may be followed by other column labels
+# before its value ("STATEMENT DATE CREDIT LIMIT ... PAYMENT DUE DATE\n23 May 2024 ...").
+_PRINTED_DATE = r'\b\d{1,2}\s+[A-Za-z]{3,9}\.?\s+\d{4}\b'
+STATEMENT_PERIOD_PATTERN = re.compile(
+    rf'(?P<start>{_PRINTED_DATE})\s+TO\s+(?P<end>{_PRINTED_DATE})'
+    rf'|STATEMENT\s+DATE\b[^0-9]{{0,120}}?(?P<statement>{_PRINTED_DATE})'
+    rf'|(?P<date>{_PRINTED_DATE})'
+    r'|\b(?P<dmy>\d{2}-\d{2}-\d{4})\b',
+    re.IGNORECASE,
+)
+_PERIOD_PRIORITY = {'start': 0, 'statement': 1, 'date': 2, 'dmy': 3}
+_MONTHS = {name.lower(): number for number, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+HEADER_BAND_ROWS = 30
+
+@dataclass(frozen=True)
+class StatementPeriod:
+    """
+    Statement period found in the header region. start is None when only a statement date
+    is printed; end is the statement (or period end) date. text is the first date as printed.
+    """
+    start: Optional[date]
+    end: date
+    text: str
+
+    @property
+    def year(self) -> str:
+        """Year of the first printed date."""
+        return str((self.start or self.end).year)
+
+def _printed_date(text: str) -> Optional[date]:
+    day, month, year = text.split()
+    month_number = _MONTHS.get(month.rstrip('.')[:3].lower())
+    if month_number is None:
+        return None
+    try:
+        value = date(int(year), month_number, int(day))
+    except ValueError:
+        return None
+    # Guardrail for reasonable years
+    return value if 2010 <= value.year <= min(2050, datetime.now().year + 1) else None
+
+def _dmy_date(text: str) -> Optional[date]:
+    try:
+        return datetime.strptime(text, "%d-%m-%Y").date()
+    except ValueError:
+        return None
+
+def probe_statement_period(*texts: Optional[str]) -> Optional[StatementPeriod]:
+    """
+    Scans the header texts once and returns the best statement period found: a printed
+    date range, else the date after a STATEMENT DATE label, else the first printed date,
+    else the first dd-mm-yyyy date.
+    """
+    text = '\n'.join(t for t in texts if t)
+    best: Optional[StatementPeriod] = None
+    best_priority = len(_PERIOD_PRIORITY)
+    for match in STATEMENT_PERIOD_PATTERN.finditer(text):
+        kind = next(name for name in _PERIOD_PRIORITY if match.group(name) is not None)
+        priority = _PERIOD_PRIORITY[kind]
+        if priority >= best_priority:
+            continue
+        if kind == 'start':
+            start, end = _printed_date(match.group('start')), _printed_date(match.group('end'))
+            if start is None or end is None:
+                continue
+            period = StatementPeriod(start, end, match.group('start'))
+        elif kind == 'dmy':
+            value = _dmy_date(match.group('dmy'))
+            if value is None:
+                continue
+            period = StatementPeriod(None, value, value.strftime("%d %b %Y"))
+        else:
+            value = _printed_date(match.group(kind))
+            if value is None:
+                continue
+            period = StatementPeriod(None, value, match.group(kind))
+        best, best_priority = period, priority
+        if priority == 0:
+            break
+    return best
+
+def header_band(table: pd.DataFrame, stop: Optional[int] = HEADER_BAND_ROWS) -> str:
+    """
+    Text of the rows at the top of a table (the page header camelot folds into the first
+    table), one cell per line. stop=None takes every row.
+    """
+    rows = table.itertuples(index=False) if stop is None else table.head(stop).itertuples(index=False)
+    return '\n'.join(cell for row in rows for cell in row if isinstance(cell, str) and cell)
+
 def extract_statement_date(table: pd.DataFrame, pdf_text: str) -> Tuple[Optional[str], Optional[str]]:
-    # Patterns to match
-    if DEBUG_OUTPUT:
+    """
+    Statement date (as printed) and year from a whole table plus the first page's text.
+    """
+    if debug_enabled():
         print(f"DEBUG_OUTPUT: extract_statement_date input: table=\n{format_dataframe_for_debug(table)}, pdf_text=\n{pdf_text!r}")
-    date_patterns = [
-        r'(\d{1,2}\s+[A-Za-z]+\s+\d{4})',  # e.g., "23 May 2024"
-        r'(\d{1,2}\s+[A-Za-z]+\s+\d{4})\s+TO\s+(\d{1,2}\s+[A-Za-z]+\s+\d{4})',  # e.g., "1 JUL 2024 TO 31 JUL 2024"
-        r'STATEMENT DATE[:\s]+(\d{1,2}\s+[A-Za-z]+\s+\d{4})',  # e.g., "STATEMENT DATE: 23 May 2024"
-    ]
-    
-    for _, row in table.iterrows():
-        for cell in row:
-            if isinstance(cell, str):
-                for pattern in date_patterns:
-                    match = re.search(pattern, cell, re.IGNORECASE)
-                    if match:
-                        date_str = match.group(1)
-                        try:
-                            date = datetime.strptime(date_str, "%d %b %Y")
-                            if 2010 <= date.year <= min(2050, datetime.now().year + 1):  # Guardrail for reasonable years
-                                if DEBUG_OUTPUT:
-                                    print(f"DEBUG_OUTPUT: extract_statement_date output: ({date_str}, {str(date.year)})")
-                                return date_str, str(date.year)
-                        except ValueError:
-                            pass  # If parsing fails, continue to the next match
-    
-    # If no date found in the table, try to extract from the PDF content
-    date_pattern = r'(\d{2}-\d{2}-\d{4})'
-    match = re.search(date_pattern, pdf_text)
-    if match:
-        date_str = match.group(1)
-        try:
-            date = datetime.strptime(date_str, "%d-%m-%Y")
-            if DEBUG_OUTPUT:
-                print(f"DEBUG_OUTPUT: extract_statement_date output: ({date.strftime('%d %b %Y')}, {str(date.year)})")
-            return date.strftime("%d %b %Y"), str(date.year)
-        except ValueError:
-            pass
-
-    if DEBUG_OUTPUT:
-        print("DEBUG_OUTPUT: extract_statement_date output: (None, None)")
-    return None, None
-
-def extract_pdf_text(file_path: str) -> str:
+    period = probe_statement_period(header_band(table, None), pdf_text)
+    result = (period.text, period.year) if period else (None, None)
+    if debug_enabled():
+        print(f"DEBUG_OUTPUT: extract_statement_date output: {result}")
+    return result
+
+def extract_pdf_text(file_path: Union[str, bytes, IO[bytes]]) -> str:
+    """
+    First-page text, read from a path, an in-memory PDF or an already loaded binary stream.
+    """
+    if isinstance(file_path, bytes):
+        file_path = io.BytesIO(file_path)
+    if not isinstance(file_path, str):
+        return PdfReader(file_path).pages[0].extract_text()
     with open(file_path, 'rb') as file:
         pdf_reader = PdfReader(file)
         return pdf_reader.pages[0].extract_text()
 
-def main(file_path: str):
-    if DEBUG_OUTPUT:
-        print("\033[95m" + "=" * 80)  # Bright purple
-        print(f"Processing file: {file_path}")
-        print("=" * 80 + "\033[0m")  # Reset color
-    
-    tables = extract_tables(file_path)
-    
+def main(file_path: str, templates: Optional[TemplateRegistry] = None, markers: Optional[MarkerConfig] = None,
+         extraction_profile: Union[str, ExtractionProfile, None] = None, ctx: Optional[ParseContext] = None):
+    if ctx is None:
+        ctx = ParseContext(ParserConfig(templates=templates, markers=markers, extraction_profile=extraction_profile))
+    ctx.file_path = file_path
+    with ctx.activate():
+        if ctx.debug:
+            print("\033[95m" + "=" * 80)  # Bright purple
+            print(f"Processing file: {file_path}")
+            print("=" * 80 + "\033[0m")  # Reset color
+
+        cache = ctx.config.cache
+        if cache is None:
+            pdf_text, parser = open_document(file_path, ctx)
+            tables = read_tables(file_path, ctx)
+            transactions = run_parser(parser, tables, file_path, pdf_text, ctx)
+            learn_boilerplate(ctx)
+            return transactions
+
+        tables_key, results_key = cache.keys(file_path, ctx.config.extraction_profile, ctx.config.markers)
+        transactions = cache.get_transactions(results_key)
+        if transactions is not None:
+            return transactions
+        pdf_text, parser = open_document(file_path, ctx)
+        tables = load_tables(file_path, cache, tables_key, ctx)
+        transactions = run_parser(parser, tables, file_path, pdf_text, ctx)
+        learn_boilerplate(ctx)
+        if not ctx.metrics.get('partial'):
+            cache.put_transactions(results_key, transactions)
+        return transactions
+
+def open_document(file_path: str, ctx: ParseContext):
+    """
+    Decrypts the statement if needed, reads its text and picks its parser.
+    Returns (first-page text, parser or None).
+    """
+    if ctx.config.time_budget is not None:
+        return dispatch(file_path, ctx, read_text_within_budget(file_path, ctx))
+    source = decrypt_document(file_path, ctx)
+    pdf_text = select_pages(source, ctx)
+    if pdf_text is None and isinstance(source, bytes):
+        # Later stages must not go back to the encrypted file for the text
+        pdf_text = extract_pdf_text(source)
+    return dispatch(source, ctx, pdf_text)
+
+def decrypt_document(file_path: str, ctx: ParseContext, data: Optional[bytes] = None) -> Union[str, bytes]:
+    """
+    With passwords configured, returns the decrypted PDF as bytes for pypdf to read, or file_path
+    if the statement is not encrypted. Pass data if the file was already read. camelot cannot read
+    a PDF from memory, so it reads the encrypted file with the password that worked, which is kept
+    in ctx.password.
+    """
+    passwords = ctx.config.passwords
+    if not passwords:
+        return file_path
+    with ctx.stage('decrypt'):
+        if data is None:
+            with open(file_path, 'rb') as fh:
+                data = fh.read()
+        decrypted = decrypt(data, passwords, ctx.config.password_cache, account_key(file_path))
+    if decrypted is None:
+        return file_path
+    ctx.password = decrypted.password
+    return decrypted.data
+
+@dataclass
+class PdfText:
+    """
+    What read_pdf_text found: the password that opened the PDF (None if it is not
+    encrypted), how many passwords were tried, the number of pages and the text of the
+    first page or of every page.
+    """
+    password: Optional[str]
+    attempts: int
+    pages: int
+    page_texts: List[str]
+
+def read_pdf_text(source: Union[str, bytes], candidates: Sequence[str], all_pages: bool) -> PdfText:
+    """
+    The load stage's pypdf work in one call, for a worker process: opens the PDF from a path or
+    bytes, decrypts it with the first of candidates that works and reads its text.
+    """
+    reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    password, attempts = unlock(reader, candidates) if reader.is_encrypted else (None, 0)
+    if all_pages:
+        return PdfText(password, attempts, len(reader.pages), [page.extract_text() or '' for page in reader.pages])
+    return PdfText(password, attempts, len(reader.pages), [reader.pages[0].extract_text()])
+
+def read_text_within_budget(file_path: str, ctx: ParseContext, pool: Optional[WorkerPool] = None,
+                            data: Optional[bytes] = None) -> str:
+    """
+    open_document's decryption and text extraction under the time budget: read_pdf_text runs in a
+    worker process from pool and is abandoned with PageTimeout once it overruns the document
+    budget (the page budget without one; nothing without a time budget). Sets ctx.password and ctx.pages (with a boilerplate
+    index, only the pages it still needs extracted), so nothing else opens the PDF with pypdf
+    in this process. Returns the first-page text.
+    """
+    budget = ctx.config.time_budget
+    timeout = None
+    if budget is not None:
+        timeout = budget.document if budget.document is not None else budget.page
+    passwords = ctx.config.passwords
+    password_cache = ctx.config.password_cache or default_password_cache()
+    key = account_key(file_path)
+    candidates = password_cache.candidates(key, passwords) if passwords else []
+    with ctx.stage('read_pdf'):
+        with (pool or default_worker_pool()).worker() as worker:
+            try:
+                text = worker.call(read_pdf_text, (file_path if data is None else data, candidates,
+                                                   ctx.config.boilerplate is not None), timeout)
+            except PageTimeout:
+                raise PageTimeout(f"reading the PDF took longer than {timeout:.3g}s") from None
+    if text.password is not None:
+        ctx.password = text.password
+        if passwords:
+            password_cache.remember(key, text.password, text.attempts)
+    if ctx.config.boilerplate is None:
+        ctx.pages = list(range(1, text.pages + 1))
+        return text.page_texts[0]
+    return index_pages(text.page_texts, ctx)
+
+def select_pages(file_path: Union[str, bytes, IO[bytes]], ctx: ParseContext) -> Optional[str]:
+    """
+    With a boilerplate index configured, reads every page's text, hashes it and sets
+    ctx.pages to the pages camelot still has to read. Returns the first-page text
+    (None without an index, in which case every page is extracted).
+    """
+    if ctx.config.boilerplate is None:
+        return None
+    with ctx.stage('boilerplate'):
+        return index_pages(extract_page_texts(file_path), ctx)
+
+def index_pages(page_texts: List[str], ctx: ParseContext) -> str:
+    """
+    Hashes every page's text and sets ctx.pages to the pages the boilerplate index still
+    needs extracted (every page without an index). Returns the first-page text.
+    """
+    index = ctx.config.boilerplate
+    ctx.page_hashes = [page_hash(text) for text in page_texts]
+    if index is None:
+        ctx.pages = list(range(1, len(page_texts) + 1))
+    else:
+        ctx.pages = index.pages_to_extract(ctx.page_hashes)
+    ctx.metrics['pages_skipped'] = len(ctx.page_hashes) - len(ctx.pages)
+    return page_texts[0] if page_texts else ''
+
+def learn_boilerplate(ctx: ParseContext) -> None:
+    """
+    Tells the boilerplate index which of the extracted pages held transaction tables.
+    """
+    index = ctx.config.boilerplate
+    if (index is not None and ctx.page_hashes is not None and ctx.pages is not None
+            and ctx.transaction_pages is not None):
+        # Pages that ran out of time say nothing about whether they hold transactions
+        unread = set(ctx.metrics.get('timed_out_pages', ())) | set(ctx.metrics.get('skipped_pages', ()))
+        index.learn(ctx.page_hashes, [page for page in ctx.pages if page not in unread], ctx.transaction_pages)
+
+def dispatch(file_path: Union[str, bytes, IO[bytes]], ctx: ParseContext, pdf_text: Optional[str] = None):
+    """
+    Reads the first page's text and picks the specialized parser for it, if any.
+    Returns (pdf_text, parser or None).
+    """
+    if not ctx.config.dispatch:
+        return pdf_text, None
+    from .parsers import dispatch_parser
+    with ctx.stage('dispatch'):
+        if pdf_text is None:
+            pdf_text = extract_pdf_text(file_path)
+        return pdf_text, dispatch_parser(pdf_text)
+
+def run_parser(parser, tables: List[pd.DataFrame], file_path: str, pdf_text: Optional[str], ctx: ParseContext) -> List[Dict]:
+    if parser is None:
+        return extract_transactions(tables, file_path, pdf_text, ctx=ctx)
+    ctx.log(f"Parser: {parser.name}")
+    return parser.extract(tables, file_path, pdf_text, ctx)
+
+def load_tables(file_path: str, cache: StatementCache, tables_key: str, ctx: ParseContext) -> List[pd.DataFrame]:
+    """
+    Tables from the cache's tables layer, running camelot (and filling the layer) on a miss.
+    """
+    tables = cache.get_tables(tables_key)
+    if tables is not None:
+        return [intern_table(table) for table in tables]
+    tables = read_tables(file_path, ctx)
+    if not ctx.metrics.get('partial'):
+        cache.put_tables(tables_key, tables)
+    return tables
+
+def read_tables(file_path: str, ctx: ParseContext, pool: Optional[WorkerPool] = None) -> List[pd.DataFrame]:
+    """
+    camelot's tables for ctx.pages (every page by default). With a time budget configured, the
+    pages run one at a time in a worker process from pool, and a page that overruns is abandoned:
+    the tables of the other pages are returned and ctx.metrics marks the statement as partial,
+    listing the timed_out_pages and the skipped_pages the document budget left no time for.
+    """
+    budget = ctx.config.time_budget
+    profile = ctx.config.extraction_profile
+    with ctx.stage('tables'):
+        if budget is None:
+            return extract_tables(file_path, profile, ctx.pages, ctx.password)
+        pages = ctx.pages if ctx.pages is not None else list(range(1, page_count(file_path, ctx) + 1))
+        with (pool or default_worker_pool()).worker() as worker:
+            report = extract_pages(extract_shared_tables, file_path, profile, pages, budget, worker, ctx.password,
+                                   release_tables)
+            tables = receive_all_tables(report.results)
+    if report.partial:
+        ctx.metrics.update(partial=True, timed_out_pages=report.timed_out, skipped_pages=report.skipped)
+    return tables
+
+def page_count(file_path: str, ctx: ParseContext) -> int:
+    if ctx.page_hashes is not None:
+        return len(ctx.page_hashes)
+    reader = PdfReader(file_path)
+    if reader.is_encrypted:
+        reader.decrypt(ctx.password or '')
+    return len(reader.pages)
+
+def extract_transactions(tables: List[pd.DataFrame], file_path: str, pdf_text: Optional[str] = None,
+                         templates: Optional[TemplateRegistry] = None, markers: Optional[MarkerConfig] = None,
+                         ctx: Optional[ParseContext] = None) -> List[Dict]:
+    """
+    Classification and extraction stage: turns the raw camelot tables of one statement into transactions.
+    pdf_text is the first-page text; it is only read from file_path if a statement date is needed.
+    templates and markers are only used when no ParseContext is given.
+    """
+    if ctx is None:
+        ctx = ParseContext(ParserConfig(templates=templates, markers=markers))
+    ctx.file_path = file_path
+    with ctx.activate():
+        return _extract_transactions(tables, file_path, pdf_text, ctx)
+
+def _extract_transactions(tables: List[pd.DataFrame], file_path: str, pdf_text: Optional[str], ctx: ParseContext) -> List[Dict]:
     transaction_tables: List[pd.DataFrame] = []
-    statement_date = None
-    statement_year = None
-    for table in tables:
-        processed_table, is_transaction = clean_and_detect_transaction_table(table)
-        if is_transaction:
-            transaction_tables.append(processed_table)
-        if not statement_date:
+    profiles: List[TableProfile] = []
+    band = None
+    if any('page' not in table.attrs for table in tables):
+        # Tables cached before their pages were recorded cannot say which pages hold transactions
+        ctx.transaction_pages = None
+    with ctx.stage('classify'):
+        for table in tables:
+            processed_table, is_transaction, profile = process_table(table, ctx.config.templates)
+            if is_transaction:
+                transaction_tables.append(processed_table)
+                profiles.append(profile)
+                if ctx.transaction_pages is not None:
+                    ctx.transaction_pages.add(table.attrs['page'])
+            if band is None:
+                # The page header ends up above the first table's header row
+                stop = profile.header_index if profile.header_index is not None else HEADER_BAND_ROWS
+                band = header_band(table, min(stop + 1, HEADER_BAND_ROWS))
+
+        if pdf_text is None and tables:
             pdf_text = extract_pdf_text(file_path)
-            statement_date, statement_year = extract_statement_date(processed_table, pdf_text)
-    
-    if not statement_year:
+        ctx.statement_period = probe_statement_period(band, pdf_text)
+        if ctx.statement_period is not None:
+            ctx.statement_date, ctx.statement_year = ctx.statement_period.text, ctx.statement_period.year
+
+    if not ctx.statement_year:
         # If no year found in tables, try to extract from filename
-        year_match = re.search(r'(20[1-4][0-9]|2050)', file_path)
+        year_match = FILENAME_YEAR_PATTERN.search(file_path)
         if year_match:
-            statement_year = year_match.group(1)
-    
-    if DEBUG_OUTPUT:
-        print(f"Statement Date: {statement_date}")
-        print(f"Statement Year: {statement_year}")
-    
-    if any(is_bank_account_table(table) for table in transaction_tables):
-        transactions = extract_bank_account_transactions(transaction_tables, statement_year)
-    else:
-        transactions = extract_credit_card_transactions(transaction_tables, statement_year)
-    
+            ctx.statement_year = year_match.group(1)
+
+    ctx.log(f"Statement Date: {ctx.statement_date}")
+    ctx.log(f"Statement Year: {ctx.statement_year}")
+
+    markers = ctx.config.markers
+    with ctx.stage('extract'):
+        normalized_tables = [NormalizedTable(table) for table in transaction_tables]
+        if ctx.account_type is not None and transaction_tables and contradicts_account_type(ctx.account_type, profiles):
+            # The first page's keywords picked the wrong product; the tables' columns win
+            ctx.log(f"Tables contradict the {ctx.parser} parser; using generic detection")
+            ctx.metrics['parser_overridden'] = ctx.parser
+            ctx.parser = ctx.account_type = None
+        if ctx.account_type is not None:
+            is_bank_account = ctx.account_type == 'bank_account'
+        else:
+            is_bank_account = any(is_bank_account_table(table, profile) for table, profile in zip(transaction_tables, profiles))
+        if is_bank_account:
+            transactions = extract_bank_account_transactions(transaction_tables, ctx.statement_year, profiles,
+                                                             normalized_tables, markers, ctx.statement_period)
+        else:
+            transactions = extract_credit_card_transactions(transaction_tables, ctx.statement_year, normalized_tables,
+                                                            markers, ctx.statement_period)
+
     if not transactions:
-        print("No transactions found")
+        # Not printed: batch and watch stream JSON lines on stdout
+        ctx.log("No transactions found")
         return []
-    
+
     return transactions
 
 def verify_transactions(transactions: List[Dict]) -> Dict:
+    """
+    Totals and, for bank accounts, a check of the closing balance against the running balance.
+    Transactions of a multi-account statement are reconciled per 'Account', and the statement
+    balances only if every account does.
+    """
+    if not any('Account' in t for t in transactions):
+        return _verify_account(transactions)
+    accounts: Dict[Optional[str], List[Dict]] = {}
+    for t in transactions:
+        accounts.setdefault(t.get('Account'), []).append(t)
+    results = {account: _verify_account(group) for account, group in accounts.items()}
+    matches = [result.get('balance_matches') for result in results.values()]
+    return {
+        "total_deposits": sum((result.get('total_deposits', 0) for result in results.values()), Decimal(0)),
+        "total_withdrawals": sum((result.get('total_withdrawals', 0) for result in results.values()), Decimal(0)),
+        "balance_matches": False if False in matches else (None if None in matches else True),
+        "accounts": results,
+    }
+
+def _verify_account(transactions: List[Dict]) -> Dict:
     total_deposits = sum(Decimal(str(t.get('Deposit', 0) or 0)) for t in transactions)
     total_withdrawals = sum(Decimal(str(t.get('Withdrawal', 0) or 0)) for t in transactions)
     total_credit = sum(Decimal(str(t['Amount'])) for t in transactions if t.get('Amount', 0) > 0)
@@ -604,11 +1329,50 @@ def verify_transactions(transactions: List[Dict]) -> Dict:
             "balance_matches": balance_matches
         }
 
-def parse_bank_statement(file_path: str, debug: bool = False, verify: bool = False) -> Dict:
-    global DEBUG_OUTPUT
-    DEBUG_OUTPUT = debug
-    
-    transactions = main(file_path)
+def parse_bank_statement(file_path: str, debug: bool = False, verify: bool = False,
+                         templates: Optional[TemplateRegistry] = None, markers: Optional[MarkerConfig] = None,
+                         extraction_profile: Union[str, ExtractionProfile, None] = None,
+                         config: Optional[ParserConfig] = None, cache: Optional[StatementCache] = None,
+                         profile_memory: bool = False, boilerplate: Optional[BoilerplateIndex] = None,
+                         password: Optional[str] = None, passwords: Optional[Iterable[str]] = None,
+                         page_timeout: Optional[float] = None, document_timeout: Optional[float] = None) -> Dict:
+    """
+    Parses a statement PDF. Pass a TemplateRegistry to reuse (and learn) layout templates;
+    registries created with a path are saved back to disk after parsing.
+    Pass a MarkerConfig to add bank-specific non-transaction markers and exclusions,
+    and an extraction profile to tune camelot (see extraction.PROFILES).
+    Pass a StatementCache to reuse earlier results, or camelot's tables when only the
+    parsing rules changed. Pass a BoilerplateIndex to skip camelot on pages that never held
+    transactions in earlier statements; indexes created with a path are saved back too.
+    For encrypted statements pass a password, or several to try; the PDF is decrypted once in
+    memory and the password that worked is tried first for the account's next statement.
+    Pass page_timeout and/or document_timeout (seconds) to bound table extraction: pages that
+    overrun are abandoned, and the result holds what the other pages yielded with "partial" set.
+    Decrypting and reading the PDF's text is bounded too, by document_timeout (else page_timeout),
+    and raises PageTimeout when it overruns.
+    A ParserConfig, if given, takes the place of all the keyword options. Each call gets
+    its own ParseContext, so statements can be parsed from several threads at once.
+    The result's "metrics" hold the seconds spent in each stage and, with profile_memory,
+    each stage's memory use and top allocation sites (see memory.MemoryProfiler).
+    """
+    if config is None:
+        config = ParserConfig(debug=debug, verify=verify, templates=templates, markers=markers,
+                              extraction_profile=extraction_profile, cache=cache, profile_memory=profile_memory,
+                              boilerplate=boilerplate,
+                              passwords=tuple(([password] if password else []) + list(passwords or ())),
+                              time_budget=TimeBudget.of(page_timeout, document_timeout))
+    ctx = ParseContext(config)
+    try:
+        transactions = main(file_path, ctx=ctx)
+    finally:
+        metrics = ctx.finish()
+    if config.templates is not None:
+        config.templates.save()
+    if config.boilerplate is not None:
+        config.boilerplate.save()
+    return build_result(transactions, config.verify, metrics)
+
+def build_result(transactions: List[Dict], verify: bool = False, metrics: Optional[Dict] = None) -> Dict:
     result = {
         "transactions": transactions,
         "verification_data": {}
@@ -616,7 +1380,13 @@ def parse_bank_statement(file_path: str, debug: bool = False, verify: bool = Fal
 
     if verify:
         result["verification_data"] = verify_transactions(transactions)
+    if metrics is not None and metrics.get('partial'):
+        # Some pages ran out of time; metrics list which
+        result["partial"] = True
+    if metrics is not None:
+        result["metrics"] = {name: round(value, 6) if isinstance(value, float) else value
+                             for name, value in metrics.items()}
 
     return result
 
-__all__ = ['parse_bank_statement', 'verify_transactions']
\ No newline at end of file
+__all__ = ['parse_bank_statement', 'verify_transactions']
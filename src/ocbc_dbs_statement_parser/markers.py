@@ -0,0 +1,117 @@
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern
+
+# Rows containing any of these (case-insensitively) end a transaction's description
+DEFAULT_NON_TRANSACTION_MARKERS = (
+    'BALANCE B/F', 'BALANCE C/F', 'SUB-TOTAL', 'SUBTOTAL', 'TOTAL', 'NEW TRANSACTIONS',
+    'Total Balance Carried Forward',
+)
+
+# Credit card rows whose description matches any of these regexes are not spending
+DEFAULT_EXCLUDED_DESCRIPTIONS = (
+    r'AUTO-PYT FROM ACCT#\d+ REF NO: \d+',
+    r'PAYMENT BY GIRO',
+)
+
+
+def _trie_pattern(literals: Iterable[str]) -> str:
+    """
+    Compiles literals into a prefix-factored regex, e.g. {'SUBTOTAL', 'SUB-TOTAL'} -> 'SUB(?:TOTAL|\\-TOTAL)'.
+    At each position the regex engine only follows the branch for the next character,
+    so the cost of a scan stays flat as markers are added, much like Aho-Corasick.
+    """
+    trie: Dict = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            # A shorter marker ends here; the longer ones are optional extensions
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class MarkerMatcher:
+    """
+    A single compiled regex over literal markers (trie-factored) and regex patterns.
+    """
+
+    def __init__(self, literals: Iterable[str] = (), patterns: Iterable[str] = ()):
+        self.literals = frozenset(literals)
+        self.patterns = tuple(patterns)
+        parts = []
+        if self.literals:
+            parts.append(_trie_pattern(self.literals))
+        parts.extend(f'(?:{pattern})' for pattern in self.patterns)
+        self._regex: Optional[Pattern[str]] = re.compile('|'.join(parts)) if parts else None
+
+    def search(self, text: str) -> bool:
+        return self._regex is not None and self._regex.search(text) is not None
+
+    def search_any(self, texts: Iterable[str]) -> bool:
+        if self._regex is None:
+            return False
+        search = self._regex.search
+        return any(search(text) is not None for text in texts)
+
+
+@lru_cache(maxsize=32)
+def compile_markers(markers: FrozenSet[str]) -> MarkerMatcher:
+    """
+    Matcher for non-transaction markers, checked against upper-cased cell text.
+    """
+    return MarkerMatcher(marker.upper() for marker in markers)
+
+
+@lru_cache(maxsize=32)
+def compile_exclusions(patterns: tuple) -> MarkerMatcher:
+    return MarkerMatcher(patterns=patterns)
+
+
+@dataclass
+class MarkerConfig:
+    """
+    User-extensible marker lists. Bank-specific markers and exclusions can be added
+    in code with extend() or loaded from a JSON file:
+
+        {"non_transaction_markers": ["BALANCE BROUGHT FORWARD"],
+         "excluded_descriptions": ["PAYMENT - DBS INTERNET/WIRELESS"]}
+    """
+    non_transaction_markers: List[str] = field(default_factory=lambda: list(DEFAULT_NON_TRANSACTION_MARKERS))
+    excluded_descriptions: List[str] = field(default_factory=lambda: list(DEFAULT_EXCLUDED_DESCRIPTIONS))
+
+    def extend(self, non_transaction_markers: Iterable[str] = (), excluded_descriptions: Iterable[str] = ()) -> 'MarkerConfig':
+        return MarkerConfig(
+            self.non_transaction_markers + [m for m in non_transaction_markers if m not in self.non_transaction_markers],
+            self.excluded_descriptions + [p for p in excluded_descriptions if p not in self.excluded_descriptions],
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> 'MarkerConfig':
+        """
+        Loads extra markers from JSON; they are added to the defaults.
+        """
+        with open(path, 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+        return cls().extend(data.get('non_transaction_markers', []), data.get('excluded_descriptions', []))
+
+    @property
+    def marker_matcher(self) -> MarkerMatcher:
+        return compile_markers(frozenset(self.non_transaction_markers))
+
+    @property
+    def exclusion_matcher(self) -> MarkerMatcher:
+        return compile_exclusions(tuple(self.excluded_descriptions))
@@ -0,0 +1,149 @@
+import os
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Allocations made by the profiler itself or by the import machinery are noise
+_IGNORED_TRACES = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+]
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False  # whether the profilers turned tracemalloc on, rather than the application
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident set size of this process so far, or None where unsupported.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm', 'r') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryProfiler:
+    """
+    Opt-in memory instrumentation for ParseContext stages. For each stage it records the
+    peak traced (Python) memory, the process's current and peak RSS, and the source lines
+    that allocated the most memory that was still alive when the stage ended.
+
+    tracemalloc is process-wide: when several documents are parsed concurrently in threads
+    the figures include the other documents' allocations, and stages run in worker
+    processes are not seen at all. Profile with a single worker for per-document numbers.
+
+    Tracing is turned on by the first profiler to start and off by the last to stop, unless it
+    was already on, in which case it is left as it was.
+
+    The per-stage peak needs tracemalloc.reset_peak (Python 3.9+). Before that the traced
+    peak covers everything since tracing started, so traced_peak_bytes is reported as None.
+    """
+
+    def __init__(self, top: int = 10, frames: int = 1):
+        self.top = top
+        self.frames = frames
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._started = False
+
+    def start(self) -> None:
+        global _tracing_users, _started_tracing
+        if self._started:
+            return
+        with _tracing_lock:
+            if _tracing_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                _started_tracing = True
+            _tracing_users += 1
+        self._started = True
+
+    def stop(self) -> None:
+        global _tracing_users, _started_tracing
+        if not self._started:
+            return
+        with _tracing_lock:
+            _tracing_users -= 1
+            if _tracing_users == 0 and _started_tracing:
+                # Tracing the application started itself is left running
+                tracemalloc.stop()
+                _started_tracing = False
+        self._started = False
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self.start()
+        before = self._snapshot()
+        resets_peak = hasattr(tracemalloc, 'reset_peak')
+        if resets_peak:
+            tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            traced_after, traced_peak = tracemalloc.get_traced_memory()
+            sites = self._top_sites(self._snapshot().compare_to(before, 'lineno'))
+            self._record(name, {
+                'traced_peak_bytes': max(traced_peak - traced_before, 0) if resets_peak else None,
+                'traced_retained_bytes': traced_after - traced_before,
+                'rss_bytes': current_rss_bytes(),
+                'rss_peak_bytes': peak_rss_bytes(),
+                'top_allocations': sites,
+            })
+
+    def _top_sites(self, differences: List[tracemalloc.StatisticDiff]) -> List[Dict[str, Any]]:
+        sites = []
+        for stat in differences:
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            sites.append({'site': f'{frame.filename}:{frame.lineno}', 'size_bytes': stat.size_diff,
+                          'count': stat.count_diff})
+            if len(sites) == self.top:
+                break
+        return sites
+
+    def _record(self, name: str, record: Dict[str, Any]) -> None:
+        existing = self.stages.get(name)
+        if existing is None:
+            self.stages[name] = record
+            return
+        # A stage that runs more than once keeps its worst figures
+        for key in ('traced_peak_bytes', 'traced_retained_bytes', 'rss_bytes', 'rss_peak_bytes'):
+            values = [v for v in (existing[key], record[key]) if v is not None]
+            existing[key] = max(values) if values else None
+        merged: Dict[str, Dict[str, Any]] = {site['site']: dict(site) for site in existing['top_allocations']}
+        for site in record['top_allocations']:
+            if site['site'] in merged:
+                merged[site['site']]['size_bytes'] += site['size_bytes']
+                merged[site['site']]['count'] += site['count']
+            else:
+                merged[site['site']] = dict(site)
+        existing['top_allocations'] = sorted(merged.values(), key=lambda s: -s['size_bytes'])[:self.top]
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Per-stage figures plus the process's peak RSS, ready to go into result['metrics'].
+        """
+        return {'stages': self.stages, 'rss_peak_bytes': peak_rss_bytes()}
@@ -0,0 +1,147 @@
+"""
+Registry of bank/product-specific statement parsers, chosen from a fingerprint of the
+first page's header (the text above the first table header row) before any table is
+classified. When the tables turn out not to fit the chosen parser's account type, the
+generic detection takes over.
+
+A parser module is only imported when a statement matches its spec, so plug-ins for other
+banks cost one keyword scan of page 0 and nothing else. To add one:
+
+    register_parser(ParserSpec('uob-card', 'my_package.uob:CARD', issuer=('UOB',),
+                               product=('CREDIT CARD',)))
+
+where my_package.uob.CARD is a StatementParser (see parsers.base).
+"""
+import importlib
+import re
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Pattern, Tuple
+
+if TYPE_CHECKING:
+    from .base import StatementParser
+
+# The issuer and product title are printed at the top of the first page, above the transactions
+FINGERPRINT_CHARS = 6000
+# A table header line: a date column and a description column
+HEADER_ROW_PATTERN = re.compile(r'^(?=.*\bDATE\b)(?=.*\b(?:DESCRIPTION|DETAILS|PARTICULARS)\b).*$', re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class ParserSpec:
+    """
+    When a statement's first page mentions one of the issuer names, at least one of the
+    product keywords (if any are given) and every header keyword, the parser at target
+    ('module:attribute') handles it. Keywords are matched case-insensitively.
+    """
+    name: str
+    target: str
+    issuer: Tuple[str, ...]
+    product: Tuple[str, ...] = ()
+    header: Tuple[str, ...] = ()
+
+    def keywords(self) -> FrozenSet[str]:
+        return frozenset(k.upper() for k in self.issuer + self.product + self.header)
+
+    def matches(self, found: FrozenSet[str]) -> bool:
+        return (any(k.upper() in found for k in self.issuer)
+                and (not self.product or any(k.upper() in found for k in self.product))
+                and all(k.upper() in found for k in self.header))
+
+
+# Most specific first: card statements also say "Statement of Account"
+BUILTIN_PARSERS = (
+    ParserSpec('dbs-card', 'ocbc_dbs_statement_parser.parsers.dbs:CARD',
+               issuer=('DBS', 'POSB'), product=('CREDIT CARDS', 'CARD NO')),
+    ParserSpec('dbs-account', 'ocbc_dbs_statement_parser.parsers.dbs:ACCOUNT',
+               issuer=('DBS', 'POSB'), header=('WITHDRAWAL', 'DEPOSIT', 'BALANCE')),
+    ParserSpec('ocbc-card', 'ocbc_dbs_statement_parser.parsers.ocbc:CARD',
+               issuer=('OCBC', 'OVERSEA-CHINESE'), product=('CREDIT CARD', 'CARD NO')),
+    ParserSpec('ocbc-account', 'ocbc_dbs_statement_parser.parsers.ocbc:ACCOUNT',
+               issuer=('OCBC', 'OVERSEA-CHINESE'), header=('WITHDRAWAL', 'DEPOSIT', 'BALANCE')),
+)
+
+_lock = threading.Lock()
+_specs: List[ParserSpec] = list(BUILTIN_PARSERS)
+_loaded: Dict[str, 'StatementParser'] = {}
+_patterns: Optional[List[Tuple[str, Pattern[str]]]] = None
+
+
+def register_parser(spec: ParserSpec, first: bool = True) -> None:
+    """
+    Adds a parser spec, by default ahead of the built-in ones. A spec with the same name is replaced.
+    """
+    global _patterns
+    with _lock:
+        _specs[:] = [s for s in _specs if s.name != spec.name]
+        _specs.insert(0 if first else len(_specs), spec)
+        _loaded.pop(spec.name, None)
+        _patterns = None
+
+
+def unregister_parser(name: str) -> None:
+    global _patterns
+    with _lock:
+        _specs[:] = [s for s in _specs if s.name != name]
+        _loaded.pop(name, None)
+        _patterns = None
+
+
+def registered_parsers() -> List[ParserSpec]:
+    return list(_specs)
+
+
+def _keyword_patterns() -> List[Tuple[str, Pattern[str]]]:
+    global _patterns
+    patterns = _patterns
+    if patterns is None:
+        with _lock:
+            keywords = sorted(frozenset().union(*(spec.keywords() for spec in _specs)))
+            # One search per keyword, so overlapping keywords ('CREDIT CARD', 'CARD NO') are all found
+            patterns = _patterns = [(keyword, re.compile(r'(?<!\w)' + re.escape(keyword) + r'(?!\w)'))
+                                    for keyword in keywords]
+    return patterns
+
+
+def page_header(pdf_text: str) -> str:
+    """
+    The upper-cased text above and including the first table header line, so transaction
+    descriptions ('BILL PAYMENT DBS CREDIT CARDS') never count towards the fingerprint.
+    """
+    text = pdf_text[:FINGERPRINT_CHARS].upper()
+    header = HEADER_ROW_PATTERN.search(text)
+    return text[:header.end()] if header else text
+
+
+def fingerprint(pdf_text: Optional[str]) -> FrozenSet[str]:
+    """
+    The registered keywords found, as whole words, in the first page's header.
+    """
+    if not pdf_text:
+        return frozenset()
+    header = page_header(pdf_text)
+    return frozenset(keyword for keyword, pattern in _keyword_patterns() if pattern.search(header))
+
+
+def match_spec(pdf_text: Optional[str]) -> Optional[ParserSpec]:
+    found = fingerprint(pdf_text)
+    if not found:
+        return None
+    return next((spec for spec in _specs if spec.matches(found)), None)
+
+
+def load_parser(spec: ParserSpec) -> 'StatementParser':
+    parser = _loaded.get(spec.name)
+    if parser is None:
+        module_name, _, attribute = spec.target.partition(':')
+        parser = getattr(importlib.import_module(module_name), attribute)
+        _loaded[spec.name] = parser
+    return parser
+
+
+def dispatch_parser(pdf_text: Optional[str]) -> Optional['StatementParser']:
+    """
+    The specialized parser for a statement's first-page text, or None for the generic path.
+    """
+    spec = match_spec(pdf_text)
+    return load_parser(spec) if spec is not None else None
@@ -0,0 +1,30 @@
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from ..context import ParseContext
+from ..main import extract_transactions
+
+
+class StatementParser:
+    """
+    Turns the camelot tables of one statement into transactions. The default implementation
+    is the generic extraction with the account type fixed up front, so bank-account vs
+    credit-card detection is skipped. Plug-ins for other layouts override extract().
+    """
+    name = 'generic'
+    account_type: Optional[str] = None  # 'bank_account' or 'credit_card'
+
+    def extract(self, tables: List[pd.DataFrame], file_path: str, pdf_text: Optional[str],
+                ctx: ParseContext) -> List[Dict]:
+        ctx.parser = self.name
+        ctx.account_type = self.account_type
+        return extract_transactions(tables, file_path, pdf_text, ctx=ctx)
+
+
+class BankAccountParser(StatementParser):
+    account_type = 'bank_account'
+
+
+class CreditCardParser(StatementParser):
+    account_type = 'credit_card'
@@ -0,0 +1,13 @@
+from .base import BankAccountParser, CreditCardParser
+
+
+class DBSAccountParser(BankAccountParser):
+    name = 'dbs-account'
+
+
+class DBSCardParser(CreditCardParser):
+    name = 'dbs-card'
+
+
+ACCOUNT = DBSAccountParser()
+CARD = DBSCardParser()
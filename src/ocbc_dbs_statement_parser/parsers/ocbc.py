@@ -0,0 +1,13 @@
+from .base import BankAccountParser, CreditCardParser
+
+
+class OCBCAccountParser(BankAccountParser):
+    name = 'ocbc-account'
+
+
+class OCBCCardParser(CreditCardParser):
+    name = 'ocbc-card'
+
+
+ACCOUNT = OCBCAccountParser()
+CARD = OCBCCardParser()
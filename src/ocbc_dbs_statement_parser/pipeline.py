@@ -0,0 +1,353 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .boilerplate import BoilerplateIndex
+from .cache import StatementCache, bytes_digest
+from .encryption import PasswordCache
+from .context import ParseContext, ParserConfig
+from .deadline import TimeBudget, WorkerPool
+from .main import (build_result, decrypt_document, dispatch, extract_pdf_text, extract_shared_tables,
+                   extract_tables, intern_table, learn_boilerplate, read_tables, read_text_within_budget,
+                   receive_tables, run_parser, select_pages)
+from .extraction import ExtractionProfile
+from .markers import MarkerConfig
+from .parsers.base import StatementParser
+from .sinks import Sink
+from .templates import TemplateRegistry
+from .workers import preload_worker, worker_context
+
+_DONE = object()
+
+
+@dataclass
+class Document:
+    source: str
+    path: str
+    context: ParseContext
+    pdf_text: Optional[str] = None
+    tables: Optional[List[pd.DataFrame]] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    local_path: Optional[str] = None  # spooled copy of path on local disk, if any
+    cache_keys: Optional[Tuple[str, str]] = None  # (tables key, results key) in the statement cache
+    parser: Optional[StatementParser] = None  # specialized parser picked from the first page, if any
+
+
+@dataclass
+class PipelineStats:
+    documents: int = 0
+    errors: int = 0
+    peak_in_flight: int = 0
+    elapsed: float = 0.0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+class BatchPipeline:
+    """
+    Parses a stream of statements through bounded queues:
+
+        load -> tables -> extract -> serialize
+
+    Every queue holds at most queue_size documents. A document counts as in flight from
+    the moment it is loaded until the sink has written it, and at most max_in_flight
+    documents are in flight at once. A slow sink therefore stalls the producer
+    instead of letting results pile up, and peak memory depends on these two knobs,
+    not on the batch size.
+
+    For slow (e.g. network) storage, run the pipeline in hybrid mode: io_workers threads
+    read each PDF once and extract its first-page text while camelot runs in a pool of
+    `processes` worker processes. With spool_dir set, the loaded bytes are written to a
+    local file there so the workers never touch the slow filesystem. With processes set,
+    the table stage gets at least one dispatcher thread per process, and max_in_flight
+    defaults to enough documents to keep every loader and process busy.
+
+    With a boilerplate index, the load stage hashes every page's text and the table stage
+    only hands camelot the pages that are not known boilerplate.
+
+    With passwords configured, the load stage decrypts encrypted statements once, in memory,
+    to read their text; camelot reads the (still encrypted) file with the password that worked.
+
+    With page_timeout and/or document_timeout (seconds), every table thread drives a worker
+    process of its own, in place of the pool, and kills it when a page overruns. A bad file then
+    holds up one table thread for at most its budget and comes out with "partial" set; partial
+    results are never cached.
+    """
+
+    def __init__(self, sink: Sink, queue_size: int = 2, max_in_flight: Optional[int] = None, table_workers: int = 1,
+                 processes: int = 0, verify: bool = False, templates: Optional[TemplateRegistry] = None,
+                 markers: Optional[MarkerConfig] = None,
+                 extraction_profile: Union[str, ExtractionProfile, None] = None,
+                 config: Optional[ParserConfig] = None, io_workers: int = 1, spool_dir: Optional[str] = None,
+                 cache: Optional[StatementCache] = None, profile_memory: bool = False,
+                 boilerplate: Optional[BoilerplateIndex] = None, passwords: Iterable[str] = (),
+                 page_timeout: Optional[float] = None, document_timeout: Optional[float] = None):
+        table_workers = max(table_workers, processes)
+        if max_in_flight is None:
+            # Every loader and table worker busy, plus one document waiting at each end
+            max_in_flight = io_workers + table_workers + 2
+        if queue_size < 1 or max_in_flight < 1 or table_workers < 1 or io_workers < 1:
+            raise ValueError("queue_size, max_in_flight, table_workers and io_workers must be at least 1")
+        self.sink = sink
+        self.queue_size = queue_size
+        self.max_in_flight = max_in_flight
+        self.table_workers = table_workers
+        self.io_workers = io_workers
+        self.processes = processes
+        self.spool_dir = spool_dir
+        if config is None:
+            config = ParserConfig(verify=verify, templates=templates, markers=markers,
+                                  extraction_profile=extraction_profile, cache=cache,
+                                  profile_memory=profile_memory, boilerplate=boilerplate,
+                                  passwords=tuple(passwords), password_cache=PasswordCache(),
+                                  time_budget=TimeBudget.of(page_timeout, document_timeout))
+        self.config = config
+        self.stats = PipelineStats()
+        self._executor: Optional[Executor] = None
+        self._workers: Optional[WorkerPool] = None
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._stats_lock = threading.Lock()
+        self._current_in_flight = 0
+        self._sink_error: Optional[BaseException] = None
+
+    # Stage functions; override to customize a stage
+
+    def load_document(self, document: Document) -> None:
+        with document.context.stage('load'):
+            if self.spool_dir is None and not self.config.passwords:
+                if self._cached_result(document):
+                    return
+                document.pdf_text = self._read_text(document)
+                _, document.parser = dispatch(document.path, document.context, document.pdf_text)
+                return
+            # Read the file once; text extraction and camelot both work from local copies
+            with open(document.path, 'rb') as fh:
+                data = fh.read()
+            if self._cached_result(document, bytes_digest(data)):
+                return
+            document.pdf_text = self._read_text(document, data)
+            _, document.parser = dispatch(document.path, document.context, document.pdf_text)
+            if self.spool_dir is None:
+                return
+            fd, document.local_path = tempfile.mkstemp(suffix='.pdf', dir=self.spool_dir)
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+
+    def _read_text(self, document: Document, data: Optional[bytes] = None) -> str:
+        """
+        First-page text, from data when the file was already read, decrypting it first if need be;
+        with a boilerplate index, every page is read and hashed on the way. Under a time budget
+        this runs in a worker process, like camelot (see read_text_within_budget).
+        """
+        context = document.context
+        if self._workers is not None:
+            return read_text_within_budget(document.path, context, self._workers, data)
+        # The decrypted copy is only read by pypdf, here, and never leaves memory; what gets
+        # spooled is the file as it is on disk
+        source = decrypt_document(document.path, context, data)
+        if not isinstance(source, bytes) and data is not None:
+            source = data
+        text = select_pages(source, context)
+        return text if text is not None else extract_pdf_text(source)
+
+    def extract_document_tables(self, document: Document) -> None:
+        if document.result is not None:
+            return
+        profile = self.config.extraction_profile
+        pages = document.context.pages
+        path = document.local_path or document.path
+        password = document.context.password
+        cache = self.config.cache
+        keys = document.cache_keys
+        try:
+            if cache is not None and keys is not None:
+                tables = cache.get_tables(keys[0])
+                if tables is not None:
+                    document.tables = [intern_table(table) for table in tables]
+                    return
+            if self._workers is not None:
+                document.tables = read_tables(path, document.context, self._workers)
+            else:
+                with document.context.stage('tables'):
+                    if self._executor is not None:
+                        # Tables come back through shared memory rather than a pickle of every cell
+                        document.tables = receive_tables(
+                            self._executor.submit(extract_shared_tables, path, profile, pages, password).result())
+                    else:
+                        document.tables = extract_tables(path, profile, pages, password)
+            if cache is not None and keys is not None and not document.context.metrics.get('partial'):
+                cache.put_tables(keys[0], document.tables)
+        finally:
+            self._remove_spooled(document)
+
+    def extract_document_transactions(self, document: Document) -> None:
+        if document.result is not None:
+            return
+        transactions = run_parser(document.parser, document.tables or [], document.path, document.pdf_text,
+                                  document.context)
+        learn_boilerplate(document.context)
+        cache, keys = self.config.cache, document.cache_keys
+        if cache is not None and keys is not None and not document.context.metrics.get('partial'):
+            cache.put_transactions(keys[1], transactions)
+        document.result = build_result(transactions, self.config.verify, document.context.finish())
+        # Tables are the bulk of a document's memory; drop them before queueing for the sink
+        document.tables = None
+        document.pdf_text = None
+
+    def serialize_document(self, document: Document) -> None:
+        if document.error is not None:
+            result = {"transactions": [], "verification_data": {}, "error": document.error}
+        else:
+            result = document.result or build_result([], self.config.verify)
+        self.sink.write(document.source, result)
+
+    # Plumbing
+
+    def _cached_result(self, document: Document, digest: Optional[str] = None) -> bool:
+        """
+        Looks the document up in the statement cache; on a hit its result is ready and
+        the remaining stages pass it through.
+        """
+        cache = self.config.cache
+        if cache is None:
+            return False
+        document.cache_keys = keys = cache.keys(document.path, self.config.extraction_profile, self.config.markers, digest)
+        transactions = cache.get_transactions(keys[1])
+        if transactions is None:
+            return False
+        document.result = build_result(transactions, self.config.verify, document.context.finish())
+        return True
+
+    @staticmethod
+    def _remove_spooled(document: Document) -> None:
+        if document.local_path is not None:
+            try:
+                os.remove(document.local_path)
+            except OSError:
+                pass
+            document.local_path = None
+
+    def _timed(self, name: str, func: Callable[[Document], None], document: Document) -> None:
+        start = time.perf_counter()
+        try:
+            func(document)
+        finally:
+            with self._stats_lock:
+                self.stats.stage_seconds[name] = self.stats.stage_seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def _stage_worker(self, name: str, func: Callable[[Document], None], inbox: queue.Queue, outbox: queue.Queue,
+                      finished: List[int], workers: int) -> None:
+        while True:
+            document = inbox.get()
+            if document is _DONE:
+                # Let sibling workers see the sentinel; the last one forwards it downstream
+                inbox.put(_DONE)
+                with self._stats_lock:
+                    finished[0] += 1
+                    last = finished[0] == workers
+                if last:
+                    outbox.put(_DONE)
+                return
+            if document.error is None:
+                try:
+                    self._timed(name, func, document)
+                except Exception as e:
+                    document.error = f"{type(e).__name__}: {e}"
+                    document.tables = None
+            outbox.put(document)
+
+    def _serializer(self, inbox: queue.Queue) -> None:
+        while True:
+            document = inbox.get()
+            if document is _DONE:
+                return
+            # A document that failed early still owns its spooled copy and may still be tracing memory
+            self._remove_spooled(document)
+            if document.context is not None and document.context.memory is not None:
+                document.context.memory.stop()
+            try:
+                self._timed('serialize', self.serialize_document, document)
+            except BaseException as e:
+                if self._sink_error is None:
+                    self._sink_error = e
+            finally:
+                with self._stats_lock:
+                    self.stats.documents += 1
+                    if document.error is not None:
+                        self.stats.errors += 1
+                    self._current_in_flight -= 1
+                self._in_flight.release()
+
+    def run(self, sources: Iterable[Tuple[str, str]]) -> PipelineStats:
+        """
+        Parses (source label, file path) pairs and writes each result to the sink.
+        """
+        start = time.perf_counter()
+        load_q: queue.Queue = queue.Queue(self.queue_size)
+        tables_q: queue.Queue = queue.Queue(self.queue_size)
+        extract_q: queue.Queue = queue.Queue(self.queue_size)
+        serialize_q: queue.Queue = queue.Queue(self.queue_size)
+
+        stages = [
+            ('load', self.load_document, load_q, tables_q, self.io_workers),
+            ('tables', self.extract_document_tables, tables_q, extract_q, self.table_workers),
+            ('extract', self.extract_document_transactions, extract_q, serialize_q, 1),
+        ]
+        if self.config.time_budget is not None:
+            self._workers = WorkerPool()
+        elif self.processes > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=worker_context(),
+                                                 initializer=preload_worker)
+        if self.spool_dir is not None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+        threads = []
+        try:
+            for name, func, inbox, outbox, workers in stages:
+                finished = [0]
+                for i in range(workers):
+                    threads.append(threading.Thread(target=self._stage_worker, name=f"pipeline-{name}-{i}",
+                                                    args=(name, func, inbox, outbox, finished, workers), daemon=True))
+            threads.append(threading.Thread(target=self._serializer, name="pipeline-serialize",
+                                            args=(serialize_q,), daemon=True))
+            for thread in threads:
+                thread.start()
+
+            try:
+                for source, path in sources:
+                    # Blocks while max_in_flight documents are still on their way to the sink
+                    self._in_flight.acquire()
+                    with self._stats_lock:
+                        self._current_in_flight += 1
+                        self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._current_in_flight)
+                    load_q.put(Document(source, path, ParseContext(self.config, file_path=path)))
+            finally:
+                # Drain what was already queued even if the source iterator failed
+                load_q.put(_DONE)
+                for thread in threads:
+                    thread.join()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+            if self._workers is not None:
+                self._workers.close()
+                self._workers = None
+
+        self.stats.elapsed = time.perf_counter() - start
+        if self._sink_error is not None:
+            raise self._sink_error
+        return self.stats
+
+
+def run_pipeline(sources: Iterable[Tuple[str, str]], sink: Sink, **options) -> PipelineStats:
+    """
+    Convenience wrapper around BatchPipeline; see its docstring for the available options.
+    """
+    return BatchPipeline(sink, **options).run(sources)
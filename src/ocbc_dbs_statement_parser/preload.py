@@ -0,0 +1,27 @@
+"""
+Imported once by the fork server (see workers.worker_context) before any worker process is
+forked from it. Importing it loads camelot, pandas, pypdf and pycountry and builds the parser's
+process-wide state: the compiled patterns, the location index used by is_location, the default
+marker and exclusion matchers, and the built-in statement parsers with their keyword pattern.
+Forked workers start with all of it in place and share the pages copy-on-write.
+"""
+import gc
+
+from . import main
+from .markers import MarkerConfig
+from .parsers import _keyword_patterns, load_parser, registered_parsers
+
+
+def warm_up() -> None:
+    main.location_keywords()
+    defaults = MarkerConfig()
+    defaults.marker_matcher
+    defaults.exclusion_matcher
+    _keyword_patterns()
+    for spec in registered_parsers():
+        load_parser(spec)
+    # Keep the collector from touching (and so copying) the preloaded objects in every worker
+    gc.freeze()
+
+
+warm_up()
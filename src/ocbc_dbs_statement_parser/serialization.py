@@ -0,0 +1,76 @@
+import json
+from decimal import Decimal
+from typing import IO, Any, Optional, Union, cast
+
+try:
+    import orjson
+except ImportError:  # Optional dependency: pip install ocbc_dbs_statement_parser[fast]
+    orjson = None
+
+BACKENDS = ('auto', 'orjson', 'json')
+
+
+def decimal_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def resolve_backend(backend: str = 'auto') -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if backend == 'auto':
+        return 'orjson' if orjson is not None else 'json'
+    if backend == 'orjson' and orjson is None:
+        raise ValueError("The orjson backend was requested but orjson is not installed")
+    return backend
+
+
+def dumps(obj: Any, compact: bool = False, backend: str = 'auto') -> str:
+    if resolve_backend(backend) == 'orjson' and orjson is not None:
+        option = 0 if compact else orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=decimal_default, option=option).decode('utf-8')
+    if compact:
+        return json.dumps(obj, default=decimal_default, separators=(',', ':'))
+    return json.dumps(obj, indent=2, default=decimal_default)
+
+
+def _is_binary(fp: Union[IO[str], IO[bytes]]) -> bool:
+    return 'b' in getattr(fp, 'mode', '')
+
+
+def dump(obj: Any, fp: Union[IO[str], IO[bytes]], compact: bool = False, backend: str = 'auto') -> None:
+    """
+    Writes obj as JSON followed by a newline.
+
+    orjson encodes in C straight to bytes, which go to the binary buffer underneath
+    text streams such as sys.stdout. The stdlib fallback streams iterencode chunks,
+    so it never builds the whole document as one string.
+    """
+    binary = _is_binary(fp)
+    if resolve_backend(backend) == 'orjson' and orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE | (0 if compact else orjson.OPT_INDENT_2)
+        data = orjson.dumps(obj, default=decimal_default, option=option)
+        buffer: Optional[IO[bytes]] = cast(IO[bytes], fp) if binary else getattr(fp, 'buffer', None)
+        if buffer is not None:
+            fp.flush()
+            buffer.write(data)
+            buffer.flush()
+        else:
+            cast(IO[str], fp).write(data.decode('utf-8'))
+        return
+
+    if compact:
+        encoder = json.JSONEncoder(default=decimal_default, separators=(',', ':'))
+    else:
+        encoder = json.JSONEncoder(default=decimal_default, indent=2)
+    if binary:
+        binary_fp = cast(IO[bytes], fp)
+        for chunk in encoder.iterencode(obj):
+            binary_fp.write(chunk.encode('utf-8'))
+        binary_fp.write(b'\n')
+    else:
+        text_fp = cast(IO[str], fp)
+        for chunk in encoder.iterencode(obj):
+            text_fp.write(chunk)
+        text_fp.write('\n')
@@ -0,0 +1,214 @@
+import abc
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import IO, Dict, List, Optional, Tuple
+
+from . import serialization
+from .archive import transaction_amount, transaction_key
+
+
+class Sink(abc.ABC):
+    """
+    Destination for parse results. write() is called once per statement, from a single thread.
+    """
+
+    @abc.abstractmethod
+    def write(self, source: str, result: Dict) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonLinesSink(Sink):
+    """
+    Writes one JSON object per statement and flushes it straight away,
+    so nothing accumulates in memory between the parser and the consumer.
+    """
+
+    def __init__(self, fp: IO[str], close_fp: bool = False, backend: str = 'auto'):
+        self.fp = fp
+        self.close_fp = close_fp
+        self.backend = serialization.resolve_backend(backend)
+
+    def write(self, source: str, result: Dict) -> None:
+        record = dict(result, source=source)
+        self.fp.write(serialization.dumps(record, compact=True, backend=self.backend))
+        self.fp.write('\n')
+        self.fp.flush()
+
+    def close(self) -> None:
+        if self.close_fp:
+            self.fp.close()
+
+
+class MemorySink(Sink):
+    """
+    Collects results in a list; meant for tests and small batches.
+    """
+
+    def __init__(self):
+        self.results: List[Tuple[str, Dict]] = []
+        self._lock = threading.Lock()
+
+    def write(self, source: str, result: Dict) -> None:
+        with self._lock:
+            self.results.append((source, result))
+
+    def get(self, source: str) -> Optional[Dict]:
+        return next((result for name, result in self.results if name == source), None)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    parsed_at REAL NOT NULL,
+    transaction_count INTEGER NOT NULL,
+    error TEXT,
+    verification TEXT,
+    partial INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    fingerprint BLOB PRIMARY KEY,
+    statement_id INTEGER NOT NULL REFERENCES statements(id),
+    account TEXT,
+    date TEXT,
+    date_text TEXT,
+    description TEXT NOT NULL,
+    amount REAL NOT NULL,
+    withdrawal REAL,
+    deposit REAL,
+    balance REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transactions_statement ON transactions(statement_id);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions(date);
+CREATE INDEX IF NOT EXISTS transactions_account_date ON transactions(account, date);
+"""
+
+_UPSERT_STATEMENT = """
+INSERT INTO statements (source, parsed_at, transaction_count, error, verification) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(source) DO UPDATE SET parsed_at = excluded.parsed_at, transaction_count = excluded.transaction_count,
+    error = excluded.error, verification = excluded.verification, partial = 0
+"""
+
+# Error and partial results say nothing reliable about the statement's transactions, so only
+# the statement's status changes and the rows and counts of its last full parse stay
+_MARK_STATEMENT = """
+INSERT INTO statements (source, parsed_at, transaction_count, error, partial) VALUES (?, ?, 0, ?, ?)
+ON CONFLICT(source) DO UPDATE SET parsed_at = excluded.parsed_at, error = excluded.error, partial = excluded.partial
+"""
+
+_UPSERT_TRANSACTION = """
+INSERT INTO transactions (fingerprint, statement_id, account, date, date_text, description, amount, withdrawal,
+                          deposit, balance)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(fingerprint) DO UPDATE SET statement_id = excluded.statement_id, account = excluded.account,
+    date = excluded.date, date_text = excluded.date_text, description = excluded.description,
+    amount = excluded.amount, withdrawal = excluded.withdrawal, deposit = excluded.deposit, balance = excluded.balance
+"""
+
+
+@lru_cache(maxsize=4096)
+def _iso_date(text: str) -> Optional[str]:
+    try:
+        return datetime.strptime(text, "%d %B %Y").date().isoformat()
+    except ValueError:
+        return None
+
+
+def _optional_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+class SqliteSink(Sink):
+    """
+    Writes results into a SQLite ledger: one row per statement (keyed by source) and
+    one row per transaction. Each statement is written in a single transaction with
+    executemany. Transactions are upserted on a fingerprint of their date, amount,
+    normalized description, balance and account, plus how often that combination
+    already occurred in the statement. Re-loading a statement, or loading an overlapping
+    one, therefore never duplicates rows, while genuine repeats within a statement are kept.
+    A failed or partial parse only marks the statement's row, keeping the transactions
+    of its last full parse.
+    The database runs in WAL mode, so readers can query it while a batch is loading.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # write() is only called from the pipeline's serializer thread, one statement at a time
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(statements)')}
+        if 'partial' not in columns:  # ledgers created before partial results were recorded
+            self.conn.execute('ALTER TABLE statements ADD COLUMN partial INTEGER NOT NULL DEFAULT 0')
+        self.statements = 0
+        self.rows = 0
+
+    @staticmethod
+    def fingerprint(transaction: Dict, occurrence: int = 0) -> bytes:
+        h = hashlib.blake2b(transaction_key(transaction), digest_size=16)
+        h.update(str(transaction.get('Account', '')).encode('utf-8'))
+        h.update(occurrence.to_bytes(4, 'big'))
+        return h.digest()
+
+    def _rows(self, statement_id: int, transactions: List[Dict]) -> List[Tuple]:
+        rows = []
+        seen: Counter = Counter()
+        for transaction in transactions:
+            fingerprint = self.fingerprint(transaction)
+            occurrence = seen[fingerprint]
+            seen[fingerprint] += 1
+            if occurrence:
+                fingerprint = self.fingerprint(transaction, occurrence)
+            date_text = str(transaction.get('Date', ''))
+            rows.append((
+                fingerprint, statement_id, transaction.get('Account'), _iso_date(date_text), date_text,
+                str(transaction.get('Description', '')), transaction_amount(transaction),
+                _optional_float(transaction.get('Withdrawal')), _optional_float(transaction.get('Deposit')),
+                _optional_float(transaction.get('Balance')),
+            ))
+        return rows
+
+    def write(self, source: str, result: Dict) -> None:
+        if result.get('error') is not None or result.get('partial'):
+            with self.conn:
+                self.conn.execute(_MARK_STATEMENT, (source, time.time(), result.get('error'),
+                                                    int(bool(result.get('partial')))))
+            self.statements += 1
+            return
+        transactions = result.get('transactions') or []
+        verification = result.get('verification_data')
+        with self.conn:
+            self.conn.execute(_UPSERT_STATEMENT, (
+                source, time.time(), len(transactions), None,
+                serialization.dumps(verification, compact=True) if verification else None,
+            ))
+            statement_id = self.conn.execute('SELECT id FROM statements WHERE source = ?', (source,)).fetchone()[0]
+            rows = self._rows(statement_id, transactions)
+            # Rows the statement no longer produces (e.g. after a rule change) go; the rest are upserted
+            produced = {row[0] for row in rows}
+            stale = [(fingerprint,) for fingerprint, in self.conn.execute(
+                'SELECT fingerprint FROM transactions WHERE statement_id = ?', (statement_id,))
+                if fingerprint not in produced]
+            self.conn.executemany('DELETE FROM transactions WHERE fingerprint = ?', stale)
+            self.conn.executemany(_UPSERT_TRANSACTION, rows)
+        self.statements += 1
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pandas import DataFrame
+
+
+def header_fingerprint(row: Iterable) -> str:
+    """
+    Builds a stable fingerprint for a raw (unsplit) header row.
+    The raw cell text is used as-is so that lookups never need keyword scans.
+    """
+    raw = '\x1f'.join(str(cell).strip() for cell in row)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class LayoutTemplate:
+    """
+    Everything learned about a table layout the first time its header row was seen.
+    """
+    fingerprint: str
+    split_columns: Dict[int, List[str]]
+    header_mapping: Dict[str, int]
+    is_bank_account: bool
+    column_separators: List[float] = field(default_factory=list)
+    table_area: List[float] = field(default_factory=list)  # x1, y1, x2, y2 in PDF points
+    hits: int = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'fingerprint': self.fingerprint,
+            'split_columns': {str(k): v for k, v in self.split_columns.items()},
+            'header_mapping': self.header_mapping,
+            'is_bank_account': self.is_bank_account,
+            'column_separators': self.column_separators,
+            'table_area': self.table_area,
+            'hits': self.hits,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LayoutTemplate':
+        return cls(
+            fingerprint=data['fingerprint'],
+            split_columns={int(k): v for k, v in data.get('split_columns', {}).items()},
+            header_mapping=dict(data.get('header_mapping', {})),
+            is_bank_account=bool(data.get('is_bank_account', False)),
+            column_separators=list(data.get('column_separators', [])),
+            table_area=list(data.get('table_area', [])),
+            hits=int(data.get('hits', 0)),
+        )
+
+
+@dataclass
+class LayoutMatch:
+    header_index: int
+    template: LayoutTemplate
+
+
+class TemplateRegistry:
+    """
+    Header-fingerprint keyed store of layout templates, optionally persisted as JSON.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._templates: Dict[str, LayoutTemplate] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._templates
+
+    def get(self, fingerprint: str) -> Optional[LayoutTemplate]:
+        return self._templates.get(fingerprint)
+
+    def templates(self) -> List[LayoutTemplate]:
+        """
+        Every known template, in the order they were learned.
+        """
+        with self._lock:
+            return list(self._templates.values())
+
+    def match(self, table: DataFrame) -> Optional[LayoutMatch]:
+        """
+        Returns the first row whose fingerprint belongs to a known layout, if any.
+        """
+        if not self._templates:
+            return None
+        for row_idx, row in enumerate(table.itertuples(index=False)):
+            template = self._templates.get(header_fingerprint(row))
+            if template is not None:
+                with self._lock:
+                    template.hits += 1
+                    self._dirty = True
+                return LayoutMatch(row_idx, template)
+        return None
+
+    def learn(self, header_row: Iterable, split_columns: Dict[int, List[str]], header_mapping: Dict[str, int],
+              is_bank_account: bool, column_separators: Optional[List[float]] = None,
+              table_area: Optional[List[float]] = None) -> LayoutTemplate:
+        fingerprint = header_fingerprint(header_row)
+        template = LayoutTemplate(
+            fingerprint=fingerprint,
+            split_columns={k: list(v) for k, v in split_columns.items()},
+            header_mapping=dict(header_mapping),
+            is_bank_account=is_bank_account,
+            column_separators=list(column_separators or []),
+            table_area=list(table_area or []),
+        )
+        with self._lock:
+            existing = self._templates.setdefault(fingerprint, template)
+            if existing is not template and table_area:
+                # Grow the area to cover every table seen with this layout
+                if existing.table_area:
+                    x1, y1, x2, y2 = existing.table_area
+                    existing.table_area = [min(x1, table_area[0]), min(y1, table_area[1]),
+                                           max(x2, table_area[2]), max(y2, table_area[3])]
+                else:
+                    existing.table_area = list(table_area)
+            self._dirty = True
+            return existing
+
+    def load(self, path: str) -> None:
+        with open(path, 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+        with self._lock:
+            for item in data.get('templates', []):
+                template = LayoutTemplate.from_dict(item)
+                self._templates[template.fingerprint] = template
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            if not self._dirty and os.path.exists(path):
+                return
+            payload = {'templates': [t.to_dict() for t in self._templates.values()]}
+            self._dirty = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(payload, fh, indent=2)
+        os.replace(tmp_path, path)
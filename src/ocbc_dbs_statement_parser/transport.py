@@ -0,0 +1,151 @@
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:  # Python 3.8+
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover - Python 3.7 pickles the tables instead
+    shared_memory = None
+
+_CODE = np.dtype('<u4')
+_OFFSET = np.dtype('<u8')
+
+
+@dataclass
+class TableLayout:
+    shape: Tuple[int, int]
+    index: Any  # None for the default RangeIndex, which camelot's tables have
+    columns: Any
+    attrs: Dict[Hashable, Any]
+
+    @classmethod
+    def of(cls, table: pd.DataFrame) -> 'TableLayout':
+        return cls(table.shape, _labels(table.index), _labels(table.columns), dict(table.attrs))
+
+
+def _labels(labels: pd.Index) -> Any:
+    if isinstance(labels, pd.RangeIndex) and labels.start == 0 and labels.step == 1:
+        return None
+    return labels
+
+
+@dataclass
+class SharedTables:
+    """
+    Handle to tables packed into a shared memory block by pack_tables, small enough to pickle
+    cheaply. The block holds, for every table in turn, one code per cell in row-major order,
+    then the offsets of each distinct string within the text that follows, as UTF-8:
+
+        codes (uint32 x cells) | offsets (uint64 x strings + 1) | text
+
+    Statements repeat the same descriptions, dates and blank cells many times, so each distinct
+    string crosses the process boundary once.
+    """
+    name: str
+    cells: int
+    strings: int
+    text_bytes: int
+    layouts: List[TableLayout]
+
+
+def pack_tables(tables: List[pd.DataFrame]) -> Union[SharedTables, List[pd.DataFrame]]:
+    """
+    Packs string tables into shared memory for unpack_tables to read in another process.
+    Returns the tables themselves, to be pickled as usual, where shared memory is not
+    available or a cell is not a string.
+
+    The block stays registered with the resource tracker, which worker processes share with
+    the parent, until the parent unlinks it in unpack_tables or release_tables. A block whose
+    handle never reaches the parent, because the worker was killed first, is unlinked by the
+    tracker when the parent exits.
+    """
+    if shared_memory is None or not tables:
+        return tables
+    cells = np.concatenate([table.to_numpy(dtype=object).ravel() for table in tables])
+    if pd.api.types.infer_dtype(cells, skipna=False) not in ('string', 'empty'):
+        return tables
+    code_array, strings = pd.factorize(cells)
+    code_array = code_array.astype(_CODE)
+    offsets = np.zeros(len(strings) + 1, dtype=_OFFSET)
+    # Offsets count characters, so the parent decodes the text once and slices it
+    offsets[1:] = np.cumsum(np.fromiter(map(len, strings), dtype=np.int64, count=len(strings)))
+    text = ''.join(strings).encode('utf-8')
+    size = code_array.nbytes + offsets.nbytes + len(text)
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        buffer = _buffer(block)
+        end = code_array.nbytes
+        buffer[:end] = code_array.tobytes()
+        buffer[end:end + offsets.nbytes] = offsets.tobytes()
+        buffer[end + offsets.nbytes:size] = text
+        del buffer
+        packed = SharedTables(block.name, len(code_array), len(strings), len(text),
+                              [TableLayout.of(table) for table in tables])
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    block.close()
+    return packed
+
+
+def _buffer(block) -> memoryview:
+    buffer = block.buf
+    if buffer is None:
+        raise ValueError(f"shared memory block {block.name} is closed")
+    return buffer
+
+
+def release_tables(packed: Union[SharedTables, List[pd.DataFrame]]) -> None:
+    """
+    Frees the shared memory block of tables that will not be unpacked, such as a result that
+    arrived after its caller gave up on it.
+    """
+    if not isinstance(packed, SharedTables):
+        return
+    assert shared_memory is not None  # only pack_tables makes SharedTables, and only with shared memory
+    try:
+        block = shared_memory.SharedMemory(name=packed.name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def unpack_tables(packed: Union[SharedTables, List[pd.DataFrame]]) -> List[pd.DataFrame]:
+    """
+    The tables packed by pack_tables, with equal cells sharing one interned string.
+    Frees the shared memory block.
+    """
+    if not isinstance(packed, SharedTables):
+        return packed
+    assert shared_memory is not None  # only pack_tables makes SharedTables, and only with shared memory
+    block = shared_memory.SharedMemory(name=packed.name)
+    try:
+        buffer = _buffer(block)
+        codes = np.frombuffer(buffer, dtype=_CODE, count=packed.cells)
+        start = codes.nbytes
+        offsets = np.frombuffer(buffer, dtype=_OFFSET, count=packed.strings + 1, offset=start).tolist()
+        start += (packed.strings + 1) * _OFFSET.itemsize
+        text = bytes(buffer[start:start + packed.text_bytes]).decode('utf-8')
+        values = np.empty(packed.strings, dtype=object)
+        values[:] = [sys.intern(text[offsets[i]:offsets[i + 1]]) for i in range(packed.strings)]
+        cells = values[codes]
+        del codes, buffer
+    finally:
+        block.close()
+        block.unlink()
+    tables = []
+    position = 0
+    for layout in packed.layouts:
+        rows, columns = layout.shape
+        table = pd.DataFrame(cells[position:position + rows * columns].reshape(rows, columns),
+                             index=layout.index, columns=layout.columns, dtype=object, copy=False)
+        table.attrs.update(layout.attrs)
+        tables.append(table)
+        position += rows * columns
+    return tables
+
@@ -0,0 +1,290 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .archive import STATEMENT_EXTENSIONS
+from .cache import file_digest
+from .pipeline import BatchPipeline, PipelineStats
+from .sinks import Sink
+
+MANIFEST_NAME = '.statement-manifest.json'
+
+# inotify(7) events after which a file is complete: written and closed, or moved in
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100  # new subdirectories need a watch of their own
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+
+class Manifest:
+    """
+    What has been parsed so far, optionally persisted as JSON:
+
+        files:   path -> size, mtime and content hash when last seen
+        digests: content hash -> parse status ('ok', 'partial' or 'error'), source and error
+
+    The stat fields let a rescan skip hashing files that have not changed; the digests
+    make a renamed or re-uploaded statement a no-op.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        self.digests: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+            self.files.update(data.get('files', {}))
+            self.digests.update(data.get('digests', {}))
+
+    def digest(self, path: str, stat: os.stat_result) -> str:
+        """
+        Content hash of path, reusing the recorded one while size and mtime are unchanged.
+        """
+        with self._lock:
+            known = self.files.get(path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['digest']
+        digest = file_digest(path)
+        with self._lock:
+            self.files[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest}
+            self._dirty = True
+        return digest
+
+    def status(self, digest: str) -> Optional[str]:
+        with self._lock:
+            entry = self.digests.get(digest)
+        return entry['status'] if entry else None
+
+    def record(self, digest: str, source: str, error: Optional[str] = None, partial: bool = False) -> None:
+        status = 'error' if error else 'partial' if partial else 'ok'
+        with self._lock:
+            self.digests[digest] = {'status': status, 'source': source, 'error': error, 'parsed_at': time.time()}
+            self._dirty = True
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            if not self._dirty and os.path.exists(path):
+                return
+            payload = {'files': dict(self.files), 'digests': dict(self.digests)}
+            self._dirty = False
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(payload, fh, indent=2)
+        os.replace(tmp_path, path)
+
+
+class _Inotify:
+    """
+    Minimal inotify binding. Events only wake the watcher up; what changed is found by rescanning.
+    """
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._watched: set = set()
+
+    def add(self, directory: str) -> None:
+        if directory in self._watched:
+            return
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK) >= 0:
+            self._watched.add(directory)
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _open_inotify() -> Optional[_Inotify]:
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        return _Inotify()
+    except (OSError, AttributeError):
+        return None
+
+
+class WatchedSource(str):
+    """
+    The source label of a queued statement, its path, carrying the digest of the version that
+    was queued, so the result is recorded against that content even if the file has changed since.
+    """
+    digest: str
+
+    def __new__(cls, path: str, digest: str) -> 'WatchedSource':
+        source = super().__new__(cls, path)
+        source.digest = digest
+        return source
+
+
+class FolderWatcher:
+    """
+    Yields new or changed statements under a directory as they appear, for BatchPipeline.run.
+    On Linux it sleeps on inotify; elsewhere, or with poll=True, it rescans every interval seconds.
+    A file is only queued once its mtime is settle seconds old, so half-copied files are not parsed.
+    Content that was already parsed is skipped, whether it succeeded or failed; a failed
+    statement is retried once the file changes. With retry_errors=True, statements that failed
+    or came back partial (e.g. after a timeout) in earlier runs are parsed once more, e.g. after
+    raising the time budgets.
+    """
+
+    def __init__(self, directory: str, manifest: Manifest, interval: float = 2.0, settle: float = 1.0,
+                 poll: bool = False, retry_errors: bool = False):
+        self.directory = directory
+        self.manifest = manifest
+        self.interval = interval
+        self.settle = settle
+        self.retry_errors = retry_errors
+        self._retried: set = set()  # digests retried by this watcher, which only retries each once
+        self._queued: set = set()  # digests in the pipeline
+        self._unsettled = False
+        self._inotify = None if poll else _open_inotify()
+        self._lock = threading.Lock()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def scan(self) -> List[Tuple[str, str]]:
+        """
+        (source, path) for every settled statement that is new or changed since it was last parsed.
+        The source is a WatchedSource, to be handed back to done with the statement's result.
+        """
+        found = []
+        now = time.time()
+        self._unsettled = False
+        for root, dirs, files in os.walk(self.directory):
+            dirs.sort()
+            if self._inotify is not None:
+                self._inotify.add(root)
+            for name in sorted(files):
+                if not name.lower().endswith(STATEMENT_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime < self.settle:
+                    self._unsettled = True
+                    continue
+                digest = self.manifest.digest(path, stat)
+                with self._lock:
+                    if digest in self._queued or not self._wanted(digest):
+                        continue
+                    self._queued.add(digest)
+                found.append((WatchedSource(path, digest), path))
+        return found
+
+    def _wanted(self, digest: str) -> bool:
+        status = self.manifest.status(digest)
+        if status is None:
+            return True
+        if status == 'ok' or not self.retry_errors or digest in self._retried:
+            return False
+        self._retried.add(digest)
+        return True
+
+    def done(self, source: WatchedSource, error: Optional[str] = None, partial: bool = False) -> None:
+        """
+        Records the parse of the version of a statement that scan queued.
+        """
+        with self._lock:
+            self._queued.discard(source.digest)
+        self.manifest.record(source.digest, str(source), error, partial)
+
+    def wait(self, stop: threading.Event) -> None:
+        timeout = self.settle if self._unsettled else self.interval
+        if self._inotify is None:
+            stop.wait(timeout)
+            return
+        # Still poll now and then: inotify misses changes on network filesystems
+        deadline = time.monotonic() + (timeout if self._unsettled else max(self.interval, 60.0))
+        while not stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._inotify.wait(min(remaining, 1.0)):
+                return
+
+    def sources(self, stop: Optional[threading.Event] = None, once: bool = False) -> Iterator[Tuple[str, str]]:
+        """
+        Yields statements until stop is set; with once=True, returns after the first scan
+        that finds nothing left to settle.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            yield from self.scan()
+            if once and not self._unsettled:
+                return
+            self.wait(stop)
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+class ManifestSink(Sink):
+    """
+    Passes results on to a sink and records each statement's parse status in the manifest,
+    saving it at most every save_interval seconds (and on close). The wrapped sink is left open.
+    """
+
+    def __init__(self, sink: Sink, watcher: FolderWatcher, save_interval: float = 5.0):
+        self.sink = sink
+        self.watcher = watcher
+        self.save_interval = save_interval
+        self._saved_at = time.monotonic()
+
+    def write(self, source: str, result: Dict) -> None:
+        self.sink.write(str(source), result)
+        if isinstance(source, WatchedSource):
+            self.watcher.done(source, result.get('error'), bool(result.get('partial')))
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.watcher.manifest.save()
+            self._saved_at = time.monotonic()
+
+    def close(self) -> None:
+        self.watcher.manifest.save()
+
+
+def watch_folder(directory: str, sink: Sink, manifest_path: Optional[str] = None, once: bool = False,
+                 stop: Optional[threading.Event] = None, interval: float = 2.0, settle: float = 1.0,
+                 poll: bool = False, retry_errors: bool = False, **options) -> PipelineStats:
+    """
+    Parses every new or changed statement under directory through a BatchPipeline
+    (options are passed on to it) and writes the results to sink, until stop is set
+    or, with once=True, until nothing is left to parse. The manifest defaults to
+    MANIFEST_NAME inside the directory. With retry_errors=True, statements that failed or
+    came back partial before are parsed again (see FolderWatcher).
+    """
+    manifest = Manifest(manifest_path or os.path.join(directory, MANIFEST_NAME))
+    watcher = FolderWatcher(directory, manifest, interval=interval, settle=settle, poll=poll,
+                            retry_errors=retry_errors)
+    try:
+        with ManifestSink(sink, watcher) as manifest_sink:
+            return BatchPipeline(manifest_sink, **options).run(watcher.sources(stop, once))
+    finally:
+        watcher.close()
@@ -0,0 +1,55 @@
+import multiprocessing
+import threading
+from typing import TYPE_CHECKING, Union
+
+try:
+    from multiprocessing import forkserver
+except ImportError:  # pragma: no cover - Windows has no fork server
+    forkserver = None
+
+if TYPE_CHECKING:
+    from multiprocessing.context import ForkServerContext, SpawnContext
+
+    WorkerContext = Union[ForkServerContext, SpawnContext]
+
+PRELOAD_MODULE = 'ocbc_dbs_statement_parser.preload'
+
+_preload_lock = threading.Lock()
+
+
+def worker_context() -> 'WorkerContext':
+    """
+    multiprocessing context for the package's worker processes. Where available this is the
+    forkserver start method with PRELOAD_MODULE preloaded, so imports and parser state are
+    built once in the server rather than once per worker; elsewhere it is spawn, and workers
+    import the preload module themselves (see preload_worker).
+
+    There is one fork server per process, shared with the rest of the application, and its
+    preload list is process-wide. PRELOAD_MODULE is therefore only added to that list while the
+    server is not running yet, next to the modules already on it. If the application started
+    the server first, workers fork from it as it is and import PRELOAD_MODULE themselves.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    _add_forkserver_preload()
+    return multiprocessing.get_context('forkserver')
+
+
+def _add_forkserver_preload() -> None:
+    # multiprocessing has no public way to ask whether its fork server runs or what it preloads
+    server = getattr(forkserver, '_forkserver', None)
+    if server is None:
+        return
+    with _preload_lock:
+        if getattr(server, '_forkserver_pid', None) is not None:
+            return  # a new preload list would only take effect after a restart
+        modules = list(getattr(server, '_preload_modules', None) or [])
+        if PRELOAD_MODULE not in modules:
+            server.set_forkserver_preload(modules + [PRELOAD_MODULE])
+
+
+def preload_worker() -> None:
+    """
+    Pool initializer: imports PRELOAD_MODULE, which a forked worker already has.
+    """
+    __import__(PRELOAD_MODULE)
@@ -2,6 +2,8 @@ from typing import List, Any, Optional
 
 class Table:
     df: Any
+    cols: List[Any]
+    page: Any
 
 def read_pdf(
     filepath: str,
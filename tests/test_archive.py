@@ -0,0 +1,64 @@
+import os
+import zipfile
+import pytest
+from ocbc_dbs_statement_parser.archive import (
+    LedgerIndex,
+    iter_statement_files,
+    normalize_description,
+    transaction_key,
+)
+
+
+class TestArchive:
+
+    @pytest.mark.parametrize("description, expected", [
+        ("FAST PAYMENT  via PayNow-Mobile", "FAST PAYMENT VIA PAYNOW MOBILE"),
+        ("fast payment via paynow mobile", "FAST PAYMENT VIA PAYNOW MOBILE"),
+        ("  -5678 RESTAURANT (MALL)  ", "5678 RESTAURANT MALL"),
+    ])
+    def test_normalize_description(self, description, expected):
+        assert normalize_description(description) == expected
+
+    def test_transaction_key_ignores_formatting_noise(self):
+        a = {'Date': '03 July 2024', 'Description': 'FAST PAYMENT via PayNow', 'Withdrawal': -22.54, 'Deposit': 0, 'Balance': 57147.43}
+        b = {'Date': '03 July 2024', 'Description': 'FAST  PAYMENT VIA PAYNOW', 'Withdrawal': -22.540, 'Deposit': 0.0, 'Balance': 57147.430}
+        c = dict(a, Balance=57100.0)
+        assert transaction_key(a) == transaction_key(b)
+        assert transaction_key(a) != transaction_key(c)
+
+    def test_ledger_index_drops_overlap_but_keeps_repeats_within_a_statement(self):
+        coffee = {'Date': '01 July 2024', 'Description': 'COFFEE', 'Amount': -4.5}
+        lunch = {'Date': '02 July 2024', 'Description': 'LUNCH', 'Amount': -12.0}
+        dinner = {'Date': '31 July 2024', 'Description': 'DINNER', 'Amount': -30.0}
+
+        index = LedgerIndex()
+        assert index.add_statement([coffee, dict(coffee), lunch]) == [coffee, coffee, lunch]
+        # Overlapping export re-lists both coffees and lunch, plus one new row
+        assert index.add_statement([dict(coffee), dict(coffee), dict(lunch), dinner]) == [dinner]
+        assert index.duplicates == 3
+        # A third coffee on the same day is new
+        assert len(index.add_statement([dict(coffee)] * 3)) == 1
+
+    def test_iter_statement_files_walks_directories_and_zips(self, tmp_path):
+        extract_dir = tmp_path / 'extract'
+        extract_dir.mkdir()
+        root = tmp_path / 'statements'
+        (root / 'b').mkdir(parents=True)
+        (root / 'a.pdf').write_bytes(b'%PDF-a')
+        (root / 'b' / 'c.PDF').write_bytes(b'%PDF-c')
+        (root / 'notes.txt').write_text('ignored')
+        with zipfile.ZipFile(root / 'b' / 'bundle.zip', 'w') as archive:
+            archive.writestr('2024/jul.pdf', b'%PDF-jul')
+            archive.writestr('readme.txt', 'ignored')
+
+        sources = list(iter_statement_files([str(root)], str(extract_dir)))
+
+        labels = [label for label, _ in sources]
+        assert labels == [
+            str(root / 'a.pdf'),
+            str(root / 'b' / 'bundle.zip') + '!2024/jul.pdf',
+            str(root / 'b' / 'c.PDF'),
+        ]
+        with open(sources[1][1], 'rb') as fh:
+            assert fh.read() == b'%PDF-jul'
+        assert os.path.commonpath([sources[1][1], str(extract_dir)]) == str(extract_dir)
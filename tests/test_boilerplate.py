@@ -0,0 +1,111 @@
+import json
+import os
+from ocbc_dbs_statement_parser.boilerplate import BoilerplateIndex, extract_page_texts, page_hash
+from ocbc_dbs_statement_parser.context import ParseContext, ParserConfig
+from ocbc_dbs_statement_parser.deadline import TimeBudget
+from ocbc_dbs_statement_parser.main import main
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'corpus')
+CARD_STATEMENT = os.path.join(CORPUS, 'dbs_card_multi_page.pdf')
+
+TERMS = "Terms and Conditions\nPage 3 of 4\nLate payment charge of S$100 applies from 23 May 2024."
+
+
+class TestPageHash:
+
+    def test_ignores_digits_punctuation_and_case(self):
+        assert page_hash(TERMS) == page_hash(TERMS.replace('3 of 4', '4 of 5').replace('23 May 2024', '23 JUN 2024').upper())
+
+    def test_different_words_differ(self):
+        assert page_hash(TERMS) != page_hash(TERMS.replace('Late', 'Early'))
+        assert page_hash(None) == page_hash('')
+
+
+class TestBoilerplateIndex:
+
+    def test_pages_are_skipped_after_min_sightings(self):
+        index = BoilerplateIndex(min_sightings=2)
+        hashes = ['front', 'transactions', 'terms']
+        assert index.pages_to_extract(hashes) == [1, 2, 3]
+        index.learn(hashes, [1, 2, 3], transaction_pages=[1, 2])
+        assert index.pages_to_extract(hashes) == [1, 2, 3]
+        index.learn(hashes, [1, 2, 3], transaction_pages=[1, 2])
+        assert index.pages_to_extract(hashes) == [1, 2]
+        assert len(index) == 1
+        assert index.stats.to_dict() == {'documents': 3, 'pages_seen': 9, 'pages_skipped': 1, 'hit_rate': 0.1111}
+
+    def test_first_page_is_always_extracted(self):
+        index = BoilerplateIndex(min_sightings=1)
+        index.learn(['cover', 'terms'], [1, 2], transaction_pages=[])
+        assert index.pages_to_extract(['cover', 'terms']) == [1]
+
+    def test_pages_that_ever_held_transactions_are_never_skipped(self):
+        index = BoilerplateIndex(min_sightings=1)
+        index.learn(['front', 'summary'], [1, 2], transaction_pages=[1])
+        assert index.is_boilerplate('summary')
+        index.learn(['front', 'summary'], [1, 2], transaction_pages=[1, 2])
+        index.learn(['front', 'summary'], [1, 2], transaction_pages=[1])
+        assert not index.is_boilerplate('summary')
+
+    def test_skipped_pages_are_not_relearned(self):
+        index = BoilerplateIndex(min_sightings=1)
+        index.learn(['front', 'terms'], [1, 2], transaction_pages=[1])
+        index.learn(['front', 'terms'], [1], transaction_pages=[1])
+        assert index._sightings == {'terms': 1}
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "boilerplate.json")
+        index = BoilerplateIndex(path, min_sightings=1)
+        index.learn(['front', 'terms'], [1, 2], transaction_pages=[1])
+        index.save()
+        assert json.loads(open(path).read()) == {'boilerplate': {'terms': 1}, 'content': ['front']}
+        reloaded = BoilerplateIndex(path, min_sightings=1)
+        assert reloaded.is_boilerplate('terms') and not reloaded.is_boilerplate('front')
+
+
+class TestParsing:
+
+    def test_known_boilerplate_pages_skip_camelot(self):
+        page_texts = extract_page_texts(CARD_STATEMENT)
+        index = BoilerplateIndex(min_sightings=1)
+        # Pretend the last page was seen before without transactions
+        index.learn([page_hash(text) for text in page_texts], [3], transaction_pages=[])
+        ctx = ParseContext(ParserConfig(boilerplate=index))
+        transactions = main(CARD_STATEMENT, ctx=ctx)
+        assert ctx.pages == [1, 2]
+        assert ctx.transaction_pages == {1, 2}
+        assert ctx.metrics['pages_skipped'] == 1
+        assert transactions and index.stats.pages_skipped == 1
+
+    def test_known_boilerplate_pages_skip_camelot_under_a_time_budget(self):
+        page_texts = extract_page_texts(CARD_STATEMENT)
+        index = BoilerplateIndex(min_sightings=1)
+        index.learn([page_hash(text) for text in page_texts], [3], transaction_pages=[])
+        ctx = ParseContext(ParserConfig(boilerplate=index, time_budget=TimeBudget(page=60)))
+        assert main(CARD_STATEMENT, ctx=ctx)
+        assert ctx.pages == [1, 2] and ctx.transaction_pages == {1, 2}
+
+    def test_transaction_pages_are_learned(self):
+        index = BoilerplateIndex(min_sightings=1)
+        ctx = ParseContext(ParserConfig(boilerplate=index))
+        main(CARD_STATEMENT, ctx=ctx)
+        assert ctx.pages == [1, 2, 3] and ctx.transaction_pages == {1, 2, 3}
+        assert len(index) == 0 and len(index._content) == 3
+
+    def test_tables_without_pages_are_not_learned(self, monkeypatch):
+        from ocbc_dbs_statement_parser import main as main_module
+        extract_tables = main_module.extract_tables
+
+        def without_pages(*args):
+            tables = extract_tables(*args)
+            for table in tables:
+                table.attrs.pop('page', None)
+            return tables
+
+        monkeypatch.setattr(main_module, 'extract_tables', without_pages)
+        index = BoilerplateIndex(min_sightings=1)
+        ctx = ParseContext(ParserConfig(boilerplate=index))
+        assert main(CARD_STATEMENT, ctx=ctx)
+        assert ctx.transaction_pages is None
+        # Otherwise every page would have been learned as boilerplate
+        assert len(index) == 0 and len(index._content) == 0
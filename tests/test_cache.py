@@ -0,0 +1,90 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from ocbc_dbs_statement_parser import main as parser_main
+from ocbc_dbs_statement_parser.cache import StatementCache, rules_version, tables_version
+from ocbc_dbs_statement_parser.markers import MarkerConfig
+
+
+def card_table():
+    table = pd.DataFrame([
+        ['DATE', 'DESCRIPTION', 'AMOUNT (S$)'],
+        ['23 APR', 'GRAB RIDES', '10.00'],
+        ['', 'SUB-TOTAL:', '10.00'],
+    ])
+    table.attrs['column_separators'] = [95.0, 300.0]
+    return table
+
+
+@pytest.fixture
+def statement(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_extract_tables(file_path, profile=None, pages=None, password=None):
+        calls.append(file_path)
+        return [card_table()]
+
+    monkeypatch.setattr(parser_main, 'extract_tables', fake_extract_tables)
+    monkeypatch.setattr(parser_main, 'extract_pdf_text', lambda file_path: 'Statement Date 23-05-2024')
+    path = tmp_path / 'statement.pdf'
+    path.write_bytes(b'%PDF-1.4 statement')
+    return str(path), calls
+
+
+class TestStatementCache:
+
+    def test_tables_round_trip(self, tmp_path):
+        cache = StatementCache(str(tmp_path))
+        cache.put_tables('k', [card_table(), pd.DataFrame()])
+        tables = cache.get_tables('k')
+        assert tables[0].equals(card_table())
+        assert tables[0].attrs == {'column_separators': [95.0, 300.0]}
+        assert tables[1].empty
+
+    def test_result_hit_skips_extraction(self, tmp_path, statement):
+        path, calls = statement
+        cache = StatementCache(str(tmp_path / 'cache'))
+        first = parser_main.parse_bank_statement(path, verify=True, cache=cache)
+        second = parser_main.parse_bank_statement(path, verify=True, cache=cache)
+        assert len(calls) == 1
+        assert first['transactions'] == second['transactions'] == [
+            {'Date': '23 April 2024', 'Amount': -10.0, 'Description': 'GRAB RIDES'}]
+        assert second['verification_data'] == first['verification_data']
+        assert cache.stats.hits['results'] == 1
+
+    def test_rule_change_reuses_cached_tables(self, tmp_path, statement):
+        path, calls = statement
+        cache = StatementCache(str(tmp_path / 'cache'))
+        parser_main.parse_bank_statement(path, cache=cache)
+        markers = MarkerConfig().extend(['GRAB'])
+        result = parser_main.parse_bank_statement(path, markers=markers, cache=cache)
+        assert len(calls) == 1
+        assert cache.stats.hits['tables'] == 1
+        assert result['transactions'][0]['Description'] == 'GRAB RIDES'
+
+    def test_rules_version_tracks_markers(self):
+        assert rules_version() == rules_version(MarkerConfig())
+        assert rules_version() != rules_version(MarkerConfig().extend(['BALANCE BROUGHT FORWARD']))
+
+    def test_tables_version_tracks_profile(self):
+        assert tables_version('default') != tables_version('fast')
+
+    def test_prune(self, tmp_path, statement):
+        path, _ = statement
+        cache = StatementCache(str(tmp_path / 'cache'))
+        parser_main.parse_bank_statement(path, cache=cache)
+        parser_main.parse_bank_statement(path, markers=MarkerConfig().extend(['GRAB']), cache=cache)
+        assert cache.entries()['results']['entries'] == 2
+
+        removed = cache.prune(tables_version=tables_version(), rules_version=rules_version())
+        assert removed == {'tables': 0, 'results': 1}
+
+        old = time.time() - 10 * 86400
+        for layer in ('tables', 'results'):
+            for name in os.listdir(tmp_path / 'cache' / layer):
+                os.utime(tmp_path / 'cache' / layer / name, (old, old))
+        assert cache.prune(max_age=86400) == {'tables': 1, 'results': 1}
+        assert cache.entries() == {'tables': {'entries': 0, 'bytes': 0}, 'results': {'entries': 0, 'bytes': 0}}
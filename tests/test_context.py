@@ -0,0 +1,85 @@
+import contextlib
+import io
+import threading
+
+import pandas as pd
+
+from ocbc_dbs_statement_parser.context import ParseContext, ParserConfig, current_context, debug_enabled
+from ocbc_dbs_statement_parser.main import extract_transactions, is_location
+
+
+def card_tables():
+    return [pd.DataFrame([
+        ['DATE', 'DESCRIPTION', 'AMOUNT (S$)'],
+        ['23 APR', 'GRAB RIDES', '10.00'],
+        ['', 'SUB-TOTAL:', '10.00'],
+    ])]
+
+
+PDF_TEXT = 'Credit Cards\nStatement Date 23-05-2024\n'
+
+
+class TestParseContext:
+
+    def test_default_context_is_not_debug(self):
+        assert isinstance(current_context(), ParseContext)
+        assert not debug_enabled()
+
+    def test_activate_is_scoped(self):
+        ctx = ParseContext(ParserConfig(debug=True))
+        with ctx.activate():
+            assert current_context() is ctx
+            assert debug_enabled()
+        assert not debug_enabled()
+
+    def test_stage_accumulates_seconds(self):
+        ctx = ParseContext()
+        with ctx.stage('tables'):
+            pass
+        with ctx.stage('tables'):
+            pass
+        assert 'tables_seconds' in ctx.metrics
+        assert ctx.metrics['tables_seconds'] >= 0.0
+
+    def test_debug_does_not_leak_between_threads(self):
+        barrier = threading.Barrier(2)
+        seen = {}
+
+        def worker(name, debug):
+            with ParseContext(ParserConfig(debug=debug)).activate():
+                barrier.wait()
+                seen[name] = debug_enabled()
+                barrier.wait()
+
+        threads = [threading.Thread(target=worker, args=('debug', True)),
+                   threading.Thread(target=worker, args=('quiet', False))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert seen == {'debug': True, 'quiet': False}
+
+    def test_debug_output_only_for_debug_context(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            is_location('SINGAPORE')
+        assert out.getvalue() == ''
+        with contextlib.redirect_stdout(out), ParseContext(ParserConfig(debug=True)).activate():
+            is_location('SINGAPORE')
+        assert 'is_location' in out.getvalue()
+
+    def test_extract_transactions_records_statement_and_metrics(self):
+        ctx = ParseContext()
+        transactions = extract_transactions(card_tables(), 'statement.pdf', PDF_TEXT, ctx=ctx)
+        assert ctx.statement_year == '2024'
+        assert transactions == [{'Date': '23 April 2024', 'Amount': -10.0, 'Description': 'GRAB RIDES'}]
+        assert 'classify_seconds' in ctx.metrics
+        assert 'extract_seconds' in ctx.metrics
+
+
+    def test_statements_without_transactions_write_nothing_to_stdout(self):
+        # batch and watch stream JSON lines on stdout
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            assert extract_transactions([], 'statement.pdf', PDF_TEXT, ctx=ParseContext()) == []
+        assert out.getvalue() == ''
@@ -0,0 +1,48 @@
+"""
+End-to-end regression corpus: every statement in tests/corpus is parsed in full and must
+produce exactly its expected transactions within its time budget from manifest.json.
+
+Set CORPUS_BUDGET_SCALE to stretch the budgets on slow machines (e.g. 3 for 3x), or to 0
+to skip the latency checks. Regenerate the corpus with benchmarks/synthetic.py.
+"""
+import json
+import os
+import time
+
+import pytest
+
+from ocbc_dbs_statement_parser.main import parse_bank_statement
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), 'corpus')
+BUDGET_SCALE = float(os.environ.get('CORPUS_BUDGET_SCALE', '1'))
+
+
+def load_manifest():
+    with open(os.path.join(CORPUS_DIR, 'manifest.json'), encoding='utf-8') as fh:
+        return json.load(fh)['statements']
+
+
+def first_difference(actual, expected):
+    for index, (got, want) in enumerate(zip(actual, expected)):
+        if got != want:
+            return f"transaction {index}: got {got}, expected {want}"
+    return f"got {len(actual)} transactions, expected {len(expected)}"
+
+
+@pytest.mark.parametrize("entry", load_manifest(), ids=lambda entry: entry['name'])
+def test_corpus_statement(entry):
+    pdf_path = os.path.join(CORPUS_DIR, f"{entry['name']}.pdf")
+    with open(os.path.join(CORPUS_DIR, f"{entry['name']}.expected.json"), encoding='utf-8') as fh:
+        expected = json.load(fh)['transactions']
+
+    # Best of two runs, so one-off hiccups (first camelot import, a busy CI host) don't fail the budget
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        result = parse_bank_statement(pdf_path)
+        timings.append(time.perf_counter() - start)
+        assert result['transactions'] == expected, first_difference(result['transactions'], expected)
+
+    if BUDGET_SCALE > 0:
+        budget = entry['budget_seconds'] * BUDGET_SCALE
+        assert min(timings) <= budget, f"{entry['name']} took {min(timings):.3f}s, budget {budget:.3f}s"
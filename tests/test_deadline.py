@@ -0,0 +1,122 @@
+import os
+import time
+import pandas as pd
+import pytest
+from ocbc_dbs_statement_parser import main, pipeline
+from ocbc_dbs_statement_parser.cache import StatementCache
+from ocbc_dbs_statement_parser.deadline import PageTimeout, PageWorker, TimeBudget, extract_pages
+from ocbc_dbs_statement_parser.main import extract_pdf_text, parse_bank_statement
+from ocbc_dbs_statement_parser.pipeline import BatchPipeline
+from ocbc_dbs_statement_parser.sinks import MemorySink
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'corpus')
+MULTI_PAGE = os.path.join(CORPUS, 'dbs_account_multi_page.pdf')
+
+
+def fake_extract(source, profile, pages, password=None):
+    # Page 2 hangs the way a malformed page can hang camelot
+    if pages == [2]:
+        time.sleep(60)
+    table = pd.DataFrame([[source, pages[0]]])
+    table.attrs['page'] = pages[0]
+    return [table]
+
+
+def failing_extract(source, profile, pages, password=None):
+    raise ValueError(f"bad page {pages[0]}")
+
+
+@pytest.fixture
+def unbounded_load(monkeypatch):
+    # The budgets below are too small to even read the PDF; let the load stage through in this
+    # process so that it is camelot that runs out of time
+    def read_text(file_path, ctx, pool=None, data=None):
+        return extract_pdf_text(file_path)
+
+    monkeypatch.setattr(main, 'read_text_within_budget', read_text)
+    monkeypatch.setattr(pipeline, 'read_text_within_budget', read_text)
+
+
+@pytest.fixture
+def worker():
+    worker = PageWorker(preload=())
+    yield worker
+    worker.close()
+
+
+class TestTimeBudget:
+
+    def test_of_returns_none_without_limits(self):
+        assert TimeBudget.of() is None
+        assert TimeBudget.of(page=1.0) == TimeBudget(page=1.0)
+
+    def test_limits_must_be_positive(self):
+        with pytest.raises(ValueError, match="page time budget"):
+            TimeBudget(page=0)
+
+
+class TestPageWorker:
+
+    def test_overrunning_pages_are_abandoned(self, worker):
+        start = time.perf_counter()
+        report = extract_pages(fake_extract, 'doc', None, [1, 2, 3], TimeBudget(page=0.5), worker)
+        assert time.perf_counter() - start < 5
+        assert [tables[0].attrs['page'] for tables in report.results] == [1, 3]
+        assert report.timed_out == [2] and report.skipped == []
+        assert report.partial
+        assert worker.restarts == 1
+
+    def test_document_budget_skips_the_remaining_pages(self, worker):
+        report = extract_pages(fake_extract, 'doc', None, [1, 2, 3, 4], TimeBudget(document=0.5), worker)
+        assert [tables[0].attrs['page'] for tables in report.results] == [1]
+        assert report.timed_out == [2]
+        assert report.skipped == [3, 4]
+
+    def test_errors_reach_the_caller(self, worker):
+        with pytest.raises(ValueError, match="bad page 1"):
+            worker.call(failing_extract, ('doc', None, [1]))
+        # The worker is still usable afterwards
+        assert worker.call(fake_extract, ('doc', None, [1]))[0].attrs['page'] == 1
+
+    def test_timeout_raises(self, worker):
+        with pytest.raises(PageTimeout):
+            worker.call(fake_extract, ('doc', None, [2]), 0.2)
+
+
+class TestBudgetedParsing:
+
+    def test_generous_budget_changes_nothing(self):
+        expected = parse_bank_statement(MULTI_PAGE)['transactions']
+        result = parse_bank_statement(MULTI_PAGE, page_timeout=60, document_timeout=120)
+        assert result['transactions'] == expected
+        assert 'partial' not in result
+
+    def test_exhausted_budget_returns_a_partial_result(self, tmp_path, unbounded_load):
+        cache = StatementCache(str(tmp_path / "cache"))
+        result = parse_bank_statement(MULTI_PAGE, document_timeout=0.01, cache=cache)
+        assert result['partial'] is True
+        metrics = result['metrics']
+        assert metrics['timed_out_pages'] + metrics['skipped_pages'] == [1, 2, 3, 4]
+        assert 'tables_seconds' in metrics
+        # Partial results are not cached
+        assert parse_bank_statement(MULTI_PAGE, cache=cache)['transactions']
+
+    def test_pipeline_keeps_going_past_overrunning_statements(self, unbounded_load):
+        sink = MemorySink()
+        sources = [(f"statement-{i}", MULTI_PAGE) for i in range(3)]
+        start = time.perf_counter()
+        stats = BatchPipeline(sink, table_workers=2, document_timeout=0.01).run(sources)
+        assert time.perf_counter() - start < 30
+        assert (stats.documents, stats.errors) == (3, 0)
+        assert all(result['partial'] for _, result in sink.results)
+
+    def test_reading_the_pdf_is_bounded_too(self):
+        with pytest.raises(PageTimeout, match="reading the PDF took longer than 0.001s"):
+            parse_bank_statement(MULTI_PAGE, document_timeout=0.001)
+
+    def test_pipeline_records_statements_too_slow_to_read(self):
+        sink = MemorySink()
+        stats = BatchPipeline(sink, document_timeout=0.001).run([(f"statement-{i}", MULTI_PAGE) for i in range(2)])
+        assert (stats.documents, stats.errors) == (2, 2)
+        assert all("reading the PDF" in result['error'] for _, result in sink.results)
+
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import pytest
+import camelot
+from pypdf import PdfReader, PdfWriter
+from ocbc_dbs_statement_parser.context import ParserConfig
+from ocbc_dbs_statement_parser.deadline import TimeBudget
+from ocbc_dbs_statement_parser.encryption import PasswordCache, account_key, decrypt_pdf
+from ocbc_dbs_statement_parser.main import parse_bank_statement
+from ocbc_dbs_statement_parser.pipeline import BatchPipeline
+from ocbc_dbs_statement_parser.sinks import MemorySink
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'corpus')
+CARD_STATEMENT = os.path.join(CORPUS, 'dbs_card_single_page.pdf')
+
+
+def encrypted(path, password):
+    writer = PdfWriter(clone_from=PdfReader(path))
+    # RC4 needs no crypto library; AES works the same way when one is installed
+    writer.encrypt(password, algorithm='RC4-128')
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def encrypted_statement(tmp_path):
+    path = tmp_path / "DBS_Card_May2024.pdf"
+    path.write_bytes(encrypted(CARD_STATEMENT, 's3cret'))
+    return str(path)
+
+
+def expected_transactions():
+    with open(os.path.join(CORPUS, 'dbs_card_single_page.expected.json')) as fh:
+        return json.load(fh)['transactions']
+
+
+class TestAccountKey:
+
+    def test_monthly_statements_share_a_key(self):
+        assert account_key('/in/DBS_Card_May2024.pdf') == account_key('/in/DBS_Card_Jun2024.pdf') == 'DBS CARD'
+        assert account_key('123-456789-0_20240731.pdf') == account_key('123-456789-0_20240831.pdf')
+        assert account_key('123-456789-0_20240731.pdf') != account_key('123-987654-0_20240731.pdf')
+
+
+class TestDecryptPdf:
+
+    def test_plain_pdfs_are_left_alone(self):
+        with open(CARD_STATEMENT, 'rb') as fh:
+            assert decrypt_pdf(fh.read(), ['s3cret']) is None
+
+    def test_decrypts_once_and_remembers_the_password(self):
+        data = encrypted(CARD_STATEMENT, 's3cret')
+        cache = PasswordCache()
+        decrypted = decrypt_pdf(data, ['wrong', 'other', 's3cret'], cache, 'DBS CARD')
+        assert not PdfReader(io.BytesIO(decrypted)).is_encrypted
+        assert cache.stats.to_dict() == {'documents': 1, 'attempts': 3}
+        decrypt_pdf(data, ['wrong', 'other', 's3cret'], cache, 'DBS CARD')
+        assert cache.stats.to_dict() == {'documents': 2, 'attempts': 4}
+
+    def test_recent_passwords_are_tried_first_for_unknown_accounts(self):
+        cache = PasswordCache()
+        cache.remember('A', 'two', 2)
+        assert cache.candidates('B', ['one', 'two']) == ['two', 'one']
+        # Passwords outside the given list are never tried
+        assert cache.candidates('A', ['one']) == ['one']
+
+    def test_wrong_passwords_raise(self):
+        with pytest.raises(ValueError, match="None of the 1 passwords"):
+            decrypt_pdf(encrypted(CARD_STATEMENT, 's3cret'), ['wrong'], PasswordCache())
+
+
+class TestParsing:
+
+    def test_parse_bank_statement_with_passwords(self, encrypted_statement):
+        result = parse_bank_statement(encrypted_statement, passwords=['wrong', 's3cret'])
+        assert result['transactions'] == expected_transactions()
+        assert 'decrypt_seconds' in result['metrics']
+
+    def test_decrypted_in_a_worker_under_a_time_budget(self, encrypted_statement):
+        cache = PasswordCache()
+        config = ParserConfig(passwords=('wrong', 's3cret'), password_cache=cache, time_budget=TimeBudget(page=60))
+        result = parse_bank_statement(encrypted_statement, config=config)
+        assert result['transactions'] == expected_transactions()
+        assert 'read_pdf_seconds' in result['metrics']
+        assert cache.stats.to_dict() == {'documents': 1, 'attempts': 2}
+
+    def test_camelot_reads_the_encrypted_file_with_the_password(self, encrypted_statement, monkeypatch):
+        read_pdf = camelot.read_pdf
+        calls = []
+
+        def read_path_only(filepath, **kwargs):
+            # camelot 0.11 only accepts a path
+            assert isinstance(filepath, str)
+            calls.append((filepath, kwargs['password']))
+            return read_pdf(filepath, **kwargs)
+
+        monkeypatch.setattr(camelot, 'read_pdf', read_path_only)
+        assert parse_bank_statement(encrypted_statement, passwords=['s3cret'])['transactions'] == expected_transactions()
+        assert calls == [(encrypted_statement, 's3cret')]
+
+    def test_pipeline_with_passwords(self, encrypted_statement, tmp_path):
+        sink = MemorySink()
+        stats = BatchPipeline(sink, passwords=['s3cret'], spool_dir=str(tmp_path / "spool")).run(
+            [("statement", encrypted_statement)])
+        assert stats.errors == 0
+        assert sink.get('statement')['transactions'] == expected_transactions()
+        assert list((tmp_path / "spool").iterdir()) == []
+
+    @pytest.mark.parametrize("options", [{'processes': 1}, {'page_timeout': 60}])
+    def test_worker_processes_get_the_password(self, encrypted_statement, options):
+        sink = MemorySink()
+        BatchPipeline(sink, passwords=['s3cret'], **options).run([("statement", encrypted_statement)])
+        assert sink.get('statement')['transactions'] == expected_transactions()
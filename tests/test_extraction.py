@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from ocbc_dbs_statement_parser.extraction import PROFILES, ExtractionProfile, get_profile
+from ocbc_dbs_statement_parser.templates import LayoutTemplate, TemplateRegistry
+
+
+class TestExtractionProfiles:
+
+    def test_default_profile_passes_no_overrides(self):
+        assert get_profile(None).camelot_kwargs() == {}
+        assert get_profile('default') is PROFILES['default']
+
+    def test_fast_profile_disables_layout_analysis(self):
+        kwargs = get_profile('fast').camelot_kwargs()
+        assert kwargs['layout_kwargs'] == {'boxes_flow': None, 'detect_vertical': False}
+
+    def test_tuned_profile_widens_edge_tol(self):
+        kwargs = get_profile('tuned').camelot_kwargs()
+        assert kwargs['edge_tol'] == 200 and 'row_tol' not in kwargs
+        assert kwargs['layout_kwargs'] == get_profile('fast').camelot_kwargs()['layout_kwargs']
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            get_profile('nope')
+
+    def test_profile_from_file(self, tmp_path):
+        path = tmp_path / 'profile.json'
+        path.write_text(json.dumps({'name': 'custom', 'row_tol': 4}))
+        profile = get_profile(str(path))
+        assert isinstance(profile, ExtractionProfile)
+        assert profile.camelot_kwargs() == {'row_tol': 4}
+
+    def test_with_template_pins_area_and_columns(self):
+        template = LayoutTemplate('fp', {}, {'date': 0}, True,
+                                  column_separators=[95.0, 300.5], table_area=[30.0, 90.0, 565.0, 846.0])
+        kwargs = PROFILES['fast'].with_template(template).camelot_kwargs()
+        assert kwargs['table_areas'] == ['30.00,90.00,565.00,846.00']
+        assert kwargs['columns'] == ['95.00,300.50']
+        assert 'layout_kwargs' in kwargs
+
+    def test_with_template_needs_area_and_columns(self):
+        template = LayoutTemplate('fp', {}, {}, True, column_separators=[95.0])
+        assert PROFILES['default'].with_template(template) is PROFILES['default']
+
+    def test_registry_grows_table_area(self):
+        registry = TemplateRegistry()
+        header = ['Date', 'Description']
+        registry.learn(header, {}, {'date': 0}, True, [95.0], [30.0, 100.0, 500.0, 800.0])
+        template = registry.learn(header, {}, {'date': 0}, True, [95.0], [40.0, 90.0, 560.0, 700.0])
+        assert template.table_area == [30.0, 90.0, 560.0, 800.0]
+        assert registry.templates() == [template]
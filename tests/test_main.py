@@ -1,4 +1,6 @@
 import pytest
+import random
+import string
 import pandas as pd
 from ocbc_dbs_statement_parser.main import (
     clean_text,
@@ -15,7 +17,17 @@ from ocbc_dbs_statement_parser.main import (
     clean_and_detect_transaction_table,
     is_bank_account_table,
     extract_statement_date,
+    profile_table,
+    intern_table,
+    NormalizedTable,
+    probe_statement_period,
+    extract_account_sections,
+    verify_transactions,
+    resolve_dates,
+    assign_dates,
+    StatementPeriod,
 )
+from datetime import date
 
 class TestMainFunctions:
 
@@ -33,6 +45,17 @@ class TestMainFunctions:
     def test_clean_text(self, input_str, expected):
         assert clean_text(input_str) == expected
 
+    def test_clean_text_matches_reference_implementation(self):
+        def reference(text):
+            return ' '.join(''.join(c for c in str(text) if c in string.printable).split())
+
+        rng = random.Random(0)
+        alphabet = string.printable + '\x00\x07\x1c\x1f\x7f\xa0\u2003\u00e9\u20ac(cid:1)\ufeff'
+        samples = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(2000)]
+        samples += [None, 12.5, float('nan'), pd.NA]
+        for sample in samples:
+            assert clean_text(sample) == reference(sample)
+
     @pytest.mark.parametrize("row, expected", [
         (pd.Series(['17/08', 'MERCHANT* FOOD A-123', 'CITYVILLE', 'ABC', '1.68']), True),
         (pd.Series(['21/08', '-0315 ONLINE *SERVICE S', 'TECHCITY', 'XYZ', '27.06']), True),
@@ -813,5 +836,167 @@ class TestMainFunctions:
         assert statement_date == expected_statement_date
         assert statement_year == expected_statement_year
 
+    @pytest.mark.parametrize("table, expected_header_index, expected_mapping, expected_account_type", [
+        (pd.DataFrame({
+            0: ['OCBC 360 ACCOUNT', 'Date', '01 JUL'],
+            1: ['', 'Description', 'FAST PAYMENT'],
+            2: ['', 'Withdrawal', '22.54'],
+            3: ['', 'Deposit', ''],
+            4: ['', 'Balance', '977.46'],
+        }), 1, {'Date': 0, 'Description': 1, 'Withdrawal': 2, 'Deposit': 3, 'Balance': 4}, 'bank_account'),
+        (pd.DataFrame({
+            0: ['DATE', '17/08'],
+            1: ['DESCRIPTION', 'MERCHANT* FOOD A-123'],
+            2: ['AMOUNT (S$)', '1.68'],
+        }), 0, {'Date': 0, 'Description': 1}, 'credit_card'),
+        (pd.DataFrame({
+            0: ['Statement of Account', 'JOHN DOE'],
+            1: ['', '123 MAIN STREET'],
+        }), None, {}, 'credit_card'),
+    ])
+    def test_profile_table(self, table, expected_header_index, expected_mapping, expected_account_type):
+        profile = profile_table(table)
+        assert profile.header_index == expected_header_index
+        assert profile.header_mapping == expected_mapping
+        assert profile.account_type == expected_account_type
+        assert profile.is_bank_account == is_bank_account_table(table)
+
+    def test_intern_table_shares_repeated_strings(self):
+        # Build equal but distinct string objects, as camelot does for every cell
+        table = pd.DataFrame({0: [''.join(['FAST ', 'PAYMENT']) for _ in range(3)], 1: ['1.00', float('nan'), '2.00']})
+        assert table[0][0] is not table[0][1]
+        interned = intern_table(table)
+        assert interned[0][0] is interned[0][1] is interned[0][2]
+        assert interned.equals(table)
+
+    def test_normalized_table(self):
+        table = pd.DataFrame({
+            0: ['17/08', '', 'SUBTOTAL'],
+            1: ['MERCHANT* FOOD  A-123', 'singapore', float('nan')],
+            2: ['1.68', 'SG', '1.68'],
+        })
+        normalized = NormalizedTable(table)
+        assert len(normalized) == 3
+        assert normalized.cleaned[0] == ['17/08', 'MERCHANT* FOOD A-123', '1.68']
+        assert normalized.upper[1] == ['', 'SINGAPORE', 'SG']
+        assert normalized.present[2] == [True, False, True]
+        assert [normalized.is_transaction_row(i) for i in range(3)] == [True, False, False]
+        assert normalized.is_location(1, 1) and normalized.is_location(1, 2)
+        assert not normalized.is_location(0, 1)
+
+    @pytest.mark.parametrize("texts, expected_start, expected_end, expected_text", [
+        (["Details of Your DBS Multiplier Account 01 Jul 2024 TO 31 Jul 2024"], date(2024, 7, 1), date(2024, 7, 31), "01 Jul 2024"),
+        (["1  JUL 2024 TO 31 JUL 2024"], date(2024, 7, 1), date(2024, 7, 31), "1  JUL 2024"),
+        # A range wins over an earlier bare date, even across texts
+        (["Printed 02 Jan 2024", "15 Dec 2023 TO 14 Jan 2024"], date(2023, 12, 15), date(2024, 1, 14), "15 Dec 2023"),
+        (["STATEMENT DATE CREDIT LIMIT PAYMENT DUE DATE\n23 May 2024 $150,000.00 18 Jun 2024"], None, date(2024, 5, 23), "23 May 2024"),
+        (["Payment due 18 Jun 2024", "STATEMENT DATE: 23 May 2024"], None, date(2024, 5, 23), "23 May 2024"),
+        (["Statement as at 05-02-2024"], None, date(2024, 2, 5), "05 Feb 2024"),
+        (["31 Feb 2024 then 01 Mar 2024"], None, date(2024, 3, 1), "01 Mar 2024"),
+    ])
+    def test_probe_statement_period(self, texts, expected_start, expected_end, expected_text):
+        period = probe_statement_period(*texts)
+        assert (period.start, period.end, period.text) == (expected_start, expected_end, expected_text)
+
+    def test_probe_statement_period_without_dates(self):
+        assert probe_statement_period("No dates here", None, "") is None
+        assert probe_statement_period("Copyright 01 Jan 1999") is None
+
+def account_table(rows):
+    return pd.DataFrame([['Date', 'Description', 'Withdrawal (-)', 'Deposit (+)', 'Balance']] + rows)
+
+
+class TestAccountSections:
+
+    consolidated = [
+        account_table([
+            ['', 'Account No. 111-11111-1', '', '', ''],
+            ['', 'Balance Brought Forward', '', '', '1,000.00'],
+            ['01/07/2024', 'SALARY', '', '500.00', '1,500.00'],
+            ['02/07/2024', 'NETS PURCHASE', '200.00', '', '1,300.00'],
+        ]),
+        # Next page of the same account: the header and brought-forward balance repeat
+        account_table([
+            ['', 'Account No. 111-11111-1', '', '', ''],
+            ['', 'Balance Brought Forward', '', '', '1,300.00'],
+            ['05/07/2024', 'INTEREST CREDIT', '', '1.00', '1,301.00'],
+            ['', 'Account No. 222-22222-2', '', '', ''],
+            ['', 'Balance Brought Forward', '', '', '50.00'],
+            ['03/07/2024', 'FUND TRANSFER', '', '25.00', '75.00'],
+        ]),
+        # An account without a printed number
+        account_table([
+            ['', 'Balance Brought Forward', '', '', '10.00'],
+            ['04/07/2024', 'ATM WITHDRAWAL', '5.00', '', '5.00'],
+        ]),
+    ]
+
+    def test_sections_split_on_account_headers_and_opening_balances(self):
+        sections = extract_account_sections(self.consolidated, '2024')
+        assert [(s.account, len(s.transactions)) for s in sections] == [
+            ('111-11111-1', 3), ('222-22222-2', 1), (None, 1)]
+
+    def test_transactions_are_tagged_and_verified_per_account(self):
+        transactions = extract_bank_account_transactions(self.consolidated, '2024')
+        assert [t['Account'] for t in transactions] == ['111-11111-1'] * 3 + ['222-22222-2', 'Account 3']
+        verification = verify_transactions(transactions)
+        assert verification['balance_matches'] is True
+        assert verification['accounts']['222-22222-2']['starting_balance'] == 50
+        assert verification['total_deposits'] == pytest.approx(526)
+
+    @pytest.mark.parametrize("row", [
+        ['03/07/2024', 'FUND TRANSFER TO ACCOUNT NO 123-45678-9', '100.00', '', '1,200.00'],
+        ['', 'FUND TRANSFER TO ACCOUNT NO 123-45678-9', '', '', ''],
+        ['', 'TRANSFER OF BALANCE B/F', '', '', ''],
+    ])
+    def test_descriptions_mentioning_accounts_do_not_start_sections(self, row):
+        table = account_table([
+            ['', 'Account No. 111-11111-1', '', '', ''],
+            ['', 'Balance Brought Forward', '', '', '1,300.00'],
+            ['02/07/2024', 'SALARY', '', '500.00', '1,800.00'],
+            row,
+            ['05/07/2024', 'INTEREST CREDIT', '', '1.00', '1,801.00'],
+        ])
+        sections = extract_account_sections([table], '2024')
+        assert [section.account for section in sections] == ['111-11111-1']
+
+    def test_single_account_statements_are_not_tagged(self):
+        transactions = extract_bank_account_transactions(self.consolidated[:1], '2024')
+        assert len(transactions) == 2 and 'Account' not in transactions[0]
+        assert 'accounts' not in verify_transactions(transactions)
+
+class TestDateResolution:
+
+    year_end = StatementPeriod(date(2023, 12, 15), date(2024, 1, 14), "15 Dec 2023")
+
+    def test_rollover_across_the_year_end(self):
+        raw = pd.Series(['20 DEC', '31/12', '02/01', '14 Jan', '20/01', '05/01/2022'])
+        dates = resolve_dates(raw, self.year_end)
+        assert str(dates.dtype) == 'datetime64[ns]'
+        assert dates.dt.date.tolist() == [date(2023, 12, 20), date(2023, 12, 31), date(2024, 1, 2),
+                                          date(2024, 1, 14), date(2024, 1, 20), date(2022, 1, 5)]
+
+    def test_statement_year_without_period(self):
+        dates = resolve_dates(pd.Series(['20 DEC', '02/01', 'not a date', '31/02']), statement_year='2024')
+        assert dates.dt.date.tolist()[:2] == [date(2024, 12, 20), date(2024, 1, 2)]
+        assert dates[2:].isna().all()
+
+    def test_assign_dates_formats_like_standardize_date(self):
+        transactions = [{'Date': '20 DEC'}, {'Date': '02/01'}, {'Date': 'PREVIOUS BALANCE'}, {'Description': 'x'}]
+        assign_dates(transactions)
+        assert [t.get('Date') for t in transactions] == ['20 December', '02 January', 'PREVIOUS BALANCE', None]
+        transactions = [{'Date': '20 DEC'}, {'Date': '02/01'}]
+        assign_dates(transactions, '2023', self.year_end)
+        assert [t['Date'] for t in transactions] == ['20 December 2023', '02 January 2024']
+
+    def test_card_statement_spanning_the_year_end(self):
+        table = pd.DataFrame({
+            0: ['DATE', '20 DEC', '03 JAN'],
+            1: ['DESCRIPTION', 'BOOKSHOP ORCHARD', 'CUSTOMER.IO EMAIL'],
+            2: ['AMOUNT (S$)', '12.50', '203.86'],
+        })
+        transactions = extract_credit_card_transactions([table], '2023', period=self.year_end)
+        assert [t['Date'] for t in transactions] == ['20 December 2023', '03 January 2024']
+
 if __name__ == '__main__':
-    pytest.main()
\ No newline at end of file
+    pytest.main()
@@ -0,0 +1,65 @@
+import json
+import random
+import pandas as pd
+import pytest
+from ocbc_dbs_statement_parser.main import extract_credit_card_transactions, get_additional_description
+from ocbc_dbs_statement_parser.markers import (
+    DEFAULT_EXCLUDED_DESCRIPTIONS,
+    DEFAULT_NON_TRANSACTION_MARKERS,
+    MarkerConfig,
+    MarkerMatcher,
+)
+
+
+class TestMarkers:
+
+    def test_trie_matcher_agrees_with_substring_checks(self):
+        rng = random.Random(1)
+        literals = set(DEFAULT_NON_TRANSACTION_MARKERS) | {'SUB', 'BAL', 'BALANCE', 'A.B*C', '(CR)', 'TOT'}
+        literals = {literal.upper() for literal in literals}
+        matcher = MarkerMatcher(literals)
+        alphabet = 'ABCDEFLNOSTUR/-.*() '
+        for _ in range(3000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+            assert matcher.search(text) == any(literal in text for literal in literals), text
+
+    @pytest.mark.parametrize("text, expected", [
+        ("AUTO-PYT FROM ACCT#123456789012345 REF NO: 11689999398715999971650", True),
+        ("PAYMENT BY GIRO - THANK YOU", True),
+        ("CUSTOMER.IO EMAIL MARK", False),
+    ])
+    def test_default_exclusions(self, text, expected):
+        assert MarkerConfig().exclusion_matcher.search(text) == expected
+
+    def test_empty_matcher(self):
+        assert not MarkerMatcher().search('TOTAL')
+        assert not MarkerMatcher().search_any(['TOTAL'])
+
+    def test_markers_are_case_insensitive_and_extensible(self):
+        table = pd.DataFrame({
+            0: ['', ''],
+            1: ['to JOHN DOE', 'Balance Brought Forward'],
+        })
+        assert get_additional_description(table, set(DEFAULT_NON_TRANSACTION_MARKERS)) == 'to JOHN DOE Balance Brought Forward'
+        assert get_additional_description(table, {'balance brought forward'}) == 'to JOHN DOE'
+
+    def test_config_from_file_extends_defaults(self, tmp_path):
+        path = tmp_path / 'markers.json'
+        path.write_text(json.dumps({
+            "non_transaction_markers": ["GRAND TOTAL", "TOTAL"],
+            "excluded_descriptions": [r"PAYMENT - DBS INTERNET/WIRELESS"],
+        }))
+        config = MarkerConfig.from_file(str(path))
+        assert config.non_transaction_markers == list(DEFAULT_NON_TRANSACTION_MARKERS) + ["GRAND TOTAL"]
+        assert config.excluded_descriptions == list(DEFAULT_EXCLUDED_DESCRIPTIONS) + [r"PAYMENT - DBS INTERNET/WIRELESS"]
+
+    def test_credit_card_extraction_uses_configured_exclusions(self):
+        table = pd.DataFrame({
+            0: ['17/08', '18/08'],
+            1: ['MERCHANT* FOOD A-123', 'PAYMENT - DBS INTERNET/WIRELESS'],
+            2: ['1.68', '500.00 CR'],
+        })
+        assert len(extract_credit_card_transactions([table], 2024)) == 2
+        config = MarkerConfig().extend(excluded_descriptions=[r"PAYMENT - DBS INTERNET/WIRELESS"])
+        transactions = extract_credit_card_transactions([table], 2024, markers=config)
+        assert [t['Description'] for t in transactions] == ['MERCHANT* FOOD A-123']
@@ -0,0 +1,85 @@
+import tracemalloc
+
+from ocbc_dbs_statement_parser.context import ParseContext, ParserConfig
+from ocbc_dbs_statement_parser.memory import MemoryProfiler, peak_rss_bytes
+
+
+def allocate():
+    return [bytearray(1024) for _ in range(200)]
+
+
+class TestMemoryProfiler:
+
+    def test_stage_peak_is_unknown_without_reset_peak(self, monkeypatch):
+        monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False)
+        profiler = MemoryProfiler()
+        try:
+            with profiler.stage('work'):
+                allocate()
+        finally:
+            profiler.stop()
+        figures = profiler.report()['stages']['work']
+        assert figures['traced_peak_bytes'] is None
+        assert figures['top_allocations'] is not None
+
+    def test_stage_records_allocation_sites(self):
+        profiler = MemoryProfiler(top=5)
+        try:
+            with profiler.stage('work'):
+                kept = allocate()
+        finally:
+            profiler.stop()
+        figures = profiler.report()['stages']['work']
+        assert figures['traced_peak_bytes'] >= 200 * 1024
+        assert figures['traced_retained_bytes'] >= 200 * 1024
+        assert any(site['site'].endswith(f'test_memory.py:{allocate.__code__.co_firstlineno + 1}') for site in figures['top_allocations'])
+        assert len(kept) == 200
+
+    def test_repeated_stage_keeps_worst_figures(self):
+        profiler = MemoryProfiler()
+        try:
+            with profiler.stage('work'):
+                big = allocate()
+            with profiler.stage('work'):
+                small = [0]
+        finally:
+            profiler.stop()
+        assert profiler.stages['work']['traced_peak_bytes'] >= 200 * 1024
+        assert big and small
+
+    def test_tracing_stops_after_the_last_profiler(self):
+        first, second = MemoryProfiler(), MemoryProfiler()
+        first.start()
+        second.start()
+        first.stop()
+        assert tracemalloc.is_tracing()
+        second.stop()
+        assert not tracemalloc.is_tracing()
+
+    def test_tracing_started_by_the_application_is_left_running(self):
+        tracemalloc.start()
+        try:
+            profiler = MemoryProfiler()
+            with profiler.stage('work'):
+                allocate()
+            profiler.stop()
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    def test_context_reports_memory_in_metrics(self):
+        ctx = ParseContext(ParserConfig(profile_memory=True))
+        with ctx.stage('tables'):
+            allocate()
+        metrics = ctx.finish()
+        assert 'tables_seconds' in metrics
+        assert set(metrics['memory']['stages']) == {'tables'}
+        assert metrics['memory']['rss_peak_bytes'] == peak_rss_bytes()
+        assert not tracemalloc.is_tracing()
+
+    def test_off_by_default(self):
+        ctx = ParseContext()
+        with ctx.stage('tables'):
+            pass
+        assert ctx.memory is None
+        assert 'memory' not in ctx.finish()
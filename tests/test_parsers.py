@@ -0,0 +1,135 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+from ocbc_dbs_statement_parser.context import ParseContext
+from ocbc_dbs_statement_parser.main import extract_transactions, main
+from ocbc_dbs_statement_parser.parsers import (
+    ParserSpec, dispatch_parser, fingerprint, match_spec, register_parser, unregister_parser,
+)
+from ocbc_dbs_statement_parser.parsers.base import StatementParser
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'corpus')
+
+DBS_CARD_TEXT = ("Credit Cards  Statement of Account\nDBS Cards P.O. Box 360 S(912312)\n"
+                 "JOHN DOE\nSTATEMENT DATE CREDIT LIMIT MINIMUM PAYMENT\n23 May 2024 $150,000.00 $75.00\n"
+                 "DBS LADIES VISA CARD NO.: 8339 2030 1234 0987\nDATE DESCRIPTION AMOUNT (S$)\n")
+DBS_ACCOUNT_TEXT = ("DBS Bank Ltd\nStatement of Account\nDetails of Your DBS Multiplier Account\n"
+                    "Date Description Withdrawal (-) Deposit (+) Balance\n")
+OCBC_ACCOUNT_TEXT = ("OCBC Bank\n65 Chulia Street, OCBC Centre\nSTATEMENT OF ACCOUNT\n"
+                     "Transaction Date Value Date Description Cheque Withdrawal Deposit Balance\n")
+
+
+class RecordingParser(StatementParser):
+    name = 'recording'
+
+    def extract(self, tables, file_path, pdf_text, ctx):
+        return [{'Description': pdf_text}]
+
+
+PLUGIN = RecordingParser()
+
+
+class TestParserRegistry:
+
+    def test_fingerprint_finds_registered_keywords(self):
+        assert {'DBS', 'CREDIT CARDS', 'CARD NO'} <= fingerprint(DBS_CARD_TEXT)
+        assert fingerprint('') == frozenset()
+        assert fingerprint(None) == frozenset()
+
+    def test_overlapping_keywords_are_all_found(self):
+        found = fingerprint("DBS LIVE FRESH CREDIT CARD NO.: 4119 1100 2233 4455\nDATE DESCRIPTION AMOUNT\n")
+        assert {'DBS', 'CREDIT CARD', 'CARD NO'} <= found
+        # Whole words only
+        assert 'DBS' not in fingerprint("DBSX REWARDS\n")
+
+    @pytest.mark.parametrize("text, expected", [
+        (DBS_CARD_TEXT, 'dbs-card'),
+        (DBS_ACCOUNT_TEXT, 'dbs-account'),
+        # Transaction descriptions below the header row do not count
+        (DBS_ACCOUNT_TEXT + "02/07/2024 BILL PAYMENT DBS CREDIT CARDS 500.00 1,000.00\n", 'dbs-account'),
+        ("POSB\nStatement of Account\nDate Description Withdrawal (-) Deposit (+) Balance\n"
+         "02/07/2024 NETS DEBIT CARD NO 1234 12.00 988.00\n", 'dbs-account'),
+        (OCBC_ACCOUNT_TEXT, 'ocbc-account'),
+        ("Some Other Bank\nWithdrawal Deposit Balance", None),
+    ])
+    def test_match_spec(self, text, expected):
+        spec = match_spec(text)
+        assert (spec.name if spec else None) == expected
+
+    def test_dispatch_loads_builtin_parsers(self):
+        parser = dispatch_parser(DBS_CARD_TEXT)
+        assert parser.name == 'dbs-card' and parser.account_type == 'credit_card'
+        assert dispatch_parser(OCBC_ACCOUNT_TEXT).account_type == 'bank_account'
+
+    def test_plugins_are_imported_lazily(self):
+        register_parser(ParserSpec('missing', 'no_such_parser_module:PARSER', issuer=('ACME BANK',)))
+        try:
+            assert dispatch_parser(DBS_ACCOUNT_TEXT).name == 'dbs-account'
+            assert 'no_such_parser_module' not in sys.modules
+            with pytest.raises(ModuleNotFoundError):
+                dispatch_parser("ACME BANK statement")
+        finally:
+            unregister_parser('missing')
+
+    def test_registered_plugin_takes_precedence(self):
+        register_parser(ParserSpec('recording', f'{__name__}:PLUGIN', issuer=('DBS',), product=('CREDIT CARDS',)))
+        try:
+            parser = dispatch_parser(DBS_CARD_TEXT)
+            assert parser is PLUGIN
+            assert parser.extract([], 'statement.pdf', 'text', ParseContext()) == [{'Description': 'text'}]
+        finally:
+            unregister_parser('recording')
+        assert dispatch_parser(DBS_CARD_TEXT).name == 'dbs-card'
+
+    def test_tables_that_contradict_the_parser_fall_back_to_detection(self):
+        table = pd.DataFrame([
+            ['Date', 'Description', 'Withdrawal (-)', 'Deposit (+)', 'Balance'],
+            ['02/07/2024', 'BILL PAYMENT', '500.00', '', '1,000.00'],
+        ])
+        ctx = ParseContext()
+        transactions = dispatch_parser(DBS_CARD_TEXT).extract([table], 'statement-2024.pdf', 'Statement Date 23-05-2024', ctx)
+        assert ctx.parser is None and ctx.metrics['parser_overridden'] == 'dbs-card'
+        assert transactions[0]['Withdrawal'] == -500.0 and transactions[0]['Balance'] == 1000.0
+
+    def test_bank_account_parser_reads_tables_detection_would_call_a_card(self):
+        # 'Credit Amount' instead of 'Deposit': generic detection picks the card path
+        table = pd.DataFrame([
+            ['Date', 'Description', 'Withdrawals', 'Credit Amount', 'Balance'],
+            ['02/07/2024', 'BILL PAYMENT', '500.00', '', '1,000.00'],
+        ])
+        undispatched = extract_transactions([table], 'statement-2024.pdf', 'Statement Date 23-05-2024', ctx=ParseContext())
+        assert 'Balance' not in undispatched[0]
+        ctx = ParseContext()
+        transactions = dispatch_parser(DBS_ACCOUNT_TEXT).extract([table], 'statement-2024.pdf', 'Statement Date 23-05-2024', ctx)
+        assert ctx.parser == 'dbs-account' and ctx.account_type == 'bank_account'
+        assert transactions == [{'Date': '02 July 2024', 'Description': 'BILL PAYMENT', 'Withdrawal': -500.0,
+                                 'Deposit': 0, 'Balance': 1000.0}]
+
+    def test_card_parser_reads_tables_detection_would_call_a_bank_account(self):
+        # The rows above the header mention withdrawals, deposits and a balance
+        table = pd.DataFrame([
+            ['', 'CASH WITHDRAWAL AND DEPOSIT LIMITS APPLY', ''],
+            ['', 'PREVIOUS BALANCE', '25.00'],
+            ['DATE', 'DESCRIPTION', 'AMOUNT (S$)'],
+            ['23 APR', 'GRAB RIDES', '10.00'],
+        ])
+        undispatched = extract_transactions([table], 'statement-2024.pdf', 'Statement Date 23-05-2024', ctx=ParseContext())
+        assert 'Amount' not in undispatched[0]
+        ctx = ParseContext()
+        transactions = dispatch_parser(DBS_CARD_TEXT).extract([table], 'statement-2024.pdf', 'Statement Date 23-05-2024', ctx)
+        assert ctx.parser == 'dbs-card' and ctx.account_type == 'credit_card'
+        assert transactions == [{'Date': '23 April 2024', 'Amount': -10.0, 'Description': 'GRAB RIDES'}]
+
+    @pytest.mark.parametrize("name, expected", [
+        ('dbs_account_single_page', 'dbs-account'),
+        ('dbs_card_single_page', 'dbs-card'),
+        ('ocbc_account_multi_page', 'ocbc-account'),
+        ('ocbc_card_multi_page', 'ocbc-card'),
+    ])
+    def test_corpus_statements_are_dispatched(self, name, expected):
+        ctx = ParseContext()
+        assert main(os.path.join(CORPUS, f'{name}.pdf'), ctx=ctx)
+        assert ctx.parser == expected and 'parser_overridden' not in ctx.metrics
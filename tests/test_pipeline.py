@@ -0,0 +1,208 @@
+import io
+import json
+import threading
+import time
+import pytest
+from ocbc_dbs_statement_parser.pipeline import BatchPipeline, Document
+from ocbc_dbs_statement_parser.sinks import JsonLinesSink, MemorySink, Sink, SqliteSink
+
+
+class FakePipeline(BatchPipeline):
+    """Skips PDF work so the plumbing can be tested without camelot."""
+
+    def load_document(self, document: Document) -> None:
+        if document.path.endswith('broken.pdf'):
+            raise ValueError('not a PDF')
+        document.pdf_text = document.path
+
+    def extract_document_tables(self, document: Document) -> None:
+        document.tables = []
+
+    def extract_document_transactions(self, document: Document) -> None:
+        document.result = {"transactions": [{"Description": document.pdf_text}], "verification_data": {}}
+
+
+class SlowSink(Sink):
+    def __init__(self):
+        self.written = []
+
+    def write(self, source, result):
+        time.sleep(0.01)
+        self.written.append(source)
+
+
+class TestPipeline:
+
+    def test_sinks_must_implement_write(self):
+        class Incomplete(Sink):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_results_reach_the_sink_in_order_with_a_single_worker(self):
+        sink = MemorySink()
+        sources = [(f"doc{i}", f"/statements/doc{i}.pdf") for i in range(10)]
+        stats = FakePipeline(sink).run(sources)
+        assert [source for source, _ in sink.results] == [source for source, _ in sources]
+        assert sink.get('doc3')["transactions"] == [{"Description": "/statements/doc3.pdf"}]
+        assert stats.documents == 10 and stats.errors == 0
+
+    @pytest.mark.parametrize("max_in_flight", [1, 3])
+    def test_slow_sink_applies_backpressure(self, max_in_flight):
+        sink = SlowSink()
+        pipeline = FakePipeline(sink, queue_size=1, max_in_flight=max_in_flight, table_workers=2)
+        stats = pipeline.run((f"doc{i}", f"doc{i}.pdf") for i in range(25))
+        assert len(sink.written) == 25
+        assert stats.peak_in_flight <= max_in_flight
+
+    def test_errors_are_reported_per_document(self):
+        sink = MemorySink()
+        stats = FakePipeline(sink).run([("good", "good.pdf"), ("bad", "broken.pdf")])
+        assert stats.errors == 1
+        assert sink.get('bad') == {"transactions": [], "verification_data": {}, "error": "ValueError: not a PDF"}
+        assert sink.get('good')["transactions"]
+
+    def test_failing_source_iterator_still_drains_the_pipeline(self):
+        def sources():
+            yield ("doc0", "doc0.pdf")
+            raise RuntimeError("walk failed")
+
+        sink = MemorySink()
+        with pytest.raises(RuntimeError):
+            FakePipeline(sink).run(sources())
+        assert [source for source, _ in sink.results] == ["doc0"]
+        assert not [t for t in threading.enumerate() if t.name.startswith('pipeline-')]
+
+    def test_io_workers_load_concurrently(self):
+        active = [0, 0]
+        lock = threading.Lock()
+
+        class SlowLoadPipeline(FakePipeline):
+            def load_document(self, document):
+                with lock:
+                    active[0] += 1
+                    active[1] = max(active[1], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+                super().load_document(document)
+
+        sink = MemorySink()
+        pipeline = SlowLoadPipeline(sink, io_workers=4)
+        assert pipeline.max_in_flight == 4 + 1 + 2
+        stats = pipeline.run((f"doc{i}", f"doc{i}.pdf") for i in range(12))
+        assert stats.documents == 12 and stats.errors == 0
+        assert active[1] > 1
+
+    def test_processes_get_a_dispatcher_thread_each(self):
+        pipeline = FakePipeline(MemorySink(), processes=3)
+        assert pipeline.table_workers == 3
+
+    def test_spooled_copies_are_removed(self, tmp_path):
+        from pypdf import PdfWriter
+        spooled = []
+
+        class SpoolPipeline(FakePipeline):
+            load_document = BatchPipeline.load_document
+
+            def extract_document_tables(self, document):
+                spooled.append((document.local_path, open(document.local_path, 'rb').read()))
+                self._remove_spooled(document)
+                document.tables = []
+
+        source = tmp_path / "statement.pdf"
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        with open(source, 'wb') as fh:
+            writer.write(fh)
+        spool = tmp_path / "spool"
+        sink = MemorySink()
+        stats = SpoolPipeline(sink, spool_dir=str(spool)).run([("statement", str(source))])
+        assert stats.errors == 0
+        assert spooled[0][0].startswith(str(spool)) and spooled[0][1] == source.read_bytes()
+        assert list(spool.iterdir()) == []
+
+    def test_json_lines_sink(self):
+        buffer = io.StringIO()
+        JsonLinesSink(buffer).write('a.pdf', {"transactions": [], "verification_data": {}})
+        assert json.loads(buffer.getvalue()) == {"transactions": [], "verification_data": {}, "source": "a.pdf"}
+
+
+def card_result(*rows):
+    return {"transactions": [{"Date": date, "Description": description, "Amount": amount}
+                             for date, description, amount in rows],
+            "verification_data": {}}
+
+
+class TestSqliteSink:
+
+    def rows(self, path):
+        import sqlite3
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT date, description, amount FROM transactions ORDER BY date, description").fetchall()
+
+    def test_reloading_and_overlapping_statements_do_not_duplicate(self, tmp_path):
+        path = str(tmp_path / "ledger.db")
+        may = card_result(("20 May 2024", "BOOKSHOP", -12.5), ("21 May 2024", "GRAB", -8.0))
+        june = card_result(("21 May 2024", "GRAB", -8.0), ("02 June 2024", "NTUC", -30.25))
+        with SqliteSink(path) as sink:
+            sink.write("may.pdf", may)
+            sink.write("may.pdf", may)
+            sink.write("june.pdf", june)
+        assert self.rows(path) == [("2024-05-20", "BOOKSHOP", -12.5), ("2024-05-21", "GRAB", -8.0),
+                                   ("2024-06-02", "NTUC", -30.25)]
+
+    def test_repeats_within_a_statement_are_kept(self, tmp_path):
+        path = str(tmp_path / "ledger.db")
+        with SqliteSink(path) as sink:
+            sink.write("may.pdf", card_result(("21 May 2024", "GRAB", -8.0), ("21 May 2024", "GRAB", -8.0)))
+            sink.write("may.pdf", card_result(("21 May 2024", "GRAB", -8.0), ("21 May 2024", "GRAB", -8.0)))
+        assert len(self.rows(path)) == 2
+
+    def test_rows_a_reparse_no_longer_produces_are_removed(self, tmp_path):
+        path = str(tmp_path / "ledger.db")
+        with SqliteSink(path) as sink:
+            sink.write("may.pdf", card_result(("20 May 2024", "BOOKSHOP", -12.5), ("21 May 2024", "GRAB", -8.0)))
+            sink.write("may.pdf", card_result(("21 May 2024", "GRAB", -8.0)))
+        assert self.rows(path) == [("2024-05-21", "GRAB", -8.0)]
+
+    @pytest.mark.parametrize("failed", [
+        {"transactions": [], "verification_data": {}, "error": "PageTimeout: gave up after 5s"},
+        dict(card_result(("20 May 2024", "BOOKSHOP", -12.5)), partial=True),
+    ])
+    def test_failed_and_partial_parses_keep_the_last_full_parse(self, tmp_path, failed):
+        import sqlite3
+        path = str(tmp_path / "ledger.db")
+        may = card_result(("20 May 2024", "BOOKSHOP", -12.5), ("21 May 2024", "GRAB", -8.0))
+        with SqliteSink(path) as sink:
+            sink.write("may.pdf", dict(may, verification_data={"net_spend": -20.5}))
+            sink.write("may.pdf", failed)
+        assert self.rows(path) == [("2024-05-20", "BOOKSHOP", -12.5), ("2024-05-21", "GRAB", -8.0)]
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT transaction_count, error, verification, partial FROM statements").fetchone() == (
+                2, failed.get("error"), '{"net_spend":-20.5}', int(bool(failed.get("partial"))))
+
+    def test_ledgers_without_the_partial_column_are_migrated(self, tmp_path):
+        import sqlite3
+        path = str(tmp_path / "ledger.db")
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE statements (id INTEGER PRIMARY KEY, source TEXT NOT NULL UNIQUE, "
+                         "parsed_at REAL NOT NULL, transaction_count INTEGER NOT NULL, error TEXT, verification TEXT)")
+        with SqliteSink(path) as sink:
+            sink.write("may.pdf", dict(card_result(("20 May 2024", "BOOKSHOP", -12.5)), partial=True))
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT source, partial FROM statements").fetchall() == [("may.pdf", 1)]
+
+    def test_statements_and_errors_are_recorded_in_wal_mode(self, tmp_path):
+        import sqlite3
+        path = str(tmp_path / "ledger.db")
+        with SqliteSink(path) as sink:
+            sink.write("bad.pdf", {"transactions": [], "verification_data": {}, "error": "ValueError: not a PDF"})
+            sink.write("good.pdf", dict(card_result(("20 May 2024", "BOOKSHOP", -12.5)),
+                                        verification_data={"net_spend": -12.5}))
+            assert sink.rows == 1
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+            assert conn.execute("SELECT source, transaction_count, error, verification FROM statements ORDER BY source").fetchall() == [
+                ("bad.pdf", 0, "ValueError: not a PDF", None), ("good.pdf", 1, None, '{"net_spend":-12.5}')]
@@ -0,0 +1,46 @@
+import io
+import json
+from decimal import Decimal
+import pytest
+from ocbc_dbs_statement_parser import serialization
+
+RESULT = {
+    "transactions": [
+        {'Date': '03 July 2024', 'Description': 'FAST PAYMENT via PayNow-Mobile', 'Withdrawal': -22.54, 'Deposit': 0, 'Balance': 57147.43},
+    ],
+    "verification_data": {"total_deposits": Decimal('23.54'), "balance_matches": True, "starting_balance": None},
+}
+EXPECTED = json.loads(json.dumps(RESULT, default=float))
+
+backends = ['json'] + (['orjson'] if serialization.orjson is not None else [])
+
+
+class TestSerialization:
+
+    @pytest.mark.parametrize("backend", backends)
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_dumps_round_trips(self, backend, compact):
+        text = serialization.dumps(RESULT, compact=compact, backend=backend)
+        assert json.loads(text) == EXPECTED
+        assert ('\n' in text) != compact
+
+    @pytest.mark.parametrize("backend", backends)
+    @pytest.mark.parametrize("stream", [io.StringIO, io.BytesIO])
+    def test_dump_streams_to_text_and_binary_files(self, backend, stream):
+        fp = stream()
+        if stream is io.BytesIO:
+            fp.mode = 'wb'
+        serialization.dump(RESULT, fp, backend=backend)
+        data = fp.getvalue()
+        text = data.decode('utf-8') if isinstance(data, bytes) else data
+        assert text.endswith('\n')
+        assert json.loads(text) == EXPECTED
+
+    def test_stdlib_indented_output_matches_previous_cli_format(self):
+        fp = io.StringIO()
+        serialization.dump(RESULT, fp, backend='json')
+        assert fp.getvalue() == json.dumps(RESULT, indent=2, default=serialization.decimal_default) + '\n'
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            serialization.resolve_backend('ujson')
@@ -0,0 +1,58 @@
+import pandas as pd
+from ocbc_dbs_statement_parser.main import (
+    process_table,
+    clean_and_detect_transaction_table,
+    extract_bank_account_transactions,
+)
+from ocbc_dbs_statement_parser.templates import TemplateRegistry, header_fingerprint
+
+
+def make_account_table():
+    return pd.DataFrame({
+        0: ['OCBC 360 ACCOUNT', 'Date\nDate', '', '01 JUL\n01 JUL', '', '03 JUL\n03 JUL'],
+        1: ['', 'Description', 'BALANCE B/F', 'FAST PAYMENT', 'to JOHN DOE', 'INTEREST CREDIT'],
+        2: ['', 'Withdrawal', '', '22.54', '', ''],
+        3: ['', 'Deposit', '', '', '', '1.20'],
+        4: ['', 'Balance', '1,000.00', '977.46', '', '978.66'],
+    })
+
+
+class TestTemplates:
+
+    def test_header_fingerprint_ignores_surrounding_whitespace(self):
+        assert header_fingerprint(pd.Series([' Date ', 'Amount'])) == header_fingerprint(pd.Series(['Date', 'Amount']))
+        assert header_fingerprint(pd.Series(['Date', 'Amount'])) != header_fingerprint(pd.Series(['Date', 'Balance']))
+
+    def test_learn_then_reuse_matches_generic_detection(self):
+        registry = TemplateRegistry()
+        generic_table, generic_is_transaction = clean_and_detect_transaction_table(make_account_table())
+
+        learned_table, _, learned = process_table(make_account_table(), registry)
+        assert learned.template is not None and learned.header_index == 1
+        assert len(registry) == 1
+        assert learned.template.split_columns == {0: ['Date', 'Date']}
+        assert learned.template.is_bank_account
+
+        reused_table, reused_is_transaction, reused = process_table(make_account_table(), registry)
+        assert reused.template is learned.template
+        assert reused.template.hits == 1
+        assert reused_is_transaction == generic_is_transaction
+        assert reused_table.equals(generic_table)
+        assert learned_table.equals(generic_table)
+
+        assert extract_bank_account_transactions([reused_table], 2024, [reused]) == \
+            extract_bank_account_transactions([generic_table], 2024)
+
+    def test_registry_persists_to_disk(self, tmp_path):
+        path = str(tmp_path / 'templates.json')
+        registry = TemplateRegistry(path)
+        process_table(make_account_table(), registry)
+        registry.save()
+
+        reloaded = TemplateRegistry(path)
+        assert len(reloaded) == 1
+        match = reloaded.match(make_account_table())
+        assert match is not None
+        assert match.header_index == 1
+        assert match.template.split_columns == {0: ['Date', 'Date']}
+        assert match.template.header_mapping == registry.match(make_account_table()).template.header_mapping
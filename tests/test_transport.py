@@ -0,0 +1,115 @@
+import os
+import pickle
+import pandas as pd
+import pytest
+from ocbc_dbs_statement_parser import transport
+from ocbc_dbs_statement_parser.deadline import PageTimeout, PageWorker
+from ocbc_dbs_statement_parser.main import extract_tables, parse_bank_statement, receive_all_tables
+from ocbc_dbs_statement_parser.pipeline import BatchPipeline
+from ocbc_dbs_statement_parser.sinks import MemorySink
+from ocbc_dbs_statement_parser.transport import SharedTables, pack_tables, release_tables, unpack_tables
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'corpus')
+MULTI_PAGE = os.path.join(CORPUS, 'dbs_account_multi_page.pdf')
+
+
+def shared_blocks():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+def packed_table():
+    return pack_tables([pd.DataFrame([['DBS', 'x']])])
+
+
+class LateResponse:
+    """
+    A worker connection whose first poll gives up just as the response arrives.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.late = True
+
+    def poll(self, timeout=None):
+        if self.late:
+            self.late = False
+            assert self.conn.poll(30)
+            return False
+        return self.conn.poll(timeout)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+class TestPackTables:
+
+    def test_round_trip(self):
+        tables = extract_tables(MULTI_PAGE)
+        before = shared_blocks()
+        packed = pickle.loads(pickle.dumps(pack_tables(tables)))
+        assert isinstance(packed, SharedTables)
+        unpacked = unpack_tables(packed)
+        assert shared_blocks() == before
+        assert len(unpacked) == len(tables)
+        for original, table in zip(tables, unpacked):
+            pd.testing.assert_frame_equal(original, table)
+            assert table.attrs == original.attrs
+
+    def test_equal_cells_share_one_string(self):
+        table = pd.DataFrame([['DBS', 'x'], ['DBS', 'x']], index=[5, 6], columns=['a', 'b'])
+        unpacked = unpack_tables(pack_tables([table, table.iloc[:0]]))
+        assert unpacked[0].iat[0, 1] is unpacked[0].iat[1, 1]
+        assert list(unpacked[0].index) == [5, 6] and list(unpacked[0].columns) == ['a', 'b']
+        assert unpacked[1].shape == (0, 2)
+
+    def test_release_frees_the_block(self):
+        before = shared_blocks()
+        packed = packed_table()
+        release_tables(packed)
+        assert shared_blocks() == before
+        release_tables(packed)  # already gone
+        release_tables([pd.DataFrame()])  # pickled tables hold no block
+
+    def test_failed_receive_frees_the_remaining_blocks(self):
+        before = shared_blocks()
+        missing = SharedTables('psm_missing_block', 0, 0, 0, [])
+        with pytest.raises(FileNotFoundError):
+            receive_all_tables([packed_table(), missing, packed_table()])
+        assert shared_blocks() == before
+
+    def test_non_string_tables_are_pickled(self):
+        tables = [pd.DataFrame([[1.5, 'x']])]
+        assert pack_tables(tables) is tables
+
+    def test_without_shared_memory_tables_are_pickled(self, monkeypatch):
+        monkeypatch.setattr(transport, 'shared_memory', None)
+        tables = [pd.DataFrame([['a']])]
+        assert pack_tables(tables) is tables
+        assert unpack_tables(tables) is tables
+
+
+class TestWorkerTransport:
+
+    def test_responses_after_a_timeout_are_discarded(self, monkeypatch):
+        worker = PageWorker(preload=())
+        try:
+            worker.start()
+            monkeypatch.setattr(worker, '_conn', LateResponse(worker._conn))
+            before = shared_blocks()
+            with pytest.raises(PageTimeout):
+                worker.call(packed_table, (), 0.1, discard=release_tables)
+            assert shared_blocks() == before
+        finally:
+            worker.close()
+
+    def test_pipeline_processes(self):
+        expected = parse_bank_statement(MULTI_PAGE)['transactions']
+        sink = MemorySink()
+        before = shared_blocks()
+        BatchPipeline(sink, processes=2).run([(str(i), MULTI_PAGE) for i in range(3)])
+        assert shared_blocks() == before
+        assert [result['transactions'] for _, result in sink.results] == [expected] * 3
+
+    def test_budgeted_workers(self):
+        expected = parse_bank_statement(MULTI_PAGE)['transactions']
+        assert parse_bank_statement(MULTI_PAGE, page_timeout=60)['transactions'] == expected
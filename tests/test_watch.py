@@ -0,0 +1,122 @@
+import os
+import shutil
+import threading
+import time
+import pytest
+from ocbc_dbs_statement_parser.sinks import MemorySink
+from ocbc_dbs_statement_parser.watch import MANIFEST_NAME, FolderWatcher, Manifest, ManifestSink, watch_folder
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'corpus')
+
+
+def drop(name, directory, age=5.0):
+    target = os.path.join(str(directory), name)
+    shutil.copy(os.path.join(CORPUS, name), target)
+    settled = time.time() - age
+    os.utime(target, (settled, settled))
+    return target
+
+
+class TestWatchFolder:
+
+    def test_only_new_or_changed_statements_are_parsed(self, tmp_path):
+        card = drop('dbs_card_single_page.pdf', tmp_path)
+        sink = MemorySink()
+        assert watch_folder(str(tmp_path), sink, once=True).documents == 1
+        assert sink.get(card)['transactions']
+        assert os.path.exists(tmp_path / MANIFEST_NAME)
+
+        # Nothing new, and a renamed copy of a parsed statement is not parsed again
+        os.rename(card, tmp_path / "renamed.pdf")
+        assert watch_folder(str(tmp_path), MemorySink(), once=True).documents == 0
+
+        drop('dbs_account_single_page.pdf', tmp_path)
+        sink = MemorySink()
+        assert watch_folder(str(tmp_path), sink, once=True).documents == 1
+        assert [source for source, _ in sink.results] == [str(tmp_path / 'dbs_account_single_page.pdf')]
+
+    def test_failures_are_recorded_and_retried_when_the_file_changes(self, tmp_path):
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"not a pdf")
+        os.utime(broken, (time.time() - 5, time.time() - 5))
+        manifest_path = str(tmp_path / "manifest.json")
+        assert watch_folder(str(tmp_path), MemorySink(), manifest_path, once=True).errors == 1
+        assert watch_folder(str(tmp_path), MemorySink(), manifest_path, once=True).documents == 0
+        shutil.copy(os.path.join(CORPUS, 'dbs_card_single_page.pdf'), broken)
+        os.utime(broken, (time.time() - 5, time.time() - 5))
+        stats = watch_folder(str(tmp_path), MemorySink(), manifest_path, once=True)
+        assert (stats.documents, stats.errors) == (1, 0)
+        assert sorted(entry['status'] for entry in Manifest(manifest_path).digests.values()) == ['error', 'ok']
+
+    def test_failures_are_retried_on_request(self, tmp_path):
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"not a pdf")
+        os.utime(broken, (time.time() - 5, time.time() - 5))
+        manifest_path = str(tmp_path / "manifest.json")
+        assert watch_folder(str(tmp_path), MemorySink(), manifest_path, once=True).errors == 1
+        assert watch_folder(str(tmp_path), MemorySink(), manifest_path, once=True).documents == 0
+        # Retried once per run, however often the folder is rescanned
+        stats = watch_folder(str(tmp_path), MemorySink(), manifest_path, once=True, retry_errors=True)
+        assert (stats.documents, stats.errors) == (1, 1)
+
+    def test_partial_results_are_recorded_as_partial_and_retried_on_request(self, tmp_path):
+        card = drop('dbs_card_single_page.pdf', tmp_path)
+        manifest = Manifest()
+        watcher = FolderWatcher(str(tmp_path), manifest, poll=True)
+        [(source, path)] = watcher.scan()
+        assert (source, path) == (card, card)
+        ManifestSink(MemorySink(), watcher).write(source, {"transactions": [], "verification_data": {}, "partial": True})
+        assert [entry['status'] for entry in manifest.digests.values()] == ['partial']
+        assert watcher.scan() == []
+        retrying = FolderWatcher(str(tmp_path), manifest, poll=True, retry_errors=True)
+        [(source, path)] = retrying.scan()
+        assert (source, path) == (card, card)
+        retrying.done(source)
+        assert [entry['status'] for entry in manifest.digests.values()] == ['ok']
+        assert retrying.scan() == []
+
+    def test_statements_rewritten_while_queued_are_recorded_per_version(self, tmp_path):
+        target = drop('dbs_card_single_page.pdf', tmp_path)
+        manifest = Manifest()
+        watcher = FolderWatcher(str(tmp_path), manifest, poll=True)
+        [(first, _)] = watcher.scan()
+        # The file changes before the first version's result comes back
+        shutil.copy(os.path.join(CORPUS, 'dbs_account_single_page.pdf'), target)
+        os.utime(target, (time.time() - 5, time.time() - 5))
+        [(second, _)] = watcher.scan()
+        assert first.digest != second.digest
+        assert watcher.scan() == []  # both versions are still in the pipeline
+        inner = MemorySink()
+        sink = ManifestSink(inner, watcher)
+        sink.write(second, {"transactions": [], "verification_data": {}, "error": "ValueError: bad"})
+        sink.write(first, {"transactions": [], "verification_data": {}})
+        assert manifest.status(first.digest) == 'ok'
+        assert manifest.status(second.digest) == 'error'
+        assert [type(source) for source, _ in inner.results] == [str, str]
+
+    def test_unsettled_files_wait(self, tmp_path):
+        drop('dbs_card_single_page.pdf', tmp_path, age=0)
+        watcher = FolderWatcher(str(tmp_path), Manifest(), settle=60)
+        assert watcher.scan() == []
+        watcher.close()
+
+    @pytest.mark.parametrize("poll", [False, True])
+    def test_statements_are_picked_up_while_watching(self, tmp_path, poll):
+        inbox = tmp_path / "inbox"
+        inbox.mkdir()
+        sink = MemorySink()
+        stop = threading.Event()
+        thread = threading.Thread(target=watch_folder, args=(str(inbox), sink, str(tmp_path / "manifest.json")),
+                                  kwargs={'stop': stop, 'interval': 0.1, 'settle': 0.2, 'poll': poll}, daemon=True)
+        thread.start()
+        try:
+            time.sleep(0.2)
+            target = drop('dbs_card_single_page.pdf', inbox, age=0)
+            deadline = time.monotonic() + 10
+            while sink.get(target) is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert sink.get(target)['transactions']
+        finally:
+            stop.set()
+            thread.join(10)
+        assert not thread.is_alive()
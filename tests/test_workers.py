@@ -0,0 +1,54 @@
+import multiprocessing
+import sys
+import pytest
+from ocbc_dbs_statement_parser import workers
+from ocbc_dbs_statement_parser.deadline import PageWorker
+from ocbc_dbs_statement_parser.workers import PRELOAD_MODULE, worker_context
+
+
+def worker_state():
+    from ocbc_dbs_statement_parser.main import location_keywords
+    return PRELOAD_MODULE in sys.modules, location_keywords.cache_info().currsize
+
+
+needs_forkserver = pytest.mark.skipif('forkserver' not in multiprocessing.get_all_start_methods(),
+                                     reason="no fork server")
+
+
+class FakeForkServer:
+
+    def __init__(self, pid, modules):
+        self._forkserver_pid = pid
+        self._preload_modules = modules
+
+    def set_forkserver_preload(self, modules):
+        self._preload_modules = modules
+
+
+@needs_forkserver
+def test_workers_fork_from_the_preloaded_server():
+    assert worker_context().get_start_method() == 'forkserver'
+    worker = PageWorker(preload=())
+    try:
+        # Nothing imported by the worker itself: the state comes from the fork server
+        assert worker.call(worker_state, ()) == (True, 1)
+    finally:
+        worker.close()
+
+
+@needs_forkserver
+def test_preload_joins_the_application_preloads(monkeypatch):
+    server = FakeForkServer(None, ['__main__', 'app.models'])
+    monkeypatch.setattr(workers.forkserver, '_forkserver', server)
+    worker_context()
+    worker_context()
+    assert server._preload_modules == ['__main__', 'app.models', PRELOAD_MODULE]
+
+
+@needs_forkserver
+def test_running_fork_server_is_left_alone(monkeypatch):
+    server = FakeForkServer(1234, ['app.models'])
+    monkeypatch.setattr(workers.forkserver, '_forkserver', server)
+    assert worker_context().get_start_method() == 'forkserver'
+    assert server._preload_modules == ['app.models']
+